@@ -0,0 +1,47 @@
+import asyncio
+from datetime import time as dtime
+from utils.engine import TradingEngine
+from utils.realtime import RealtimeFeed
+from utils.metrics import metrics
+from utils.journal import get_journal
+
+# ==============================================================
+# 🧩 설정 영역 (이곳만 바꾸면 전체 동작 자동 반영)
+# ==============================================================
+MARKET_CLOSE = dtime(5, 0)
+MARKET_OPEN = dtime(18, 0)
+SYMBOLS = [                  # (종목, 거래소 코드, 매수 전략 모드)
+    ("SES", "NYS", "ma5_touch"),
+    ("AAPL", "NAS", "lower_recover"),
+]
+INTERVAL = "5m"              # 데이터 주기: "2m" / "5m" / "1d"
+PERIOD = "60d"               # 데이터 기간: "60d" / "max"
+
+UPDATE_INTERVAL = 300        # 5분마다 데이터 및 전략 갱신
+REALTIME_INTERVAL = 3        # 실시간 가격 체크 주기 (초)
+DISCORD_INTERVAL = 30        # 현황 보고 주기 (초)
+USE_REALTIME_FEED = True     # 웹소켓 실시간 체결가 사용 (끊기거나 오래되면 REST 조회로 대체)
+FEED_MAX_AGE = 10            # 웹소켓 가격 허용 지연 (초)
+METRICS_PORT = None          # 계측 노출 포트 (예: 9108 → http://127.0.0.1:9108/metrics, None = 끔)
+METRICS_TEXTFILE = None      # 계측 Prometheus 텍스트 파일 경로 (None = 끔)
+JOURNAL_PATH = "trade_journal.db"  # 주문/체결/포지션 저널 (재시작 시 재생해서 포지션 복원)
+
+# ==============================================================
+
+if __name__ == "__main__":
+    if METRICS_PORT or METRICS_TEXTFILE:
+        metrics.enable(port=METRICS_PORT, textfile=METRICS_TEXTFILE)
+    engine = TradingEngine(
+        SYMBOLS,
+        interval=INTERVAL,
+        period=PERIOD,
+        update_interval=UPDATE_INTERVAL,
+        realtime_interval=REALTIME_INTERVAL,
+        discord_interval=DISCORD_INTERVAL,
+        market_close=MARKET_CLOSE,
+        market_open=MARKET_OPEN,
+        feed=RealtimeFeed().start() if USE_REALTIME_FEED else None,
+        feed_max_age=FEED_MAX_AGE,
+        journal=get_journal(JOURNAL_PATH),
+    )
+    asyncio.run(engine.run())
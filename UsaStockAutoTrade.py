@@ -2,10 +2,8 @@ import time
 from datetime import datetime, time as dtime
 from utils.api import (
     fetch_access_token,
-    fetch_cash_amount,
-    get_current_price,
     send_discord_message,
-    check_order_status
+    flush_discord_messages
 )
 from utils.order_api import (
     buy_order,
@@ -15,12 +13,20 @@ from utils.order_api import (
 from utils.helpers import (
     fetch_data,
     add_indicators,
-    check_buy_condition,
     check_sell_condition,
     optimize_thresholds_bruteforce,
     map_exchange_code,
     safe_float
 )
+from utils.reoptimizer import optimize_thresholds_incremental
+from utils.realtime import RealtimeFeed
+from utils.account import get_account
+from utils.fills import get_fill_tracker
+from utils.quotes import get_price
+from utils.tick import TickEvaluator
+from utils.walkforward import optimize_walk_forward
+from utils.metrics import metrics
+from utils.journal import get_journal
 
 # ==============================================================
 # 🧩 설정 영역 (이곳만 바꾸면 전체 동작 자동 반영)
@@ -37,16 +43,65 @@ UPDATE_INTERVAL = 300        # 5분마다 데이터 및 전략 갱신
 REALTIME_INTERVAL = 3       # 실시간 가격 체크 주기 (초)
 DISCORD_INTERVAL = 30        # 현황 보고 주기 (초)
 INITIAL_BALANCE = 10000      # 초기 자본 (백테스트용)
+OPTIMIZER_WORKERS = 1        # 전략 최적화 병렬 프로세스 수 (1 = 직렬)
+INCREMENTAL_OPTIMIZER = True # True: 새 봉만 재생하는 증분 재최적화 / False: 매번 전체 브루트포스
+USE_REALTIME_FEED = True     # 웹소켓 실시간 체결가 사용 (끊기거나 오래되면 REST 조회로 대체)
+FEED_MAX_AGE = 10            # 웹소켓 가격 허용 지연 (초)
+FILL_TIMEOUT = 10            # 매수 주문 후 미체결 잔량 취소까지 대기 (초)
+HTS_ID = ""                  # 실시간 체결통보 구독용 HTS ID (비우면 체결내역 조회 폴링만 사용)
+WALK_FORWARD_REPORT = False  # 시작 시 워크포워드 검증(학습 20일 → 검증 5일 롤링) 결과 보고
+METRICS_PORT = None          # 계측 노출 포트 (예: 9108 → http://127.0.0.1:9108/metrics, None = 끔)
+METRICS_TEXTFILE = None      # 계측 Prometheus 텍스트 파일 경로 (None = 끔)
+JOURNAL_PATH = "trade_journal.db"  # 주문/체결/포지션 저널 (재시작 시 재생해서 포지션 복원)
 
 # ==============================================================
 
 if __name__ == "__main__":
+    if METRICS_PORT or METRICS_TEXTFILE:
+        metrics.enable(port=METRICS_PORT, textfile=METRICS_TEXTFILE)
     access_token = fetch_access_token()
+    account = get_account()      # 계좌 스냅샷 (백그라운드 갱신, 읽기는 네트워크 없음)
+    fills = get_fill_tracker()   # 주문 체결 추적 (백그라운드 연속조회 / 체결통보)
+    journal = get_journal(JOURNAL_PATH)   # 재시작이면 여기서 이전 포지션 / 미완료 주문 복원
     positions = {}
+    pending_buy = None           # 체결 대기 중인 매수 주문 (TrackedOrder)
+    cancel_sent = False
+
+    # 저널과 계좌 잔고가 다른 부분만 브로커 기준으로 맞춤 (잔고는 get_account 가 이미 1회 조회)
+    for symbol, before, after in journal.reconcile(account.snapshot.holdings, symbols=[TICKER]):
+        send_discord_message(f"🧾 [{symbol}] 저널 {before}주 ≠ 잔고 {after}주 → 잔고 기준으로 보정")
+    if TICKER in journal.positions:
+        restored = journal.positions[TICKER]
+        positions[TICKER] = {"entry_price": restored["entry_price"], "qty": restored["qty"]}
+        send_discord_message(f"♻️ [{TICKER}] 저널에서 포지션 복원 | {restored['qty']}주 @ {restored['entry_price']:.3f}")
+    for odno, order in list(journal.open_orders.items()):
+        if order["symbol"] == TICKER and order["side"] == "buy":
+            # 저널의 누적 체결수량부터 이어서 추적 (이미 반영한 체결은 다시 이벤트로 나오지 않음)
+            tracked = journal.resume(fills, odno)
+            if tracked is not None:
+                pending_buy = tracked
+                send_discord_message(f"♻️ [{TICKER}] 미완료 매수 주문 {odno} 이어서 추적"
+                                     f" (체결 {tracked.filled_qty}/{tracked.qty}주)")
+
+    feed = None
+    if USE_REALTIME_FEED:
+        feed = RealtimeFeed().start()
+        feed.subscribe_quote(TICKER, EXCHANGE)
+        if HTS_ID:
+            fills.attach_feed(feed, HTS_ID)
 
     send_discord_message(f"🚀 자동매매 시작 (티커: {TICKER}, 모드: {MODE})")
 
-    df = None
+    if WALK_FORWARD_REPORT:
+        _, wf = optimize_walk_forward(TICKER, interval=INTERVAL, period=PERIOD, modes=(MODE,),
+                                      workers=OPTIMIZER_WORKERS)
+        send_discord_message(
+            f"🧪 [{TICKER}] 워크포워드 {wf['folds']} fold | 검증 누적 ${wf['compounded_balance']:.2f}"
+            f" (시작 ${INITIAL_BALANCE}) | 검증 승률 {wf['win_rate']:.1f}% ({wf['trades']}회)"
+            f" | 수익 fold {wf['profitable_folds']}/{wf['folds']}"
+        )
+
+    evaluator = TickEvaluator(MODE)   # 갱신 때 마지막 두 봉을 불변 스냅샷으로 → 틱 판정은 float 비교만
     last_update = 0
     last_discord_update = 0
     take_profit = 1.0
@@ -56,6 +111,7 @@ if __name__ == "__main__":
         try:
             now = time.time()
             now_time = datetime.now().time()
+            loop_start = time.perf_counter()
 
             if now_time >= MARKET_CLOSE and now_time <= MARKET_OPEN:
                 send_discord_message(f"🛑 장 마감({MARKET_CLOSE.strftime('%H:%M')}) 도달 — 자동매매 종료")
@@ -63,117 +119,173 @@ if __name__ == "__main__":
                 # 모든 포지션 정리
                 for symbol, pos in positions.items():
                     send_discord_message(f"⚠️ {symbol} 장 마감 전 포지션 청산 시도")
-                    sell_order(symbol, pos['qty'], EXCHANGE, get_current_price(symbol, EXCHANGE))
+                    sell_order(symbol, pos['qty'], EXCHANGE, get_price(symbol, EXCHANGE))
 
                 send_discord_message("✅ 모든 포지션 청산 완료. 프로그램 종료합니다.")
                 '''
+                if feed:
+                    feed.stop()
+                account.stop()
+                fills.stop()
+                journal.close()
+                flush_discord_messages()
                 break  # 루프 종료
 
 
             # (1) 주기적 데이터 갱신 + 전략 재최적화
-            if df is None or now - last_update >= UPDATE_INTERVAL:
-                send_discord_message(f"📊 [{TICKER}] 데이터 및 전략 갱신 중...")
-                df = fetch_data(TICKER, interval=INTERVAL, period=PERIOD)
+            with metrics.timer("loop_stage_seconds", stage="refresh"):
+                if evaluator.snapshot is None or now - last_update >= UPDATE_INTERVAL:
+                    send_discord_message(f"📊 [{TICKER}] 데이터 및 전략 갱신 중...")
+                    df = fetch_data(TICKER, interval=INTERVAL, period=PERIOD)
+                    evaluator.update(df)
+
+
+                    if INCREMENTAL_OPTIMIZER:
+                        take_profit, stop_loss = optimize_thresholds_incremental(
+                            TICKER,
+                            interval=INTERVAL,
+                            period=PERIOD,
+                            modes=(MODE,)
+                        )[2:4]
+                    else:
+                        take_profit, stop_loss = optimize_thresholds_bruteforce(
+                            TICKER,
+                            interval=INTERVAL,
+                            period=PERIOD,
+                            modes=(MODE,),
+                            workers=OPTIMIZER_WORKERS
+                        )[2:4]
+
+                    send_discord_message(
+                        f"🔄 [{TICKER}] 갱신된 전략 → {MODE} | 익절 {take_profit}% / 손절 {stop_loss}%"
+                    )
+                    last_update = now
+                    send_discord_message(f"✅ [{TICKER}] 지표/전략 갱신 완료")
+
+            # (2) 실시간 현재가 확인 (웹소켓 캐시 → 없으면 REST 시세 캐시)
+            with metrics.timer("loop_stage_seconds", stage="price"):
+                current_price = feed.get_price(TICKER, EXCHANGE, max_age=FEED_MAX_AGE) if feed else None
+                if current_price is None:
+                    current_price = get_price(TICKER, EXCHANGE)
+
+            # (3) 체결 이벤트 반영 (부분/전체 체결 → 포지션, 미체결 잔량은 FILL_TIMEOUT 후 취소)
+            with metrics.timer("loop_stage_seconds", stage="fills"):
+                for event in fills.drain_events():
+                    order = event.order
+                    if order.side != "buy" or order.symbol != TICKER:
+                        continue
 
+                    if event.kind in ("partial", "filled"):
+                        account.apply_fill(TICKER, "buy", event.qty, event.price, EXCHANGE)
+                        positions[TICKER] = {"entry_price": order.avg_price, "qty": order.filled_qty}
+                        journal.fill(order.odno, TICKER, EXCHANGE, "buy", event.qty, event.price)
+                        journal.position(TICKER, EXCHANGE, order.filled_qty, order.avg_price)
+                        send_discord_message(
+                            f"📊 {TICKER} 주문번호 {order.odno} {'체결완료' if event.kind == 'filled' else '부분체결'}\n"
+                            f"총 체결수량: {order.filled_qty}주 / 미체결수량: {order.remaining}주 / 평균단가: {order.avg_price:.3f}"
+                        )
+                    else:
+                        account.invalidate()
+                        send_discord_message(
+                            f"{'🚫' if event.kind == 'cancelled' else '❗'} {TICKER} 주문번호 {order.odno} "
+                            f"{'잔량 취소' if event.kind == 'cancelled' else '주문 거부'} | 미체결 {event.qty}주"
+                        )
 
-                take_profit, stop_loss = optimize_thresholds_bruteforce(
-                    TICKER,
-                    interval=INTERVAL,
-                    period=PERIOD,
-                    modes=(MODE,)
-                )[2:4]
+                    if event.kind != "partial":
+                        journal.order_done(order.odno, TICKER, event.kind)
 
-                send_discord_message(
-                    f"🔄 [{TICKER}] 갱신된 전략 → {MODE} | 익절 {take_profit}% / 손절 {stop_loss}%"
-                )
-                last_update = now
-                send_discord_message(f"✅ [{TICKER}] 지표/전략 갱신 완료")
+                    if order.done and pending_buy is not None and order.odno == pending_buy.odno:
+                        pending_buy = None
+                        if TICKER in positions:
+                            entry = positions[TICKER]["entry_price"]
+                            tp_price = entry * (1 + take_profit / 100)
+                            sl_price = entry * (1 + stop_loss / 100)
+                            send_discord_message(f"🎯 {TICKER} 매수완료 | 익절 {tp_price:.3f} / 손절 {sl_price:.3f}")
 
-            # (2) 실시간 현재가 확인
-            current_price = get_current_price(TICKER, EXCHANGE)
+            if pending_buy is not None:
+                with metrics.timer("loop_stage_seconds", stage="pending"):
+                    if not cancel_sent and now - pending_buy.created >= FILL_TIMEOUT and pending_buy.remaining > 0:
+                        success, cancel_no = cancel_order(TICKER, pending_buy.odno, pending_buy.remaining, EXCHANGE)
+                        cancel_sent = True
+                        if success:
+                            fills.refresh()
+                            print("✅ 취소 완료:", cancel_no)
+                        else:
+                            print("❌ 취소 실패")
+                metrics.observe("loop_iteration_seconds", time.perf_counter() - loop_start)
+                time.sleep(REALTIME_INTERVAL)
+                continue
 
             # (a) 보유 포지션 → 매도 감시
             if TICKER in positions:
-                entry = positions[TICKER]["entry_price"]
-                qty = positions[TICKER]["qty"]
-                result = check_sell_condition(entry, current_price, take_profit, stop_loss)
+                with metrics.timer("loop_stage_seconds", stage="sell"):
+                    entry = positions[TICKER]["entry_price"]
+                    qty = positions[TICKER]["qty"]
+                    result = check_sell_condition(entry, current_price, take_profit, stop_loss)
 
-                target_profit_price = entry * (1 + take_profit / 100)
-                target_loss_price = entry * (1 + stop_loss / 100)
+                    target_profit_price = entry * (1 + take_profit / 100)
+                    target_loss_price = entry * (1 + stop_loss / 100)
 
-                if now - last_discord_update >= DISCORD_INTERVAL:
-                    send_discord_message(
-                        f"📈 {TICKER} 현황 | 익절가 {target_profit_price:.3f} / 손절가 {target_loss_price:.3f} | 현재가 {current_price:.3f}"
-                    )
-                    last_discord_update = now
-
-                if result == "take_profit":
-                    send_discord_message(f"✅ {TICKER} 익절 조건 충족 → 매도 시도")
-                    success = sell_order(TICKER, qty, EXCHANGE, current_price)
-                    if success:
-                        send_discord_message(f"💰 {TICKER} 익절 매도 완료")
-                        del positions[TICKER]
-                    else:
-                        send_discord_message(f"❗ {TICKER} 익절 매도 실패 → 포지션 유지")
-
-                elif result == "stop_loss":
-                    send_discord_message(f"⚠️ {TICKER} 손절 조건 충족 → 매도 시도")
-                    success = sell_order(TICKER, qty, EXCHANGE, current_price)
-                    if success:
-                        send_discord_message(f"💔 {TICKER} 손절 매도 완료")
-                        del positions[TICKER]
-                    else:
-                        send_discord_message(f"❗ {TICKER} 손절 매도 실패 → 포지션 유지")
+                    if now - last_discord_update >= DISCORD_INTERVAL:
+                        send_discord_message(
+                            f"📈 {TICKER} 현황 | 익절가 {target_profit_price:.3f} / 손절가 {target_loss_price:.3f} | 현재가 {current_price:.3f}",
+                            key=f"status:{TICKER}"
+                        )
+                        last_discord_update = now
+
+                    if result == "take_profit":
+                        send_discord_message(f"✅ {TICKER} 익절 조건 충족 → 매도 시도")
+                        success = sell_order(TICKER, qty, EXCHANGE, current_price)
+                        if success:
+                            send_discord_message(f"💰 {TICKER} 익절 매도 완료")
+                            account.apply_fill(TICKER, "sell", qty, current_price, EXCHANGE)
+                            journal.close_position(TICKER, EXCHANGE)
+                            del positions[TICKER]
+                        else:
+                            send_discord_message(f"❗ {TICKER} 익절 매도 실패 → 포지션 유지")
+
+                    elif result == "stop_loss":
+                        send_discord_message(f"⚠️ {TICKER} 손절 조건 충족 → 매도 시도")
+                        success = sell_order(TICKER, qty, EXCHANGE, current_price)
+                        if success:
+                            send_discord_message(f"💔 {TICKER} 손절 매도 완료")
+                            account.apply_fill(TICKER, "sell", qty, current_price, EXCHANGE)
+                            journal.close_position(TICKER, EXCHANGE)
+                            del positions[TICKER]
+                        else:
+                            send_discord_message(f"❗ {TICKER} 손절 매도 실패 → 포지션 유지")
 
+                metrics.observe("loop_iteration_seconds", time.perf_counter() - loop_start)
                 time.sleep(REALTIME_INTERVAL)
                 continue
 
             # (b) 포지션 없음 → 매수 감시
             if TICKER not in positions:
-                if now - last_discord_update >= DISCORD_INTERVAL:
-                    ma_target = df["ma20"].iloc[-1].item()
-                    send_discord_message(f"🎯 {TICKER} 매수 감시 중 | 모드 {MODE} | MA20={ma_target:.3f}, 현재가={current_price:.3f}")
-                    last_discord_update = now
-
-                if check_buy_condition(df, current_price, mode=MODE):
-                    cash = float(fetch_cash_amount())
-                    if cash > 100:
-                        qty = int((cash * 1.0) // current_price)
-                        if qty > 0:
-                            send_discord_message(f"🟢 {TICKER} 매수 조건 충족 ({MODE}) → {qty}주 매수 시도 ({current_price} USD)")
-                            success, odno = buy_order(TICKER, qty, EXCHANGE, current_price)
-                            if success:
-                                order_info = check_order_status(odno, symbol=TICKER, exchange=EXCHANGE)
-                                if order_info:
-                                    latest = order_info[-1]  # 마지막 체결내역
-                                    nccs_qty = float(latest.get("nccs_qty", 0))
-                                    total_ccld = sum(float(o.get("ft_ccld_qty", 0)) for o in order_info)
-
-                                    send_discord_message(
-                                        f"📊 {TICKER} 주문번호 {odno}\n"
-                                        f"총 체결수량: {total_ccld}주 / 미체결수량: {nccs_qty}주\n"
-                                        f"상태: {latest.get('prcs_stat_name')}"
-                                    )
-                                    if nccs_qty > 0: #미체결이 하나라도 잇으면 취소해야지 일단
-                                        success, cancel_no = cancel_order(TICKER, odno, nccs_qty, EXCHANGE)
-                                        if success:
-                                            print("✅ 취소 완료:", cancel_no)
-                                        else:
-                                            print("❌ 취소 실패")
-
-                                    if total_ccld > 0: #산게 하나라도 잇다면 포지션 돌려야지
-                                        positions[TICKER] = {"entry_price": current_price, "qty": qty}
-                                        tp_price = current_price * (1 + take_profit / 100)
-                                        sl_price = current_price * (1 + stop_loss / 100)
-                                        send_discord_message(f"🎯 {TICKER} 매수완료 | 익절 {tp_price:.3f} / 손절 {sl_price:.3f}")
+                with metrics.timer("loop_stage_seconds", stage="buy"):
+                    if now - last_discord_update >= DISCORD_INTERVAL:
+                        latency = evaluator.stats()
+                        send_discord_message(f"🎯 {TICKER} 매수 감시 중 | 모드 {MODE} | MA20={evaluator.value('ma20'):.3f}, 현재가={current_price:.3f}"
+                                             f" | 가용현금 {account.cash:.2f} | 판정 p99 {latency.get('p99_us', 0):.1f}µs",
+                                             key=f"status:{TICKER}")
+                        last_discord_update = now
 
+                    if evaluator.check(current_price):
+                        cash = account.cash
+                        if cash > 100:
+                            qty = int((cash * 1.0) // current_price)
+                            if qty > 0:
+                                send_discord_message(f"🟢 {TICKER} 매수 조건 충족 ({MODE}) → {qty}주 매수 시도 ({current_price} USD)")
+                                success, odno = buy_order(TICKER, qty, EXCHANGE, current_price)
+                                if success:
+                                    # 체결은 추적기가 끝까지 따라가며 이벤트로 알려줌 → (3) 에서 포지션 반영
+                                    pending_buy = fills.track(odno, TICKER, EXCHANGE, "buy", qty, current_price)
+                                    journal.order(odno, TICKER, EXCHANGE, "buy", qty, current_price)
+                                    cancel_sent = False
+                                    send_discord_message(f"⏳ {TICKER} 주문번호 {odno} 체결 대기 (최대 {FILL_TIMEOUT}초 후 잔량 취소)")
                                 else:
-                                    send_discord_message(f"❗체결내역 없음: 주문번호 {odno}")
-
-
-                            else:
-                                send_discord_message(f"❗ {TICKER} 매수 실패 → 포지션 미등록")
+                                    send_discord_message(f"❗ {TICKER} 매수 실패 → 포지션 미등록")
 
+            metrics.observe("loop_iteration_seconds", time.perf_counter() - loop_start)
             time.sleep(REALTIME_INTERVAL)
 
         except Exception as e:
@@ -0,0 +1,135 @@
+import os
+import sys
+import random
+import tempfile
+import importlib
+import yaml
+
+# -----------------------------
+# KIS 응답 대역 (네트워크 없이 파싱/추적 경로 측정용)
+# -----------------------------
+# 각 모듈의 fetch= 주입 지점에 그대로 넘길 수 있는 형태
+#   AccountState(fetch=balance_fetcher(...))
+#   FillTracker(fetch=ccnl_fetcher(...))
+#   QuoteCache(fetch=price_fetcher(...))
+
+# KIS 모듈은 import 할 때 현재 디렉터리의 config.yaml 을 읽음 → 없으면 이 가짜 값으로 import (네트워크 안 씀)
+STUB_CONFIG = {
+    "APP_KEY": "benchmark-app-key",
+    "APP_SECRET": "benchmark-app-secret",
+    "CANO": "00000000",
+    "ACNT_PRDT_CD": "01",
+    "DISCORD_WEBHOOK_URL": "http://127.0.0.1:9/discord",
+    "URL_BASE": "http://127.0.0.1:9",
+    "ACCESS_TOKEN": "benchmark-token",
+}
+KIS_MODULES = ("utils.http_client", "utils.api", "utils.order_api", "utils.account", "utils.fills", "utils.quotes")
+
+
+def import_kis_modules():
+    """
+    KIS 모듈을 미리 import. config.yaml 이 없으면 (깨끗한 체크아웃, CI)
+    STUB_CONFIG 로 만든 config.yaml 이 있는 임시 디렉터리에서 import 한 뒤 원래 디렉터리로 복귀
+    반환: 가짜 설정을 썼으면 True
+    """
+    if os.path.exists("config.yaml"):
+        for name in KIS_MODULES:
+            importlib.import_module(name)
+        return False
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "config.yaml"), "w", encoding="utf-8") as f:
+            yaml.safe_dump(STUB_CONFIG, f)
+        os.chdir(directory)
+        try:
+            for name in KIS_MODULES:
+                importlib.import_module(name)
+        finally:
+            os.chdir(cwd)
+    return True
+
+
+def present_balance(n_holdings=20, cash=25_000.0, seed=0):
+    """
+    체결기준현재잔고(CTRP6504R) 응답 JSON
+    """
+    rng = random.Random(seed)
+    output1 = []
+    for i in range(n_holdings):
+        qty = rng.randint(1, 300)
+        avg = rng.uniform(2, 400)
+        now = avg * rng.uniform(0.8, 1.2)
+        output1.append({
+            "pdno": f"SYM{i:03d}",
+            "prdt_name": f"SYNTHETIC {i}",
+            "ovrs_excg_cd": rng.choice(["NASD", "NYSE", "AMEX"]),
+            "ccld_qty_smtl1": str(qty),
+            "ord_psbl_qty1": str(qty),
+            "frcr_pchs_amt": f"{avg * qty:.4f}",
+            "ovrs_now_pric1": f"{now:.4f}",
+            "frcr_evlu_amt2": f"{now * qty:.4f}",
+            "evlu_pfls_rt1": f"{(now / avg - 1) * 100:.2f}",
+        })
+    return {
+        "rt_cd": "0",
+        "output1": output1,
+        "output2": [{"crcy_cd": "USD", "frcr_dncl_amt_2": f"{cash:.2f}"}],
+        "output3": {"dncl_amt": "0"},
+    }
+
+
+def ccnl_rows(order_numbers, symbol="SYN", n_other=60, seed=0):
+    """
+    주문체결내역(TTTS3035R) output 행 목록 (최신 주문 먼저)
+      - order_numbers : 추적 중인 주문 (전량 체결)
+      - n_other       : 같은 종목의 다른(이미 끝난) 주문 행 → 페이지 넘김 비용
+    """
+    rng = random.Random(seed)
+    rows = []
+    for k in range(n_other):
+        rows.append({"odno": f"{9_000_000 + k:010d}", "orgn_odno": "", "pdno": symbol,
+                     "ft_ord_qty": "10", "ft_ccld_qty": "10", "ft_ccld_amt3": "100.0000",
+                     "nccs_qty": "0", "prcs_stat_name": "완료", "rvse_cncl_dvsn": "00"})
+    for odno in order_numbers:
+        qty = rng.randint(1, 50)
+        price = rng.uniform(5, 50)
+        rows.append({"odno": odno, "orgn_odno": "", "pdno": symbol,
+                     "ft_ord_qty": str(qty), "ft_ccld_qty": str(qty), "ft_ccld_amt3": f"{qty * price:.4f}",
+                     "nccs_qty": "0", "prcs_stat_name": "완료", "rvse_cncl_dvsn": "00"})
+    rows.reverse()
+    return rows
+
+
+def price_response(last=10.0):
+    """
+    해외주식 현재체결가(HHDFS00000300) 응답 JSON
+    """
+    return {"rt_cd": "0", "output": {"rsym": "DNASSYN", "zdiv": "4", "base": f"{last:.4f}",
+                                     "last": f"{last:.4f}", "sign": "2", "diff": "0.0100",
+                                     "rate": "0.10", "tvol": "123456", "ordy": "매수가능"}}
+
+
+def balance_fetcher(data):
+    return lambda: data
+
+
+def ccnl_fetcher(rows, page_size=20):
+    """
+    iter_ccnl 대역: page_size 행씩 넘기는 제너레이터 (페이지 단위로 끊어 읽는 경로 재현)
+    """
+    def fetch(symbol, exchange, start_date=None, end_date=None, max_pages=10):
+        for page in range(max_pages):
+            chunk = rows[page * page_size:(page + 1) * page_size]
+            if not chunk:
+                return
+            yield from chunk
+    return fetch
+
+
+def price_fetcher(last=10.0):
+    data = price_response(last)
+    return lambda endpoint, symbol, exchange: float(data["output"]["last"])
@@ -0,0 +1,151 @@
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fixtures
+from benchmarks.run import quiet, patched
+from mock.kis_server import MockKisServer
+
+# -----------------------------
+# 주문 경로 부하 테스트 (대역 KIS 서버 대상, 종단간 처리량 / 꼬리 지연)
+# -----------------------------
+# 실행: 저장소 루트에서  python -m benchmarks.order_load --orders 200 --workers 8 (config.yaml 없으면 가짜 설정)
+# 실제 buy_order / cancel_order / get_current_price / FillTracker 를 그대로 쓰고 URL 만 대역 서버로 바꿈
+#   주문 1건 = 현재가 조회 → 매수 → 체결 추적 → fill_timeout 후 미체결 잔량 취소 → 종료(체결/취소/거부)까지
+
+
+def percentile(samples, q):
+    if not samples:
+        return float("nan")
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+class LoadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}           # 이름 → [지연(초)...]
+        self.outcomes = {}        # 종료 상태 → 건수
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.calls.setdefault(name, []).append(seconds)
+
+    def outcome(self, kind):
+        with self._lock:
+            self.outcomes[kind] = self.outcomes.get(kind, 0) + 1
+
+
+def timed_call(stats, name, func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        stats.add(name, time.perf_counter() - start)
+
+
+def run_order(stats, tracker, symbol, exchange, qty, fill_timeout):
+    from utils.api import get_current_price
+    from utils.order_api import buy_order, cancel_order
+
+    start = time.perf_counter()
+    price = timed_call(stats, "get_current_price", get_current_price, symbol, exchange)
+    success, odno = timed_call(stats, "buy_order", buy_order, symbol, qty, exchange, price or "0")
+    if not success:
+        stats.outcome("rejected_at_order")
+        stats.add("order_to_done", time.perf_counter() - start)
+        return
+
+    order = tracker.track(odno, symbol, exchange, "buy", qty, price)
+    tracker.wait(odno, timeout=fill_timeout)
+    if not order.done and order.remaining > 0:
+        ok, _ = timed_call(stats, "cancel_order", cancel_order, symbol, odno, order.remaining, exchange)
+        if ok:
+            tracker.refresh()
+        tracker.wait(odno, timeout=fill_timeout * 3)
+
+    if not order.done:
+        stats.outcome("timeout")
+    elif order.filled_qty >= order.qty:
+        stats.outcome("filled")
+    elif order.status == "거부":
+        stats.outcome("rejected")
+    else:
+        stats.outcome("partial+cancelled" if order.filled_qty else "cancelled")
+    stats.add("order_to_done", time.perf_counter() - start)
+
+
+def report(stats, server, elapsed, orders):
+    print(f"\n{'call':<20} {'n':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for name, samples in sorted(stats.calls.items()):
+        print(f"{name:<20} {len(samples):>6}"
+              + "".join(f" {percentile(samples, q) * 1000:>7.1f}ms" for q in (0.5, 0.9, 0.99))
+              + f" {max(samples) * 1000:>7.1f}ms")
+    print(f"\n📦 주문 {orders}건 / {elapsed:.2f}s → {orders / elapsed:.1f} orders/s")
+    print("   결과: " + ", ".join(f"{k} {v}" for k, v in sorted(stats.outcomes.items())))
+    server_stats = server.stats()
+    print(f"   서버: 호출 {sum(server_stats['calls'].values())}건, 한도 초과 {server_stats['throttled']}건,"
+          f" 접수 거부 {server_stats['rejected']}건")
+    for path, count in sorted(server_stats["calls"].items()):
+        print(f"     {path:<52} {count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대역 KIS 서버 대상 주문 처리량 / 지연 부하 테스트")
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--symbols", nargs="+", default=["SYNA", "SYNB", "SYNC"])
+    parser.add_argument("--qty", type=int, default=10)
+    parser.add_argument("--fill-timeout", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--fill-delay", type=float, default=0.5)
+    parser.add_argument("--partial-rate", type=float, default=0.2)
+    parser.add_argument("--reject-rate", type=float, default=0.02)
+    parser.add_argument("--late-reject-rate", type=float, default=0.02)
+    parser.add_argument("--server-rate-limit", type=int, default=20, help="대역 서버 초당 한도 (0 = 없음)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--client-rate", type=float, default=None,
+                        help="클라이언트 rate_limiter 초당 한도 (기본 = config 값 그대로)")
+    args = parser.parse_args(argv)
+
+    fixtures.import_kis_modules()
+    from utils import http_client, order_api
+    from utils.fills import FillTracker
+    from utils.rate_limit import RateLimiter
+
+    server = MockKisServer(port=0, latency=args.latency, jitter=args.jitter, fill_delay=args.fill_delay,
+                           partial_rate=args.partial_rate, reject_rate=args.reject_rate,
+                           late_reject_rate=args.late_reject_rate,
+                           rate_limit=args.server_rate_limit or None, throttle_rate=args.throttle_rate).start()
+    limiter = http_client.rate_limiter
+    if args.client_rate:
+        limiter = RateLimiter(global_rate=args.client_rate, order_rate=args.client_rate,
+                              quote_rate=args.client_rate, order_reserve=0)
+
+    stats = LoadStats()
+    tracker = FillTracker(poll_interval=0.2, max_interval=1.0).start()
+    print(f"🧪 대역 서버 {server.url} | 주문 {args.orders}건 x 동시 {args.workers}")
+    try:
+        with patched(http_client, "url_base", server.url), patched(http_client, "rate_limiter", limiter), \
+                patched(order_api, "send_discord_message", lambda *a, **k: None), quiet():
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                futures = [pool.submit(run_order, stats, tracker, args.symbols[k % len(args.symbols)], "NAS",
+                                       args.qty, args.fill_timeout)
+                           for k in range(args.orders)]
+                for future in futures:
+                    future.result()
+            elapsed = time.perf_counter() - start
+    finally:
+        tracker.stop()
+        server.stop()
+
+    report(stats, server, elapsed, args.orders)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import SIZES, synthetic_ohlcv, prepared_frame
+from benchmarks import fixtures
+
+# -----------------------------
+# 핫패스 벤치마크 (오프라인, 합성 데이터 + KIS 응답 대역)
+# -----------------------------
+# 실행: 저장소 루트에서  python -m benchmarks.run [--sizes 1d 60d] [--only optimize] [--save-baseline]
+#   config.yaml 이 없어도 됨 (KIS 모듈은 fixtures.STUB_CONFIG 로 import)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REGRESSION_THRESHOLD = 1.25   # 기준 대비 이 배수 이상 느려지면 회귀로 표시
+
+Benchmark = namedtuple("Benchmark", ["name", "setup", "sizes"])
+# setup(n_bars) → (run, units)  run(): 1회 실행 / units: {"bars": .., "combos": .., "calls": ..} (1회 실행당 처리량)
+Result = namedtuple("Result", ["name", "size", "wall_s", "peak_mb", "units"])
+
+BENCHMARKS = []
+
+
+def benchmark(name, sizes=tuple(SIZES)):
+    def decorator(setup):
+        BENCHMARKS.append(Benchmark(name, setup, tuple(sizes)))
+        return setup
+    return decorator
+
+
+@contextmanager
+def quiet():
+    """
+    최적화 함수의 tqdm / print 출력 숨김
+    """
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        yield
+
+
+@contextmanager
+def patched(module, name, value):
+    original = getattr(module, name)
+    setattr(module, name, value)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+# -----------------------------
+# 지표 / 시그널 / 판정
+# -----------------------------
+@benchmark("add_indicators")
+def bench_add_indicators(n_bars):
+    from utils.helpers import add_indicators
+    raw = synthetic_ohlcv(n_bars).rename(columns={"Close": "close", "High": "high", "Low": "low"})
+    return lambda: add_indicators(raw.copy()), {"bars": n_bars}
+
+
+@benchmark("compute_buy_signals[combo]")
+def bench_compute_buy_signals(n_bars):
+    from utils.helpers import compute_buy_signals
+    df = prepared_frame(synthetic_ohlcv(n_bars))
+    return lambda: compute_buy_signals(df, mode="combo"), {"bars": len(df)}
+
+
+@benchmark("check_buy_condition")
+def bench_check_buy_condition(n_bars, calls=1_000):
+    from utils.helpers import check_buy_condition, column_values
+    df = prepared_frame(synthetic_ohlcv(n_bars))
+    price = float(column_values(df, "close")[-1])
+
+    def run():
+        for _ in range(calls):
+            check_buy_condition(df, price, mode="combo")
+    return run, {"calls": calls}
+
+
+@benchmark("tick_evaluator.check", sizes=("60d",))
+def bench_tick_evaluator(n_bars, calls=100_000):
+    from utils.tick import TickEvaluator
+    evaluator = TickEvaluator("combo", window=calls)
+    evaluator.update(prepared_frame(synthetic_ohlcv(n_bars)))
+    prices = [evaluator.value("close") * (1 + k * 1e-6) for k in range(calls)]
+
+    def run():
+        for price in prices:
+            evaluator.check(price)
+    return run, {"calls": calls}
+
+
+@benchmark("check_sell_condition", sizes=("60d",))
+def bench_check_sell_condition(n_bars, calls=100_000):
+    from utils.helpers import check_sell_condition
+    prices = [10.0 * (1 + 0.0001 * (k % 500 - 250)) for k in range(calls)]
+
+    def run():
+        for price in prices:
+            check_sell_condition(10.0, price, 1.0, -3.0)
+    return run, {"calls": calls}
+
+# -----------------------------
+# 최적화
+# -----------------------------
+TP_VALUES = np.arange(0.5, 2.0, 0.5)
+SL_VALUES = np.arange(-5.0, -1.0, 1.0)
+
+
+@benchmark("simulate_thresholds_batch")
+def bench_simulate_grid(n_bars):
+    from utils.helpers import compute_buy_signals, simulate_thresholds_batch, column_values
+    df = prepared_frame(synthetic_ohlcv(n_bars))
+    highs, lows = column_values(df, "high"), column_values(df, "low")
+    signals = compute_buy_signals(df, mode="ma5_touch")
+    combos = len(TP_VALUES) * len(SL_VALUES)
+    return (lambda: simulate_thresholds_batch(highs, lows, signals, TP_VALUES, SL_VALUES),
+            {"bars": len(df), "combos": combos})
+
+
+@benchmark("optimize_thresholds_bruteforce")
+def bench_bruteforce(n_bars):
+    from utils import helpers
+    from utils.strategies import strategy_names
+    df = prepared_frame(synthetic_ohlcv(n_bars))
+    combos = len(strategy_names(optimizable_only=True)) * len(TP_VALUES) * len(SL_VALUES)
+
+    def run():
+        with patched(helpers, "fetch_data", lambda *a, **k: df), quiet():
+            helpers.optimize_thresholds_bruteforce("SYN")
+    return run, {"bars": len(df), "combos": combos}
+
+# -----------------------------
+# KIS 응답 처리 (main 에서 fixtures.import_kis_modules 로 먼저 import)
+# -----------------------------
+@benchmark("account.parse_snapshot", sizes=("1d",))
+def bench_parse_snapshot(n_bars, calls=2_000):
+    from utils.account import parse_snapshot
+    data = fixtures.present_balance(n_holdings=50)
+
+    def run():
+        for _ in range(calls):
+            parse_snapshot(data)
+    return run, {"calls": calls}
+
+
+@benchmark("fills.poll_once", sizes=("1d",))
+def bench_fill_poll(n_bars, orders=20, polls=50):
+    from utils.fills import FillTracker
+    numbers = [f"{1_000_000 + k:010d}" for k in range(orders)]
+    fetch = fixtures.ccnl_fetcher(fixtures.ccnl_rows(numbers, n_other=120))
+
+    def run():
+        for _ in range(polls):
+            tracker = FillTracker(fetch=fetch)
+            for odno in numbers:
+                tracker.track(odno, "SYN", "NAS", "buy", 1, 10.0)
+            tracker.poll_once()
+    return run, {"calls": polls}
+
+
+@benchmark("quotes.get_price[hit]", sizes=("1d",))
+def bench_quote_hits(n_bars, calls=100_000):
+    from utils.quotes import QuoteCache
+    cache = QuoteCache(max_age=3600, fetch=fixtures.price_fetcher(12.5))
+    cache.get_price("SYN", "NAS")
+
+    def run():
+        for _ in range(calls):
+            cache.get_price("SYN", "NAS")
+    return run, {"calls": calls}
+
+# -----------------------------
+# 측정 / 기준 비교
+# -----------------------------
+def measure(bench, size, repeat=3):
+    """
+    준비(setup)는 측정 밖, 1회 예열 후 repeat 회 중 최소 시간
+    peak 메모리는 tracemalloc 로 별도 1회 (시간 측정과 분리)
+    """
+    run, units = bench.setup(SIZES[size])
+    run()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return Result(bench.name, size, best, peak / 2 ** 20, units)
+
+
+def throughput(result):
+    parts = []
+    for unit, count in result.units.items():
+        if unit == "combos":
+            parts.append(f"{count / result.wall_s:,.0f} combos/s")
+        elif unit == "bars" and "combos" in result.units:
+            parts.append(f"{count * result.units['combos'] / result.wall_s:,.0f} bar·combos/s")
+        else:
+            parts.append(f"{count / result.wall_s:,.0f} {unit}/s")
+    return ", ".join(parts)
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("results", {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    data = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": f"{platform.system()} {platform.machine()}",
+        },
+        "results": {f"{r.name}@{r.size}": {"wall_s": r.wall_s, "peak_mb": r.peak_mb, "units": r.units}
+                    for r in results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def compare(result, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    반환: (비율 문자열, 회귀 여부)
+    """
+    base = baseline.get(f"{result.name}@{result.size}")
+    if not base:
+        return "기준 없음", False
+    ratio = result.wall_s / base["wall_s"]
+    if ratio >= threshold:
+        return f"🔺 x{ratio:.2f} 느려짐", True
+    if ratio <= 1 / threshold:
+        return f"🔻 x{ratio:.2f} 빨라짐", False
+    return f"x{ratio:.2f}", False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="트레이딩 핫패스 오프라인 벤치마크")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--only", nargs="+", default=None, help="이름에 이 문자열이 들어간 벤치마크만")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준으로 저장")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료 코드 1")
+    args = parser.parse_args(argv)
+
+    if fixtures.import_kis_modules():
+        print("🧪 config.yaml 없음 → KIS 모듈은 가짜 설정으로 import (네트워크 호출 없음)")
+    baseline = load_baseline(args.baseline)
+    results = []
+    regressions = 0
+    print(f"{'benchmark':<32} {'size':>4} {'wall':>10} {'peak':>9}  {'vs baseline':<16} throughput")
+    for bench in BENCHMARKS:
+        if args.only and not any(key in bench.name for key in args.only):
+            continue
+        for size in bench.sizes:
+            if size not in args.sizes:
+                continue
+            try:
+                result = measure(bench, size, repeat=args.repeat)
+            except ImportError as e:    # 선택 의존성(패키지) 미설치만 건너뜀
+                print(f"{bench.name:<32} {size:>4}  건너뜀 ({type(e).__name__}: {e})")
+                continue
+            results.append(result)
+            status, regressed = compare(result, baseline, args.threshold)
+            regressions += regressed
+            print(f"{result.name:<32} {size:>4} {result.wall_s * 1000:>8.2f}ms {result.peak_mb:>7.2f}MB"
+                  f"  {status:<16} {throughput(result)}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"💾 기준 저장: {args.baseline} ({len(results)}건)")
+    if regressions:
+        print(f"⚠️ 회귀 {regressions}건 (기준 대비 x{args.threshold} 이상)")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
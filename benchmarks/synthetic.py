@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# 결정적 합성 OHLCV (yf.download 와 같은 모양)
+# -----------------------------
+BARS_PER_DAY = 78          # 5분봉 정규장 (09:30 ~ 16:00)
+TRADING_DAYS_PER_YEAR = 252
+
+SIZES = {
+    "1d": BARS_PER_DAY,
+    "60d": BARS_PER_DAY * 60,
+    "2y": BARS_PER_DAY * TRADING_DAYS_PER_YEAR * 2,
+}
+
+
+def session_index(n_bars, start="2024-01-02"):
+    """
+    평일 정규장 5분봉 시각 n_bars 개 (America/New_York)
+    """
+    days = pd.bdate_range(start, periods=n_bars // BARS_PER_DAY + 1)
+    offsets = pd.Timedelta(hours=9, minutes=30) + pd.to_timedelta(np.arange(BARS_PER_DAY) * 5, unit="min")
+    stamps = (days.values[:, None] + offsets.values[None, :]).reshape(-1)[:n_bars]
+    return pd.DatetimeIndex(stamps).tz_localize("America/New_York").rename("Datetime")
+
+
+def synthetic_ohlcv(n_bars, seed=0, ticker="SYN", start_price=10.0, volatility=0.003, multi_index=True):
+    """
+    기하 랜덤워크 종가 + 봉 내부 고가/저가 (seed 가 같으면 항상 같은 데이터)
+    multi_index=True 면 yfinance 단일 종목 다운로드처럼 (Price, Ticker) MultiIndex 컬럼
+    """
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n_bars)))
+    open_ = np.r_[start_price, close[:-1]]
+    spread = np.abs(rng.normal(0, volatility * 0.7, (2, n_bars)))
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    volume = rng.integers(1_000, 50_000, n_bars)
+
+    data = {"Adj Close": close, "Close": close, "High": high, "Low": low, "Open": open_, "Volume": volume}
+    df = pd.DataFrame(data, index=session_index(n_bars))
+    if multi_index:
+        df.columns = pd.MultiIndex.from_product([df.columns, [ticker]], names=["Price", "Ticker"])
+    return df
+
+
+def prepared_frame(raw):
+    """
+    fetch_data 의 다운로드 이후 단계와 동일 (컬럼명 변경 + datetime + add_indicators)
+    """
+    from utils.helpers import add_indicators
+    data = raw.rename(columns={"Close": "close", "High": "high", "Low": "low"})
+    data["datetime"] = data.index
+    return add_indicators(data)
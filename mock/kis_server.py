@@ -0,0 +1,426 @@
+import json
+import time
+import random
+import argparse
+import datetime
+import threading
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -----------------------------
+# 오프라인 부하/지연 테스트용 KIS REST 대역 서버
+# -----------------------------
+# 실제/모의(openapivts) 도메인에 대량 주문을 낼 수 없고, 모의투자 미지원 TR(지정가체결내역조회 등)도 있어서
+# 주문 / 정정취소 / 주문체결내역 / 지정가체결내역 / 체결기준현재잔고 / 현재체결가 / 토큰 발급을
+# 같은 요청·응답 필드(rt_cd, ODNO, output, nccs_qty, ft_ccld_qty ...)로 흉내 냄
+#   - latency / jitter      : 응답마다 latency + 지수분포(평균 jitter) 초 지연
+#   - fill_delay            : 주문 후 이 시간에 걸쳐 조금씩 체결 (조회 시점 기준으로 계산)
+#   - partial_rate          : 이 비율의 주문은 일부만 체결되고 나머지는 미체결로 남음 (취소 테스트용)
+#   - reject_rate           : 이 비율의 주문은 접수 단계에서 거부 (rt_cd="1")
+#   - late_reject_rate      : 접수는 되지만 체결내역에서 "거부" 로 끝나는 비율
+#   - rate_limit            : 초당 호출 한도 (넘으면 HTTP 500 + EGW00201), throttle_rate 는 무작위 한도 초과 응답 비율
+# 실행: python -m mock.kis_server --port 18090 --latency 0.03 → config.yaml 의 URL_BASE 를 http://127.0.0.1:18090 으로
+PATH_TOKEN = "/oauth2/tokenP"
+PATH_ORDER = "/uapi/overseas-stock/v1/trading/order"
+PATH_CANCEL = "/uapi/overseas-stock/v1/trading/order-rvsecncl"
+PATH_CCNL = "/uapi/overseas-stock/v1/trading/inquire-ccnl"
+PATH_ALGO_CCNL = "/uapi/overseas-stock/v1/trading/inquire-algo-ccnl"
+PATH_BALANCE = "/uapi/overseas-stock/v1/trading/inquire-present-balance"
+PATH_PRICE = "/uapi/overseas-price/v1/quotations/price"
+
+SELL_TR_IDS = ("TTTT1006U", "VTTT1006U")   # 나머지 주문 TR 은 매수로 처리
+THROTTLE_CODE = "EGW00201"
+
+
+class MockOrder:
+    """
+    대역 서버 안의 주문 1건 (체결수량은 조회 시점에 fill_delay 비율로 계산)
+    """
+
+    def __init__(self, odno, symbol, exchange, side, qty, price, target_qty, rejected=False):
+        self.odno = odno
+        self.symbol = symbol
+        self.exchange = exchange
+        self.side = side                  # "buy" / "sell"
+        self.qty = qty
+        self.price = price
+        self.target_qty = target_qty      # 결국 체결될 수량 (부분체결 주문은 qty 보다 작음)
+        self.rejected = rejected
+        self.cancelled_at = None
+        self.created = time.monotonic()
+        self.ord_dt = datetime.datetime.now().strftime("%Y%m%d")
+        self.ord_tmd = datetime.datetime.now().strftime("%H%M%S")
+        self.settled = 0                  # 잔고/현금에 이미 반영한 체결수량
+        self.cancel_odno = None
+        self.orgn_odno = ""
+
+    def filled(self, now, fill_delay):
+        if self.rejected:
+            return 0
+        end = now if self.cancelled_at is None else min(now, self.cancelled_at)
+        if fill_delay <= 0:
+            return self.target_qty
+        return min(self.target_qty, int(self.target_qty * (end - self.created) / fill_delay))
+
+    def done(self, now, fill_delay):
+        return self.rejected or self.cancelled_at is not None or self.filled(now, fill_delay) >= self.qty
+
+
+class MockKisServer:
+    """
+    KIS REST 대역 (ThreadingHTTPServer, keep-alive)
+      - start() / stop() 으로 테스트 안에서 백그라운드 실행, url 을 http_client.url_base 로 지정
+      - stats() 로 경로별 호출 수 / 한도 초과 / 거부 수 확인
+    """
+
+    def __init__(self, host="127.0.0.1", port=18090, latency=0.02, jitter=0.01,
+                 fill_delay=1.0, partial_rate=0.2, reject_rate=0.02, late_reject_rate=0.0,
+                 rate_limit=20, throttle_rate=0.0, page_size=20, cash=100_000.0,
+                 start_price=10.0, seed=0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.fill_delay = fill_delay
+        self.partial_rate = partial_rate
+        self.reject_rate = reject_rate
+        self.late_reject_rate = late_reject_rate
+        self.rate_limit = rate_limit
+        self.throttle_rate = throttle_rate
+        self.page_size = page_size
+        self.start_price = start_price
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._orders = {}                 # odno → MockOrder
+        self._sequence = []               # 접수 순서 (취소 주문 포함)
+        self._next_odno = 30_000_000
+        self._prices = {}
+        self._holdings = {}               # 종목 → [수량, 매입금액, 거래소]
+        self._cash = float(cash)
+        self._calls = deque()             # 최근 1초 호출 시각 (한도 계산)
+        self.counts = {}
+        self.throttled = 0
+        self.rejected = 0
+
+        self._server = None
+        self._thread = None
+
+    # -----------------------------
+    # 공통
+    # -----------------------------
+    def _delay(self):
+        with self._lock:
+            extra = self._random.expovariate(1 / self.jitter) if self.jitter > 0 else 0.0
+        wait = self.latency + extra
+        if wait > 0:
+            time.sleep(wait)
+
+    def _over_limit(self):
+        """
+        최근 1초 호출 수가 rate_limit 을 넘거나 무작위 한도 초과에 걸리면 True
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] >= 1.0:
+                self._calls.popleft()
+            self._calls.append(now)
+            over = (self.rate_limit is not None and len(self._calls) > self.rate_limit) \
+                or (self.throttle_rate > 0 and self._random.random() < self.throttle_rate)
+            if over:
+                self.throttled += 1
+        return over
+
+    def _new_odno(self):
+        self._next_odno += 1
+        return f"{self._next_odno:010d}"
+
+    def _price(self, symbol):
+        price = self._prices.get(symbol, self.start_price)
+        price = round(max(0.01, price * (1 + self._random.gauss(0, 0.001))), 4)
+        self._prices[symbol] = price
+        return price
+
+    def _settle(self, now):
+        """
+        새로 늘어난 체결분을 잔고 / 현금에 반영 (락 안에서 호출)
+        """
+        for order in self._orders.values():
+            if order.rejected or order.settled >= order.target_qty:
+                continue
+            filled = order.filled(now, self.fill_delay)
+            delta = filled - order.settled
+            if delta <= 0:
+                continue
+            order.settled = filled
+            holding = self._holdings.setdefault(order.symbol, [0, 0.0, order.exchange])
+            if order.side == "buy":
+                holding[0] += delta
+                holding[1] += delta * order.price
+                self._cash -= delta * order.price
+            else:
+                avg = holding[1] / holding[0] if holding[0] else order.price
+                sold = min(delta, holding[0])
+                holding[0] -= sold
+                holding[1] -= sold * avg
+                self._cash += delta * order.price
+            if holding[0] <= 0:
+                self._holdings.pop(order.symbol, None)
+
+    # -----------------------------
+    # 주문 / 정정취소
+    # -----------------------------
+    def _order(self, tr_id, body):
+        qty = int(body.get("ORD_QTY", "0") or 0)
+        symbol = body.get("PDNO", "")
+        side = "sell" if tr_id in SELL_TR_IDS else "buy"
+        with self._lock:
+            price = float(body.get("OVRS_ORD_UNPR", "0") or 0) or self._price(symbol)
+            if qty <= 0 or self._random.random() < self.reject_rate:
+                self.rejected += 1
+                return {"rt_cd": "1", "msg_cd": "APBK0918", "msg1": "주문가능금액을 초과 하였습니다."}
+            target = qty
+            if self._random.random() < self.partial_rate:
+                target = self._random.randint(0, qty - 1)
+            late_reject = self._random.random() < self.late_reject_rate
+            order = MockOrder(self._new_odno(), symbol, body.get("OVRS_EXCG_CD", ""), side, qty, price,
+                              target, rejected=late_reject)
+            self._orders[order.odno] = order
+            self._sequence.append(order)
+        return {"rt_cd": "0", "msg_cd": "APBK0013", "msg1": "주문 전송 완료 되었습니다.",
+                "output": {"KRX_FWDG_ORD_ORGNO": "01790", "ODNO": order.odno, "ORD_TMD": order.ord_tmd}}
+
+    def _cancel(self, tr_id, body):
+        now = time.monotonic()
+        with self._lock:
+            original = self._orders.get(str(body.get("ORGN_ODNO", "")).zfill(10))
+            if original is None or original.done(now, self.fill_delay):
+                return {"rt_cd": "1", "msg_cd": "APBK1017", "msg1": "정정/취소할 수량이 없습니다."}
+            self._settle(now)
+            original.cancelled_at = now
+            cancel = MockOrder(self._new_odno(), original.symbol, original.exchange, original.side,
+                               original.qty - original.filled(now, self.fill_delay), 0.0, 0)
+            cancel.orgn_odno = original.odno
+            original.cancel_odno = cancel.odno
+            self._sequence.append(cancel)
+        return {"rt_cd": "0", "msg_cd": "APBK0013", "msg1": "주문 전송 완료 되었습니다.",
+                "output": {"KRX_FWDG_ORD_ORGNO": "01790", "ODNO": cancel.odno, "ORD_TMD": cancel.ord_tmd}}
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def _ccnl_row(self, order, now):
+        if order.orgn_odno:
+            # 취소 주문 행
+            return {"ord_dt": order.ord_dt, "ord_gno_brno": "01790", "odno": order.odno,
+                    "orgn_odno": order.orgn_odno, "sll_buy_dvsn_cd": "01" if order.side == "sell" else "02",
+                    "rvse_cncl_dvsn": "02", "rvse_cncl_dvsn_name": "취소", "pdno": order.symbol,
+                    "ft_ord_qty": str(order.qty), "ft_ord_unpr3": "0", "ft_ccld_qty": "0",
+                    "ft_ccld_unpr3": "0", "ft_ccld_amt3": "0", "nccs_qty": "0", "prcs_stat_name": "완료",
+                    "rjct_rson": "", "ord_tmd": order.ord_tmd, "ovrs_excg_cd": order.exchange}
+        filled = order.filled(now, self.fill_delay)
+        done = order.done(now, self.fill_delay)
+        remaining = 0 if done else order.qty - filled
+        return {"ord_dt": order.ord_dt, "ord_gno_brno": "01790", "odno": order.odno, "orgn_odno": "",
+                "sll_buy_dvsn_cd": "01" if order.side == "sell" else "02",
+                "rvse_cncl_dvsn": "00", "rvse_cncl_dvsn_name": "", "pdno": order.symbol,
+                "ft_ord_qty": str(order.qty), "ft_ord_unpr3": f"{order.price:.4f}",
+                "ft_ccld_qty": str(filled), "ft_ccld_unpr3": f"{order.price:.4f}" if filled else "0",
+                "ft_ccld_amt3": f"{filled * order.price:.4f}", "nccs_qty": str(remaining),
+                "prcs_stat_name": "거부" if order.rejected else ("완료" if done else "접수"),
+                "rjct_rson": "주문가능수량 부족" if order.rejected else "",
+                "ord_tmd": order.ord_tmd, "ovrs_excg_cd": order.exchange}
+
+    def _ccnl(self, params, headers):
+        """
+        SORT_SQN=AS → 최신 주문부터, 연속조회는 CTX_AREA_NK200 = 다음 시작 위치
+        """
+        now = time.monotonic()
+        symbol = params.get("PDNO", "")
+        with self._lock:
+            self._settle(now)
+            rows = [o for o in self._sequence if not symbol or o.symbol == symbol]
+            if params.get("SORT_SQN", "AS") == "AS":
+                rows.reverse()
+            start = int(params.get("CTX_AREA_NK200", "").strip() or 0) if headers.get("tr_cont") == "N" else 0
+            page = [self._ccnl_row(o, now) for o in rows[start:start + self.page_size]]
+        nxt = start + self.page_size
+        more = nxt < len(rows)
+        body = {"rt_cd": "0", "msg_cd": "KIOK0000", "msg1": "조회가 완료되었습니다",
+                "ctx_area_fk200": f"{symbol}" if more else "", "ctx_area_nk200": str(nxt) if more else "",
+                "output": page}
+        return body, {"tr_cont": ("F" if start == 0 else "M") if more else "D"}
+
+    def _algo_ccnl(self, params, headers):
+        """
+        지정가체결내역조회 (모의투자 미지원 TR) — ODNO 주문의 체결 요약
+        """
+        now = time.monotonic()
+        odno = str(params.get("ODNO", "")).zfill(10) if params.get("ODNO") else ""
+        with self._lock:
+            self._settle(now)
+            orders = [o for o in self._sequence
+                      if not o.orgn_odno and not o.rejected and (not odno or o.odno == odno)]
+            output, output3 = [], []
+            for o in orders:
+                filled = o.filled(now, self.fill_delay)
+                if not filled:
+                    continue
+                output.append({"CCLD_SEQ": "1", "CCLD_BTWN": o.ord_tmd, "PDNO": o.symbol, "ITEM_NAME": o.symbol,
+                               "FT_CCLD_QTY": str(filled), "FT_CCLD_UNPR3": f"{o.price:.4f}",
+                               "FT_CCLD_AMT3": f"{filled * o.price:.4f}"})
+                output3.append({"ODNO": o.odno, "TRAD_DVSN_NAME": "매도" if o.side == "sell" else "매수",
+                                "PDNO": o.symbol, "ITEM_NAME": o.symbol, "FT_ORD_QTY": str(o.qty),
+                                "FT_ORD_UNPR3": f"{o.price:.4f}", "ORD_TMD": o.ord_tmd, "SPLT_BUY_ATTR_NAME": "",
+                                "FT_CCLD_QTY": str(filled), "TR_CRCY": "USD", "FT_CCLD_UNPR3": f"{o.price:.4f}",
+                                "FT_CCLD_AMT3": f"{filled * o.price:.4f}", "CCLD_CNT": "1"})
+        return {"rt_cd": "0", "msg_cd": "KIOK0000", "msg1": "조회가 완료되었습니다",
+                "output": output, "output3": output3}, {"tr_cont": "D"}
+
+    def _balance(self, params, headers):
+        now = time.monotonic()
+        with self._lock:
+            self._settle(now)
+            output1 = []
+            for symbol, (qty, amount, exchange) in self._holdings.items():
+                last = self._prices.get(symbol, self.start_price)
+                output1.append({"pdno": symbol, "prdt_name": symbol, "ovrs_excg_cd": exchange,
+                                "ccld_qty_smtl1": str(qty), "ord_psbl_qty1": str(qty),
+                                "frcr_pchs_amt": f"{amount:.4f}", "ovrs_now_pric1": f"{last:.4f}",
+                                "frcr_evlu_amt2": f"{last * qty:.4f}",
+                                "evlu_pfls_rt1": f"{(last * qty / amount - 1) * 100 if amount else 0:.2f}"})
+            cash = self._cash
+        return {"rt_cd": "0", "msg_cd": "KIOK0000", "msg1": "조회가 완료되었습니다", "output1": output1,
+                "output2": [{"crcy_cd": "USD", "frcr_dncl_amt_2": f"{cash:.2f}"}],
+                "output3": {"dncl_amt": f"{cash:.2f}"}}, {}
+
+    def _quote(self, params, headers):
+        symbol = params.get("SYMB", "")
+        with self._lock:
+            last = self._price(symbol)
+        return {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.",
+                "output": {"rsym": f"D{params.get('EXCD', '')}{symbol}", "zdiv": "4",
+                           "base": f"{self.start_price:.4f}", "last": f"{last:.4f}", "sign": "2",
+                           "diff": f"{last - self.start_price:.4f}",
+                           "rate": f"{(last / self.start_price - 1) * 100:.2f}",
+                           "tvol": "123456", "ordy": "매수가능"}}, {}
+
+    # -----------------------------
+    # HTTP 처리
+    # -----------------------------
+    def handle(self, method, path, params, headers, body):
+        """
+        반환: (HTTP 상태, 응답 JSON, 추가 응답 헤더)
+        """
+        with self._lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+        self._delay()
+        if path == PATH_TOKEN:
+            return 200, {"access_token": "mock-token", "token_type": "Bearer", "expires_in": 86400,
+                         "access_token_token_expired": (datetime.datetime.now() + datetime.timedelta(days=1))
+                         .strftime("%Y-%m-%d %H:%M:%S")}, {}
+        if self._over_limit():
+            return 500, {"rt_cd": "1", "msg_cd": THROTTLE_CODE, "msg1": "초당 거래건수를 초과하였습니다."}, {}
+
+        tr_id = headers.get("tr_id", "")
+        if method == "POST" and path == PATH_ORDER:
+            return 200, self._order(tr_id, body), {"tr_id": tr_id}
+        if method == "POST" and path == PATH_CANCEL:
+            return 200, self._cancel(tr_id, body), {"tr_id": tr_id}
+        routes = {PATH_CCNL: self._ccnl, PATH_ALGO_CCNL: self._algo_ccnl,
+                  PATH_BALANCE: self._balance, PATH_PRICE: self._quote}
+        if method == "GET" and path in routes:
+            data, extra = routes[path](params, headers)
+            return 200, data, dict(extra, tr_id=tr_id)
+        return 404, {"rt_cd": "1", "msg_cd": "EGW00001", "msg1": f"지원하지 않는 경로: {method} {path}"}, {}
+
+    def stats(self):
+        with self._lock:
+            return {"calls": dict(self.counts), "throttled": self.throttled, "rejected": self.rejected,
+                    "orders": len(self._orders), "holdings": {s: h[0] for s, h in self._holdings.items()},
+                    "cash": self._cash}
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, method):
+                url = urlsplit(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+                status, data, extra = mock.handle(method, url.path, params, self.headers, body)
+                payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in extra.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._reply("GET")
+
+            def do_POST(self):
+                self._reply("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # -----------------------------
+    # 백그라운드 실행 (테스트용)
+    # -----------------------------
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]       # port=0 이면 빈 포트
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-kis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(5)
+            self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KIS REST 대역 서버 (주문/체결/잔고/시세)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18090)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--fill-delay", type=float, default=1.0)
+    parser.add_argument("--partial-rate", type=float, default=0.2)
+    parser.add_argument("--reject-rate", type=float, default=0.02)
+    parser.add_argument("--late-reject-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=20)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockKisServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                           fill_delay=args.fill_delay, partial_rate=args.partial_rate,
+                           reject_rate=args.reject_rate, late_reject_rate=args.late_reject_rate,
+                           rate_limit=args.rate_limit, throttle_rate=args.throttle_rate)
+    print(f"🧪 대역 KIS 서버 시작: {server.url}")
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,166 @@
+import json
+import random
+import asyncio
+import argparse
+import datetime
+import threading
+import websockets
+
+# -----------------------------
+# 오프라인 테스트용 KIS 실시간 시세 웹소켓 대역 서버
+# -----------------------------
+TR_ID_TRADE = "HDFSCNT0"
+TR_ID_ASK = "HDFSASP0"
+
+
+class MockQuoteServer:
+    """
+    KIS 웹소켓과 같은 형식으로 응답
+      - 구독/해제 요청 → SUBSCRIBE SUCCESS / UNSUBSCRIBE SUCCESS JSON
+      - 구독 중인 tr_key 마다 tick_interval 초 간격으로 "0|tr_id|001|필드^..." 푸시 (랜덤워크 가격)
+      - ping_interval 초마다 PINGPONG
+      - drop_after 초가 지나면 연결을 강제로 끊음 (재접속 테스트용)
+    """
+
+    def __init__(self, host="127.0.0.1", port=21000, tick_interval=0.2,
+                 ping_interval=10.0, drop_after=None, start_price=10.0, seed=0):
+        self.host = host
+        self.port = port
+        self.tick_interval = tick_interval
+        self.ping_interval = ping_interval
+        self.drop_after = drop_after
+        self.start_price = start_price
+        self._random = random.Random(seed)
+        self._prices = {}
+        self.connections = 0
+
+        self._loop = None
+        self._thread = None
+        self._stop = None
+        self._ready = threading.Event()
+
+    # -----------------------------
+    # 메시지 생성
+    # -----------------------------
+    def _next_price(self, tr_key):
+        price = self._prices.get(tr_key, self.start_price)
+        price = round(max(0.01, price * (1 + self._random.gauss(0, 0.001))), 4)
+        self._prices[tr_key] = price
+        return price
+
+    def _trade_record(self, tr_key):
+        now = datetime.datetime.now()
+        last = self._next_price(tr_key)
+        bid, ask = round(last - 0.01, 4), round(last + 0.01, 4)
+        fields = [
+            tr_key, tr_key[4:], "4", now.strftime("%Y%m%d"), now.strftime("%Y%m%d"), now.strftime("%H%M%S"),
+            now.strftime("%Y%m%d"), now.strftime("%H%M%S"),
+            str(self.start_price), str(max(last, self.start_price)), str(min(last, self.start_price)), str(last),
+            "2", f"{last - self.start_price:.4f}", f"{(last / self.start_price - 1) * 100:.2f}",
+            str(bid), str(ask), "100", "100", "1", "1000", str(int(last * 1000)), "0", "0", "100.00", "1",
+        ]
+        return f"0|{TR_ID_TRADE}|001|" + "^".join(fields)
+
+    def _ask_record(self, tr_key):
+        now = datetime.datetime.now()
+        last = self._prices.get(tr_key, self.start_price)
+        fields = [
+            tr_key, tr_key[4:], "4", now.strftime("%Y%m%d"), now.strftime("%H%M%S"),
+            now.strftime("%Y%m%d"), now.strftime("%H%M%S"),
+            "1000", "1000", "0", "0", str(round(last - 0.01, 4)), str(round(last + 0.01, 4)),
+            "100", "100", "0", "0",
+        ]
+        return f"0|{TR_ID_ASK}|001|" + "^".join(fields)
+
+    @staticmethod
+    def _reply(tr_id, tr_key, msg1):
+        return json.dumps({
+            "header": {"tr_id": tr_id, "tr_key": tr_key, "encrypt": "N"},
+            "body": {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": msg1,
+                     "output": {"iv": "0123456789abcdef", "key": "abcdefghijklmnopabcdefghijklmnop"}},
+        })
+
+    # -----------------------------
+    # 연결 처리
+    # -----------------------------
+    async def _push(self, ws, subscriptions):
+        last_ping = asyncio.get_running_loop().time()
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            for tr_id, tr_key in list(subscriptions):
+                if tr_id == TR_ID_TRADE:
+                    await ws.send(self._trade_record(tr_key))
+                elif tr_id == TR_ID_ASK:
+                    await ws.send(self._ask_record(tr_key))
+            now = asyncio.get_running_loop().time()
+            if now - last_ping >= self.ping_interval:
+                last_ping = now
+                await ws.send(json.dumps({"header": {"tr_id": "PINGPONG",
+                                                     "datetime": datetime.datetime.now().strftime("%Y%m%d%H%M%S")}}))
+
+    async def _receive(self, ws, subscriptions):
+        async for raw in ws:
+            data = json.loads(raw)
+            if data.get("header", {}).get("tr_id") == "PINGPONG":
+                continue
+            tr_type = data["header"].get("tr_type")
+            request = data["body"]["input"]
+            key = (request["tr_id"], request["tr_key"])
+            if tr_type == "1":
+                subscriptions.add(key)
+                await ws.send(self._reply(*key, "SUBSCRIBE SUCCESS"))
+            else:
+                subscriptions.discard(key)
+                await ws.send(self._reply(*key, "UNSUBSCRIBE SUCCESS"))
+
+    async def _handler(self, ws, path=None):
+        self.connections += 1
+        subscriptions = set()
+        tasks = [asyncio.ensure_future(self._push(ws, subscriptions)),
+                 asyncio.ensure_future(self._receive(ws, subscriptions))]
+        try:
+            await asyncio.wait(tasks, timeout=self.drop_after, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await ws.close()
+
+    async def serve(self):
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handler, self.host, self.port):
+            self._ready.set()
+            await self._stop.wait()
+
+    # -----------------------------
+    # 백그라운드 실행 (테스트용)
+    # -----------------------------
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self.serve(),),
+                                        name="mock-quote-ws", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join(5)
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KIS 실시간 시세 웹소켓 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=21000)
+    parser.add_argument("--tick-interval", type=float, default=0.2)
+    parser.add_argument("--drop-after", type=float, default=None)
+    args = parser.parse_args()
+
+    server = MockQuoteServer(args.host, args.port, tick_interval=args.tick_interval,
+                             drop_after=args.drop_after)
+    print(f"🧪 대역 웹소켓 서버 시작: {server.url}")
+    asyncio.run(server.serve())
@@ -1,9 +1,9 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
 import numpy as np
 import matplotlib.pyplot as plt
+from models.windows import WindowDataset, window_loader, predict_windows, predict_last
 
 # Device check (MPS → CUDA → CPU)
 if torch.backends.mps.is_available():
@@ -14,25 +14,10 @@ else:
     device = torch.device("cpu")
 
 
-class GRUDataset(Dataset):
+class GRUDataset(WindowDataset):
+    # predict 'Close' only
     def __init__(self, data, look_back=60):
-        self.X, self.y = self.create_dataset(data, look_back)
-
-    def create_dataset(self, dataset, look_back):
-        X, Y = [], []
-        for i in range(len(dataset) - look_back - 1):
-            X.append(dataset[i:(i + look_back), :])
-            Y.append(dataset[i + look_back, 0])  # predict 'Close' only
-        return np.array(X), np.array(Y)
-
-    def __len__(self):
-        return len(self.X)
-
-    def __getitem__(self, idx):
-        return (
-            torch.tensor(self.X[idx], dtype=torch.float32),
-            torch.tensor(self.y[idx], dtype=torch.float32),
-        )
+        super().__init__(data, look_back, target="close")
 
 
 class GRUModel(nn.Module):
@@ -72,8 +57,8 @@ def train_gru(train_data, val_data, look_back=60,
     train_dataset = GRUDataset(train_data, look_back)
     val_dataset = GRUDataset(val_data, look_back)
 
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size, shuffle=False)
+    train_loader = window_loader(train_dataset, batch_size=batch_size, shuffle=True)
+    val_loader = window_loader(val_dataset, batch_size=batch_size, shuffle=False)
 
     model = GRUModel(input_size=train_data.shape[1], hidden_size=hidden_size,
                      num_layers=num_layers, dropout=dropout).to(device)
@@ -127,21 +112,24 @@ def train_gru(train_data, val_data, look_back=60,
     return model
 
 
-def evaluate_and_plot(model, test_data, scaler_close, look_back=60, zoom_range=100):
-    test_dataset = GRUDataset(test_data, look_back)
-    test_loader = DataLoader(test_dataset, batch_size=1, shuffle=False)
+def predict(model, test_data, look_back=60, batch_size=1024):
+    # Batched inference, no plotting → (predicted close, actual close), scaled, shape (n,)
+    return predict_windows(model, GRUDataset(test_data, look_back).series, device, batch_size)
 
-    model.eval()
-    predictions, actuals = [], []
-    with torch.no_grad():
-        for X_batch, y_batch in test_loader:
-            X_batch, y_batch = X_batch.to(device), y_batch.to(device)
-            outputs = model(X_batch)
-            predictions.append(outputs.item())
-            actuals.append(y_batch.item())
 
-    predicted_scaled = np.array(predictions).reshape(-1, 1)
-    actual_scaled = np.array(actuals).reshape(-1, 1)
+def predict_next(model, recent_data, look_back=60, scaler_close=None):
+    # Next-bar close from the last look_back rows (scaled, or original scale with scaler_close)
+    predicted_scaled = predict_last(model, recent_data, look_back, device)
+    if scaler_close is None:
+        return predicted_scaled
+    return float(scaler_close.inverse_transform([[predicted_scaled]])[0, 0])
+
+
+def evaluate_and_plot(model, test_data, scaler_close, look_back=60, zoom_range=100):
+    predictions, actuals = predict(model, test_data, look_back)
+
+    predicted_scaled = predictions.reshape(-1, 1)
+    actual_scaled = actuals.reshape(-1, 1)
 
     predicted_price = scaler_close.inverse_transform(predicted_scaled)
     actual_price = scaler_close.inverse_transform(actual_scaled)
@@ -1,9 +1,9 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
 import numpy as np
 import matplotlib.pyplot as plt
+from models.windows import WindowDataset, window_loader, predict_windows, predict_last
 
 # Device check (MPS → CUDA → CPU)
 if torch.backends.mps.is_available():
@@ -14,26 +14,10 @@ else:
     device = torch.device("cpu")
 
 
-class LSTMDataset(Dataset):
+class LSTMDataset(WindowDataset):
+    # target as return (price change) instead of raw price
     def __init__(self, data, look_back=60):
-        self.X, self.y = self.create_dataset(data, look_back)
-
-    def create_dataset(self, dataset, look_back):
-        X, Y = [], []
-        for i in range(len(dataset) - look_back - 1):
-            X.append(dataset[i:(i + look_back), :])
-            # target as return (price change) instead of raw price
-            Y.append(dataset[i + look_back, 0] - dataset[i + look_back - 1, 0])
-        return np.array(X), np.array(Y)
-
-    def __len__(self):
-        return len(self.X)
-
-    def __getitem__(self, idx):
-        return (
-            torch.tensor(self.X[idx], dtype=torch.float32),
-            torch.tensor(self.y[idx], dtype=torch.float32),
-        )
+        super().__init__(data, look_back, target="return")
 
 
 class BiLSTMModel(nn.Module):
@@ -77,8 +61,8 @@ def train_lstm(train_data, val_data, look_back=60,
     train_dataset = LSTMDataset(train_data, look_back)
     val_dataset = LSTMDataset(val_data, look_back)
 
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size, shuffle=False)
+    train_loader = window_loader(train_dataset, batch_size=batch_size, shuffle=True)
+    val_loader = window_loader(val_dataset, batch_size=batch_size, shuffle=False)
 
     model = BiLSTMModel(input_size=train_data.shape[1],
                         hidden_size=hidden_size,
@@ -133,21 +117,26 @@ def train_lstm(train_data, val_data, look_back=60,
     return model
 
 
-def evaluate_and_plot(model, test_data, scaler_close, look_back=60, zoom_range=100):
-    test_dataset = LSTMDataset(test_data, look_back)
-    test_loader = DataLoader(test_dataset, batch_size=1, shuffle=False)
+def predict(model, test_data, look_back=60, batch_size=1024):
+    # Batched inference, no plotting → (predicted returns, actual returns), scaled, shape (n,)
+    return predict_windows(model, LSTMDataset(test_data, look_back).series, device, batch_size)
 
-    model.eval()
-    predictions, actuals = [], []
-    with torch.no_grad():
-        for X_batch, y_batch in test_loader:
-            X_batch, y_batch = X_batch.to(device), y_batch.to(device)
-            outputs = model(X_batch)
-            predictions.append(outputs.item())
-            actuals.append(y_batch.item())
 
-    predicted_scaled = np.array(predictions).reshape(-1, 1)
-    actual_scaled = np.array(actuals).reshape(-1, 1)
+def predict_next(model, recent_data, look_back=60, scaler_close=None):
+    # Next-bar forecast from the last look_back rows: scaled return,
+    # or the next price when scaler_close is given (last scaled close + predicted return)
+    predicted_return = predict_last(model, recent_data, look_back, device)
+    if scaler_close is None:
+        return predicted_return
+    next_scaled = float(recent_data[-1, 0]) + predicted_return
+    return float(scaler_close.inverse_transform([[next_scaled]])[0, 0])
+
+
+def evaluate_and_plot(model, test_data, scaler_close, look_back=60, zoom_range=100):
+    predictions, actuals = predict(model, test_data, look_back)
+
+    predicted_scaled = predictions.reshape(-1, 1)
+    actual_scaled = actuals.reshape(-1, 1)
 
     # Convert returns back to price (cumulative sum)
     predicted_price = np.cumsum(predicted_scaled) + scaler_close.data_min_
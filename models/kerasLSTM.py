@@ -4,16 +4,37 @@ from sklearn.metrics import mean_squared_error, r2_score
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
 from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.utils import Sequence
+from models.windows import WindowedSeries, last_window
 
 # ---------------------------
 # Dataset Creation
 # ---------------------------
 def create_dataset(dataset, look_back=60):
-    X, Y = [], []
-    for i in range(len(dataset) - look_back - 1):
-        X.append(dataset[i:(i + look_back), :])
-        Y.append(dataset[i + look_back, 0])  # predict Close (col 0)
-    return np.array(X), np.array(Y)
+    # X is a read-only strided view (no per-window copies), y = next Close (col 0)
+    series = WindowedSeries(dataset, look_back, target="close")
+    return series.windows, series.targets()
+
+
+class WindowSequence(Sequence):
+    # Feeds model.fit / predict one batch at a time so the full window tensor is never built
+    def __init__(self, series, batch_size=32, shuffle=False, **kwargs):
+        super().__init__(**kwargs)
+        self.series = series
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(series))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return int(np.ceil(len(self.series) / self.batch_size))
+
+    def __getitem__(self, index):
+        return self.series.batch(self.order[index * self.batch_size:(index + 1) * self.batch_size])
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.order)
 
 # ---------------------------
 # Model Training
@@ -23,8 +44,8 @@ def train_keras_lstm(train_data, val_data, look_back=60,
                      epochs=100, batch_size=32):
     num_features = train_data.shape[1]
 
-    X_train, y_train = create_dataset(train_data, look_back)
-    X_val, y_val = create_dataset(val_data, look_back)
+    train_batches = WindowSequence(WindowedSeries(train_data, look_back, target="close"), batch_size, shuffle=True)
+    val_batches = WindowSequence(WindowedSeries(val_data, look_back, target="close"), batch_size)
 
     model = Sequential()
     model.add(Input(shape=(look_back, num_features)))
@@ -49,26 +70,44 @@ def train_keras_lstm(train_data, val_data, look_back=60,
     early_stopping = EarlyStopping(monitor="val_loss", patience=10, restore_best_weights=True)
 
     history = model.fit(
-        X_train, y_train,
+        train_batches,
         epochs=epochs,
-        batch_size=batch_size,
-        validation_data=(X_val, y_val),
+        validation_data=val_batches,
         callbacks=[early_stopping],
         verbose=1
     )
 
     return model, history
 
+# ---------------------------
+# Prediction (no plotting)
+# ---------------------------
+def predict(model, test_data, look_back=60, batch_size=1024):
+    # Large-batch inference over the strided windows → (predicted, actual) scaled Close, shape (n,)
+    series = WindowedSeries(test_data, look_back, target="close")
+    predicted_scaled = model.predict(WindowSequence(series, batch_size), verbose=0) if len(series) \
+        else np.empty((0, 1), dtype=np.float32)
+    return predicted_scaled.reshape(-1), series.targets()
+
+
+def predict_next(model, recent_data, look_back=60, scaler=None):
+    # Next-bar Close from the last look_back rows; look_back sits in the same position as LSTM/GRU.predict_next.
+    # scaler is the all-feature scaler used by evaluate_and_plot (Close = column 0),
+    # not the close-only scaler_close those modules take.
+    # A direct model call skips the per-call setup of model.predict, so this is cheap enough for every bar.
+    predicted_scaled = float(np.asarray(model(last_window(recent_data, look_back), training=False)).reshape(-1)[0])
+    if scaler is None:
+        return predicted_scaled
+    return float(scaler.inverse_transform(np.repeat([[predicted_scaled]], recent_data.shape[1], axis=-1))[0, 0])
+
 # ---------------------------
 # Evaluation & Plot
 # ---------------------------
 def evaluate_and_plot(model, test_data, scaler, look_back=60, zoom_range=100):
-    X_test, y_test = create_dataset(test_data, look_back)
-
-    predicted_scaled = model.predict(X_test)
+    predicted_scaled, y_test = predict(model, test_data, look_back)
 
     # Ensure correct shape for inverse_transform
-    predicted = scaler.inverse_transform(np.repeat(predicted_scaled, test_data.shape[1], axis=-1))[:, 0]
+    predicted = scaler.inverse_transform(np.repeat(predicted_scaled.reshape(-1, 1), test_data.shape[1], axis=-1))[:, 0]
     actual = scaler.inverse_transform(np.repeat(y_test.reshape(-1, 1), test_data.shape[1], axis=-1))[:, 0]
 
     rmse = float(np.sqrt(mean_squared_error(np.array(actual).flatten(), np.array(predicted).flatten())))
@@ -85,12 +124,6 @@ def evaluate_and_plot(model, test_data, scaler, look_back=60, zoom_range=100):
     # ---------------------------
     # Next Future Price Prediction
     # ---------------------------
-    last_window = test_data[-look_back:]
-    X_future = last_window.reshape(1, look_back, -1)
-    predicted_next_scaled = model.predict(X_future)
-    predicted_next = scaler.inverse_transform(np.repeat(predicted_next_scaled, test_data.shape[1], axis=-1))[:, 0]
-
-    return fig, predicted, actual, {"rmse": rmse, "r2": r2, "next_price": float(predicted_next[0])}
-
-
+    predicted_next = predict_next(model, test_data, look_back, scaler=scaler)
 
+    return fig, predicted, actual, {"rmse": rmse, "r2": r2, "next_price": predicted_next}
@@ -0,0 +1,169 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import torch
+    from torch.utils.data import Dataset, DataLoader, BatchSampler, RandomSampler, SequentialSampler
+except ImportError:  # Keras-only environment
+    torch = None
+    Dataset = object
+
+# ---------------------------
+# Sliding-window datasets shared by LSTM / GRU / kerasLSTM
+# ---------------------------
+# Window i is data[i:i + look_back, :] and its target is taken from row i + look_back.
+# All windows are strided views over ONE float32 array (or one memory-mapped .npy file),
+# so memory stays at len(data) * features * 4 bytes instead of look_back copies of every row.
+# Copies happen only per batch (fancy indexing of the batch's windows).
+TARGETS = ("close", "return")   # close: data[t, col] / return: data[t, col] - data[t - 1, col]
+
+
+def save_series(path, data):
+    """
+    Write a (rows, features) float32 .npy file that WindowedSeries.load can memory-map.
+    """
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=np.shape(data))
+    out[:] = data
+    out.flush()
+    return path
+
+
+class WindowedSeries:
+    """
+    Framework-agnostic core: strided windows + targets over a single float32 array.
+      - windows        : (n, look_back, features) read-only view, no copy
+      - batch(indices) : (X, y) arrays for a list of sample indices (one copy of the batch)
+      - n matches the original create_dataset loops: len(data) - look_back - 1
+    """
+
+    def __init__(self, data, look_back=60, target="close", target_column=0):
+        if target not in TARGETS:
+            raise ValueError(f"target must be one of {TARGETS}, got {target!r}")
+        # memmap / float32 input is used as-is; anything else is converted once
+        self.data = data if isinstance(data, np.ndarray) and data.dtype == np.float32 \
+            else np.ascontiguousarray(data, dtype=np.float32)
+        if self.data.ndim != 2:
+            raise ValueError(f"data must be 2-D (rows, features), got shape {self.data.shape}")
+        self.look_back = look_back
+        self.target = target
+        self.target_column = target_column
+        self.n = max(0, len(self.data) - look_back - 1)
+
+        # sliding_window_view puts the window axis last → transpose back to (n, look_back, features)
+        windows = sliding_window_view(self.data, look_back, axis=0) if len(self.data) >= look_back \
+            else np.empty((0, self.data.shape[1], look_back), dtype=np.float32)
+        self.windows = windows.transpose(0, 2, 1)[:self.n]
+
+    @classmethod
+    def load(cls, path, look_back=60, target="close", target_column=0):
+        """
+        Memory-map a float32 .npy file (see save_series) without reading it into RAM.
+        """
+        return cls(np.load(path, mmap_mode="r"), look_back, target, target_column)
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def num_features(self):
+        return self.data.shape[1]
+
+    def targets(self, indices=None):
+        rows = np.arange(self.n) if indices is None else np.asarray(indices)
+        column = self.data[:, self.target_column]
+        y = column[rows + self.look_back]
+        if self.target == "return":
+            y = y - column[rows + self.look_back - 1]
+        return np.asarray(y, dtype=np.float32)
+
+    def batch(self, indices):
+        indices = np.asarray(indices)
+        return np.ascontiguousarray(self.windows[indices]), self.targets(indices)
+
+    def last_window(self):
+        """
+        Most recent look_back rows as a (1, look_back, features) array (input for a next-step forecast).
+        """
+        return last_window(self.data, self.look_back)
+
+    def batches(self, batch_size=32, shuffle=False, seed=None):
+        """
+        Yield (X, y) batches; shuffling permutes sample indices, never the data.
+        """
+        order = np.random.default_rng(seed).permutation(self.n) if shuffle else np.arange(self.n)
+        for start in range(0, self.n, batch_size):
+            yield self.batch(order[start:start + batch_size])
+
+
+class WindowDataset(Dataset):
+    """
+    torch Dataset over WindowedSeries.
+    Indexed with a list of indices (see window_loader), it returns a whole batch as two tensors
+    built once per batch instead of one tensor per sample.
+    """
+
+    def __init__(self, data, look_back=60, target="close", target_column=0):
+        self.series = data if isinstance(data, WindowedSeries) \
+            else WindowedSeries(data, look_back, target, target_column)
+
+    def __len__(self):
+        return len(self.series)
+
+    def __getitem__(self, idx):
+        if np.ndim(idx) == 0:
+            X, y = self.series.batch([idx])
+            return torch.from_numpy(X[0]), torch.from_numpy(y)[0]
+        X, y = self.series.batch(idx)
+        return torch.from_numpy(X), torch.from_numpy(y)
+
+
+def window_loader(dataset, batch_size=32, shuffle=False):
+    """
+    DataLoader that hands whole index batches to WindowDataset.__getitem__
+    (automatic per-sample batching and collation disabled).
+    """
+    sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(dataset, batch_size=None,
+                      sampler=BatchSampler(sampler, batch_size=batch_size, drop_last=False))
+
+
+# ---------------------------
+# Batched inference (no plotting, NumPy out)
+# ---------------------------
+def predict_windows(model, series, device, batch_size=1024):
+    """
+    Run every window of a WindowedSeries through a torch model in large batches.
+    Outputs stay on the device until the end, so there is one device→host copy
+    instead of an .item() sync per sample.
+    Returns (predictions, targets) as float32 arrays of shape (n,).
+    """
+    model.eval()
+    outputs = []
+    with torch.inference_mode():
+        for start in range(0, len(series), batch_size):
+            X = np.ascontiguousarray(series.windows[start:start + batch_size])
+            outputs.append(model(torch.from_numpy(X).to(device)).reshape(-1))
+    predictions = torch.cat(outputs).float().cpu().numpy() if outputs else np.empty(0, dtype=np.float32)
+    return predictions, series.targets()
+
+
+def last_window(data, look_back):
+    """
+    Most recent look_back rows of data (rows, features) as a contiguous float32 (1, look_back, features) array.
+    Only those rows are converted, so it is cheap enough to build on every new bar.
+    """
+    if len(data) < look_back:
+        raise ValueError(f"need at least {look_back} rows, got {len(data)}")
+    return np.ascontiguousarray(data[len(data) - look_back:], dtype=np.float32)[None, :, :]
+
+
+def predict_last(model, data, look_back, device):
+    """
+    Single forward pass of a torch model on last_window(data, look_back).
+    Returns the raw model output as a float.
+    """
+    window = last_window(data, look_back)
+    if model.training:
+        model.eval()
+    with torch.inference_mode():
+        return float(model(torch.from_numpy(window).to(device)).reshape(-1)[0])
@@ -4,13 +4,15 @@
 import yfinance as yf
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
+from utils.data_store import ohlcv_store
 
 
 def load_data(
     ticker: str,
     period: str = "max",
     interval: str = "1d",
-    prepost: bool = False
+    prepost: bool = False,
+    use_cache: bool = True
 ) -> pd.DataFrame:
     """
     Download historical stock data using yfinance.
@@ -20,14 +22,42 @@ def load_data(
         period (str): Period of data to download (e.g., '1y', '5d', 'max').
         interval (str): Data interval (e.g., '1m', '5m', '1d').
         prepost (bool): Whether to include pre/post-market data (only for intraday intervals).
+        use_cache (bool): Serve from the local OHLCV store, downloading only bars newer
+            than the last stored one. The store holds regular-session bars, so
+            prepost=True always downloads directly.
 
     Returns:
         pd.DataFrame: DataFrame containing stock OHLCV data.
     """
+    if use_cache and not prepost:
+        return adjust_prices(ohlcv_store.get(ticker, interval, period=period))
+
     df = yf.download(ticker, period=period, interval=interval, prepost=prepost)
     return df
 
 
+def adjust_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply the same split/dividend adjustment as yfinance's auto_adjust=True
+    to raw (unadjusted) store data.
+
+    Args:
+        df (pd.DataFrame): OHLCV data with 'Adj Close'.
+
+    Returns:
+        pd.DataFrame: Adjusted Open/High/Low/Close and Volume.
+    """
+    ratio = df["Adj Close"] / df["Close"]
+    adjusted = pd.DataFrame({
+        "Close": df["Adj Close"],
+        "High": df["High"] * ratio,
+        "Low": df["Low"] * ratio,
+        "Open": df["Open"] * ratio,
+        "Volume": df["Volume"],
+    }, index=df.index)
+    return adjusted
+
+
 def add_rsi(df: pd.DataFrame, window: int = 14) -> pd.DataFrame:
     delta = df['Close'].diff()
     gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
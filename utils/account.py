@@ -0,0 +1,240 @@
+import time
+import threading
+from collections import deque, namedtuple
+from utils.api import inquire_present_balance, parse_cash_amount
+from utils.helpers import safe_float
+
+# -----------------------------
+# 계좌 스냅샷 (백그라운드 TTL 갱신 + 자체 체결 반영)
+# -----------------------------
+Holding = namedtuple("Holding", ["symbol", "exchange", "qty", "orderable_qty", "avg_price", "price", "profit_rate"])
+AccountSnapshot = namedtuple("AccountSnapshot", ["cash", "holdings", "updated", "source"])
+# holdings: {종목코드: Holding}, updated: time.monotonic(), source: "server" / "fill"
+
+
+def parse_holdings(data):
+    holdings = {}
+    for item in data.get("output1", []) or []:
+        symbol = item.get("pdno", "")
+        if not symbol:
+            continue
+        qty = int(safe_float(item.get("ccld_qty_smtl1", "0")))
+        pchs_amt = safe_float(item.get("frcr_pchs_amt", "0"))
+        holdings[symbol] = Holding(
+            symbol=symbol,
+            exchange=item.get("ovrs_excg_cd", ""),
+            qty=qty,
+            orderable_qty=int(safe_float(item.get("ord_psbl_qty1", "0"))),
+            avg_price=pchs_amt / qty if qty else 0.0,
+            price=safe_float(item.get("ovrs_now_pric1", "0")),
+            profit_rate=safe_float(item.get("evlu_pfls_rt1", "0")),
+        )
+    return holdings
+
+
+def parse_snapshot(data):
+    return AccountSnapshot(
+        cash=safe_float(parse_cash_amount(data)),
+        holdings=parse_holdings(data),
+        updated=time.monotonic(),
+        source="server",
+    )
+
+
+def snapshot_with_fill(base, symbol, side, qty, price, exchange=""):
+    """
+    base 스냅샷에 체결 1건(side: "buy" / "sell")을 반영한 새 스냅샷
+    """
+    base = base or AccountSnapshot(0.0, {}, time.monotonic(), "fill")
+    holdings = dict(base.holdings)
+    old = holdings.get(symbol) or Holding(symbol, exchange, 0, 0, 0.0, price, 0.0)
+
+    if side == "buy":
+        new_qty = old.qty + qty
+        avg_price = (old.avg_price * old.qty + price * qty) / new_qty
+        cash = base.cash - price * qty
+        orderable = old.orderable_qty + qty
+    else:
+        new_qty = max(0, old.qty - qty)
+        avg_price = old.avg_price
+        cash = base.cash + price * qty
+        orderable = max(0, old.orderable_qty - qty)
+
+    if new_qty:
+        holdings[symbol] = old._replace(qty=new_qty, orderable_qty=orderable,
+                                        avg_price=avg_price, price=price)
+    else:
+        holdings.pop(symbol, None)
+    return AccountSnapshot(cash, holdings, time.monotonic(), "fill")
+
+
+class AccountState:
+    """
+    체결기준현재잔고 1회 조회로 현금 / 보유종목 / 주문가능수량을 한꺼번에 보관
+      - 백그라운드 스레드가 ttl 초마다 갱신 → snapshot / cash / holding 읽기는 네트워크 없음
+      - apply_fill() 로 우리 주문 체결을 즉시 반영하고 곧바로 서버 값으로 재동기화
+      - invalidate() 는 다음 갱신을 앞당기기만 함 (min_interval 초 이내 연속 조회는 묶음)
+      - 조회 도중 들어온 체결은 순번으로 기억했다가, 조회 결과에 아직 안 들어간 종목만 그 위에 다시 반영
+        (늦게 도착한 조회 결과가 방금 반영한 체결을 덮어쓰지도, 이미 반영된 체결을 두 번 더하지도 않도록)
+    """
+
+    FILL_LOG_SIZE = 256     # 조회 1번 도중 이보다 많이 체결되면 그 조회 결과는 버림
+
+    def __init__(self, ttl=30.0, min_interval=1.0, fetch=inquire_present_balance):
+        self.ttl = ttl
+        self.min_interval = min_interval
+        self._fetch = fetch
+
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._last_fetch = 0.0
+        self._fill_seq = 0                  # apply_fill 순번
+        self._fill_log = deque(maxlen=self.FILL_LOG_SIZE)   # (순번, symbol, side, qty, price, exchange)
+        self.refreshes = 0
+        self.errors = 0
+
+    # -----------------------------
+    # 읽기 (즉시 반환)
+    # -----------------------------
+    @property
+    def snapshot(self):
+        """
+        최신 스냅샷, 아직 한 번도 못 받았으면 그 자리에서 1회 조회
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot
+
+    @property
+    def cash(self):
+        return self.snapshot.cash
+
+    def holding(self, symbol):
+        return self.snapshot.holdings.get(symbol)
+
+    def orderable_qty(self, symbol):
+        holding = self.holding(symbol)
+        return holding.orderable_qty if holding else 0
+
+    def age(self):
+        snapshot = self._snapshot
+        return None if snapshot is None else time.monotonic() - snapshot.updated
+
+    # -----------------------------
+    # 갱신
+    # -----------------------------
+    def refresh(self):
+        """
+        서버에서 다시 읽어 스냅샷 교체 (실패하면 기존 스냅샷 유지)
+        조회를 시작한 뒤 apply_fill 된 체결은 종목별 보유수량으로 서버 반영 여부를 판단
+          - 서버 수량 == 현재 로컬 수량          : 이미 반영됨 → 다시 반영 안 함
+          - 서버 수량 + 그 체결들 == 로컬 수량    : 아직 반영 안 됨 → 전부 다시 반영
+          - 그 외 (일부만 반영 등, 판단 불가)     : 매수만 다시 반영 (현금을 적게 잡는 쪽) 후 곧바로 재조회
+        """
+        self._last_fetch = time.monotonic()
+        with self._lock:
+            started = self._fill_seq
+        try:
+            snapshot = parse_snapshot(self._fetch())
+        except Exception as e:
+            self.errors += 1
+            print(f"[계좌 조회 오류] {e}")
+            if self._snapshot is None:
+                raise
+            return self._snapshot
+        with self._lock:
+            later = [fill for fill in self._fill_log if fill[0] > started]
+            if self._fill_seq - started > len(later):
+                # 기록이 밀려나 조회 도중 체결을 다 알 수 없음 → 이 조회는 버리고 다음 조회에 맡김
+                self._wake.set()
+                return self._snapshot
+            by_symbol = {}
+            for fill in later:
+                by_symbol.setdefault(fill[1], []).append(fill)
+            uncertain = False
+            for symbol, fills in by_symbol.items():
+                local = self._snapshot.holdings.get(symbol) if self._snapshot else None
+                server = snapshot.holdings.get(symbol)
+                local_qty = local.qty if local else 0
+                server_qty = server.qty if server else 0
+                if server_qty == local_qty:
+                    continue
+                net = sum(qty if side == "buy" else -qty for _, _, side, qty, _, _ in fills)
+                if server_qty + net != local_qty:
+                    fills = [fill for fill in fills if fill[2] == "buy"]
+                    uncertain = True
+                for _, _, side, qty, price, exchange in fills:
+                    snapshot = snapshot_with_fill(snapshot, symbol, side, qty, price, exchange)
+            self._snapshot = snapshot
+            if uncertain:
+                self._wake.set()
+        self.refreshes += 1
+        return snapshot
+
+    def invalidate(self):
+        self._wake.set()
+
+    def apply_fill(self, symbol, side, qty, price, exchange=""):
+        """
+        우리 주문 체결분을 스냅샷에 바로 반영 (side: "buy" / "sell")
+        이후 서버 재조회로 수수료 등 차이를 맞춤
+        """
+        qty = int(qty)
+        price = float(price)
+        if qty <= 0:
+            return
+        with self._lock:
+            self._fill_seq += 1
+            self._fill_log.append((self._fill_seq, symbol, side, qty, price, exchange))
+            self._snapshot = snapshot_with_fill(self._snapshot, symbol, side, qty, price, exchange)
+        self.invalidate()
+
+    # -----------------------------
+    # 백그라운드 스레드
+    # -----------------------------
+    def _run(self):
+        while not self._stopping:
+            woke = self._wake.wait(self.ttl)
+            if self._stopping:
+                break
+            self._wake.clear()
+            if woke:
+                # 체결 직후 연속 invalidate 는 한 번의 조회로 묶음
+                wait = self.min_interval - (time.monotonic() - self._last_fetch)
+                if wait > 0:
+                    time.sleep(wait)
+            self.refresh()
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._stopping = False
+        if self._snapshot is None:
+            self.refresh()
+        self._thread = threading.Thread(target=self._run, name="account-state", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_account = None
+
+
+def get_account():
+    """
+    프로세스 공용 AccountState (처음 호출 때 조회 후 백그라운드 갱신 시작)
+    """
+    global _account
+    if _account is None:
+        _account = AccountState().start()
+    return _account
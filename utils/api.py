@@ -1,8 +1,9 @@
-import requests
 import json
 import datetime
 import time
 import yaml
+from utils import http_client
+from utils.notifier import DiscordNotifier
 from utils.helpers import (
     fetch_data,
     add_indicators,
@@ -37,6 +38,7 @@ def fetch_access_token(force_refresh=False):
             if (datetime.datetime.now() - issued_at).total_seconds() < 86400:
                 access_token = config.get("ACCESS_TOKEN", "")
                 if access_token:
+                    http_client.set_access_token(access_token)
                     print("[토큰 재사용] 기존 ACCESS_TOKEN 유지")
                     return access_token
         except Exception:
@@ -45,11 +47,12 @@ def fetch_access_token(force_refresh=False):
     # ✅ 여기까지 왔다는 건 없거나 만료된 경우 → 새로 발급
     headers = {"Content-Type": "application/json"}
     body = {"grant_type": "client_credentials", "appkey": app_key, "appsecret": app_secret}
-    response = requests.post(f"{url_base}/oauth2/tokenP", headers=headers, data=json.dumps(body))
+    response = http_client.post(f"{url_base}/oauth2/tokenP", headers=headers, data=json.dumps(body))
     data = response.json()
     access_token = data.get("access_token", "")
 
     if access_token:
+        http_client.set_access_token(access_token)
         config["ACCESS_TOKEN"] = access_token
         config["TOKEN_ISSUED_AT"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         with open("config.yaml", "w", encoding="UTF-8") as f:
@@ -63,23 +66,37 @@ def fetch_access_token(force_refresh=False):
 
     return access_token
 
-def send_discord_message(message):
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    payload = {"content": f"[{timestamp}] {message}"}
-    requests.post(discord_webhook_url, data=payload)
-    print(payload)
-
-def fetch_present_balance():
-    resp = requests.get(
-        f"{url_base}/uapi/overseas-stock/v1/trading/inquire-present-balance",
-        headers={
-            "Content-Type": "application/json",
-            "authorization": f"Bearer {access_token}",
-            "appKey": app_key,
-            "appSecret": app_secret,
-            "tr_id": "CTRP6504R",
-            "custtype": "P"
-        },
+_notifier = None
+
+
+def get_notifier():
+    global _notifier
+    if _notifier is None:
+        _notifier = DiscordNotifier(discord_webhook_url)
+    return _notifier
+
+
+def send_discord_message(message, key=None):
+    """
+    디스코드 알림 (백그라운드 전송 — 호출 즉시 반환)
+    key: 반복 현황 메시지 구분값, 밀리면 같은 key 는 최신 것만 전송
+    """
+    get_notifier().send(message, key=key)
+    print(message)
+
+
+def flush_discord_messages(timeout=10.0):
+    if _notifier is not None:
+        _notifier.flush(timeout)
+
+def inquire_present_balance():
+    """
+    체결기준현재잔고 원본 응답
+    fetch_present_balance / fetch_cash_amount / AccountState 가 같은 응답을 같이 씀
+    """
+    resp = http_client.kis_get(
+        "/uapi/overseas-stock/v1/trading/inquire-present-balance",
+        "CTRP6504R",
         params={
             "CANO": cano,
             "ACNT_PRDT_CD": account_product_code,
@@ -89,8 +106,21 @@ def fetch_present_balance():
             "INQR_DVSN_CD": "00",
         }
     )
+    return resp.json()
 
-    data = resp.json()
+def parse_cash_amount(data):
+    """
+    USD 사용 가능 외화 (모의계좌는 output3 예수금)
+    """
+    output2 = data.get("output2", [])
+
+    if output2 and isinstance(output2, list):
+        return output2[0].get("frcr_dncl_amt_2", "0")
+    return data.get("output3", {}).get("dncl_amt", "0")
+
+def fetch_present_balance(data=None):
+    if data is None:
+        data = inquire_present_balance()
     items = data.get('output1', [])
 
     if not items:
@@ -118,33 +148,10 @@ def fetch_present_balance():
 
     return items
 
-def fetch_cash_amount():
-    resp = requests.get(
-        f"{url_base}/uapi/overseas-stock/v1/trading/inquire-present-balance",
-        headers={
-            "Content-Type": "application/json",
-            "authorization": f"Bearer {access_token}",
-            "appKey": app_key,
-            "appSecret": app_secret,
-            "tr_id": "CTRP6504R",
-            "custtype": "P"
-        },
-        params = {
-            "CANO": cano,
-            "ACNT_PRDT_CD": account_product_code,
-            "WCRC_FRCR_DVSN_CD": "02",
-            "NATN_CD": "840",
-            "TR_MKET_CD": "00",
-            "INQR_DVSN_CD" : "00",
-        }
-    )
-    data = resp.json()
-    output2 = data.get("output2", [])
-
-    if output2 and isinstance(output2, list):
-        cash_amount = output2[0].get("frcr_dncl_amt_2", "0")
-    else:
-        cash_amount = data.get("output3", {}).get("dncl_amt", "0")
+def fetch_cash_amount(data=None):
+    if data is None:
+        data = inquire_present_balance()
+    cash_amount = parse_cash_amount(data)
 
     send_discord_message(f"[USD 사용 가능 외화] {cash_amount} USD")
     return cash_amount
@@ -155,15 +162,10 @@ def get_current_price(symbol: str, exchange: str = "NAS") -> float:
     exchange: 'NAS' (나스닥), 'NYS' (뉴욕), 'AMS' (AMEX)
     """
     try:
-        resp = requests.get(
-            f"{url_base}/uapi/overseas-price/v1/quotations/price",
-            headers={
-                "Content-Type": "application/json",
-                "authorization": f"Bearer {access_token}",
-                "appKey": app_key,
-                "appSecret": app_secret,
-                "tr_id": "HHDFS00000300"
-            },
+        resp = http_client.kis_get(
+            "/uapi/overseas-price/v1/quotations/price",
+            "HHDFS00000300",
+            custtype=None,
             params={
                 "AUTH": "",
                 "EXCD": exchange,
@@ -182,44 +184,106 @@ def get_current_price(symbol: str, exchange: str = "NAS") -> float:
 
 # 📑 체결 내역 조회
 # ==========================================================
-def check_order_status(order_no: str, symbol: str, exchange: str = "NYS") -> dict:
-    exchange = map_exchange_code(exchange)
+TR_ID_CCNL = "VTTS3035R"   # 주문체결내역 (실전 TTTS3035R)
+CCNL_MAX_PAGES = 10
+
+
+def inquire_ccnl_page(symbol="", exchange="", start_date=None, end_date=None,
+                      ctx_fk="", ctx_nk="", sort="AS"):
     """
-    ✅ 특정 주문번호의 체결 여부 조회
+    주문체결내역 한 페이지 (실전 20건 / 모의 15건)
+    반환: (주문목록, 다음 ctx_fk, 다음 ctx_nk, 다음 페이지 여부)
     """
-    url = f"{url_base}/uapi/overseas-stock/v1/trading/inquire-ccnl"
-    headers = {
-        "content-type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {access_token}",
-        "appkey": app_key,
-        "appsecret": app_secret,
-        "tr_id": "VTTS3035R",
-    }
+    today = datetime.datetime.now()
     params = {
         "CANO": cano,
         "ACNT_PRDT_CD": account_product_code,
         "PDNO": symbol,
-        "ORD_STRT_DT": (datetime.datetime.now() - datetime.timedelta(days=3)).strftime("%Y%m%d"),
-        "ORD_END_DT": datetime.datetime.now().strftime("%Y%m%d"),
+        "ORD_STRT_DT": start_date or (today - datetime.timedelta(days=3)).strftime("%Y%m%d"),
+        "ORD_END_DT": end_date or today.strftime("%Y%m%d"),
         "SLL_BUY_DVSN": "00",
         "CCLD_NCCS_DVSN": "00",
         "OVRS_EXCG_CD": exchange,
-        "SORT_SQN": "AS",
+        "SORT_SQN": sort,
         "ORD_DT": "", "ORD_GNO_BRNO": "", "ODNO": "",
-        "CTX_AREA_NK200": "", "CTX_AREA_FK200": ""
+        "CTX_AREA_NK200": ctx_nk, "CTX_AREA_FK200": ctx_fk
     }
-    resp = requests.get(url, headers=headers, params=params)
+    continued = bool(ctx_fk or ctx_nk)
+    resp = http_client.kis_get("/uapi/overseas-stock/v1/trading/inquire-ccnl", TR_ID_CCNL,
+                               params=params, custtype=None, tr_cont="N" if continued else "")
     data = resp.json()
-    orders = data.get("output", [])
+    if data.get("rt_cd") not in (None, "0"):
+        raise RuntimeError(f"주문체결내역 조회 실패: {data.get('msg1')}")
 
-    for o in orders:
-        if o.get("odno") == order_no:
-            send_discord_message(
-                f"📋 주문번호 {order_no} 상태\n"
-                f"체결수량: {o.get('ft_ccld_qty')} / 미체결수량: {o.get('nccs_qty')}\n"
-                f"상태: {o.get('prcs_stat_name')} / 단가: {o.get('ft_ccld_unpr3')}"
-            )
-            return o
+    more = resp.headers.get("tr_cont", "") in ("F", "M")
+    return (data.get("output", []) or [],
+            data.get("ctx_area_fk200", "").strip(),
+            data.get("ctx_area_nk200", "").strip(),
+            more)
+
+
+def iter_ccnl(symbol="", exchange="", start_date=None, end_date=None, max_pages=CCNL_MAX_PAGES):
+    """
+    연속조회 키(CTX_AREA_FK200/NK200)를 따라가며 주문 한 건씩 반환
+    """
+    ctx_fk = ctx_nk = ""
+    for _ in range(max_pages):
+        orders, ctx_fk, ctx_nk, more = inquire_ccnl_page(symbol, exchange, start_date, end_date,
+                                                         ctx_fk, ctx_nk)
+        for order in orders:
+            yield order
+        if not more or not (ctx_fk or ctx_nk):
+            break
+
+
+def check_order_status(order_no: str, symbol: str, exchange: str = "NYS") -> dict:
+    exchange = map_exchange_code(exchange)
+    """
+    ✅ 특정 주문번호의 체결 여부 조회 (연속조회로 전체 페이지 검색)
+    """
+    try:
+        for o in iter_ccnl(symbol, exchange):
+            if o.get("odno") == order_no:
+                send_discord_message(
+                    f"📋 주문번호 {order_no} 상태\n"
+                    f"체결수량: {o.get('ft_ccld_qty')} / 미체결수량: {o.get('nccs_qty')}\n"
+                    f"상태: {o.get('prcs_stat_name')} / 단가: {o.get('ft_ccld_unpr3')}"
+                )
+                return o
+    except Exception as e:
+        send_discord_message(f"[❗주문번호 {order_no}] 체결 내역 조회 오류: {e}")
+        return {}
 
     send_discord_message(f"[❗주문번호 {order_no}] 체결 내역을 찾지 못했습니다.")
-    return {}
\ No newline at end of file
+    return {}
+
+# 🕐 해외주식 분봉 조회
+# ==========================================================
+TR_ID_MINUTE = "HHDFS76950200"   # 해외주식분봉조회 (모의투자 미지원)
+MINUTE_PAGE_SIZE = 120           # 1회 최대 120건, 다음조회는 약 1개월 전까지
+
+
+def inquire_minute_bars_page(symbol, exchange="NAS", nmin=1, keyb="", include_prev=True):
+    """
+    분봉 한 페이지 (최신 봉부터)
+    keyb: 다음조회 시 이전 페이지 마지막(가장 오래된) 봉보다 nmin 분 앞 시각 (YYYYMMDDHHMMSS, 현지)
+    반환: (봉 목록 output2, 다음 조회 가능 여부)
+    """
+    params = {
+        "AUTH": "",
+        "EXCD": exchange,
+        "SYMB": symbol,
+        "NMIN": str(nmin),
+        "PINC": "1" if include_prev or keyb else "0",
+        "NEXT": "1" if keyb else "",
+        "NREC": str(MINUTE_PAGE_SIZE),
+        "FILL": "",
+        "KEYB": keyb,
+    }
+    resp = http_client.kis_get("/uapi/overseas-price/v1/quotations/inquire-time-itemchartprice",
+                               TR_ID_MINUTE, params=params, custtype=None)
+    data = resp.json()
+    if data.get("rt_cd") not in (None, "0"):
+        raise RuntimeError(f"분봉 조회 실패: {data.get('msg1')}")
+    output1 = data.get("output1", {}) or {}
+    return data.get("output2", []) or [], output1.get("next", "") == "1"
@@ -0,0 +1,341 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# -----------------------------
+# 로컬 OHLCV 저장소 (티커, 주기)별 컬럼 파일 + 증분 추가
+# -----------------------------
+DEFAULT_STORE_DIR = "data_cache"
+
+# 컬럼명 → 파일명 (컬럼마다 float64 바이너리 1개, 시간은 int64 ns UTC)
+COLUMN_FILES = {
+    "Open": "open.f8",
+    "High": "high.f8",
+    "Low": "low.f8",
+    "Close": "close.f8",
+    "Adj Close": "adj_close.f8",
+    "Volume": "volume.f8",
+}
+TIMESTAMP_FILE = "timestamp.i8"
+META_FILE = "meta.json"
+
+# yfinance 분봉 조회 가능 기간(일) — 이보다 오래 비었으면 증분 대신 전체 재다운로드
+INTRADAY_LIMIT_DAYS = {
+    "1m": 7, "2m": 60, "5m": 60, "15m": 60, "30m": 60, "90m": 60,
+    "60m": 730, "1h": 730,
+}
+
+
+def period_to_timedelta(period):
+    """
+    "5d", "60d", "1mo", "3mo", "1y" → Timedelta / "max", "ytd" 등은 None (전체)
+    """
+    period = str(period).strip().lower()
+    units = (("mo", 30), ("wk", 7), ("d", 1), ("y", 365))
+    for suffix, days in units:
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return pd.Timedelta(days=int(period[:-len(suffix)]) * days)
+    return None
+
+
+# period 가 "max" 처럼 전체 이력을 뜻할 때의 시작 시각
+FULL_HISTORY = int(np.iinfo(np.int64).min)
+
+
+def period_start_ns(period, last_ns):
+    """
+    마지막 봉 시각(ns) 기준 period 구간의 시작 시각(ns) / "max" 등 전체 이력은 FULL_HISTORY
+    """
+    window = period_to_timedelta(period)
+    if window is not None:
+        return int(last_ns) - window.value
+    if str(period).strip().lower() == "ytd":
+        return pd.Timestamp(int(last_ns), tz="UTC").replace(month=1, day=1).normalize().value
+    return FULL_HISTORY
+
+
+def download_ohlcv(ticker, interval, period=None, start=None):
+    """
+    yfinance 다운로드 결과를 (Open, High, Low, Close, Adj Close, Volume) 평탄 컬럼으로 정리
+    """
+    kwargs = {"start": start} if start is not None else {"period": period}
+    data = yf.download(ticker, interval=interval, progress=False, auto_adjust=False, **kwargs)
+    if data is None or data.empty:
+        return pd.DataFrame(columns=list(COLUMN_FILES))
+
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    data = data.loc[:, [c for c in COLUMN_FILES if c in data.columns]]
+    data = data[~data.index.duplicated(keep="last")].sort_index()
+    return data
+
+
+class OHLCVStore:
+    """
+    (ticker, interval) 마다 디렉터리 하나:
+      timestamp.i8 / open.f8 / ... : 행 단위로 이어 붙이는 컬럼 파일 (np.memmap 으로 읽음)
+      meta.json                    : 유효 행 수, 마지막 시각, 타임존, 마지막 확인 시각,
+                                     covered_from (이 시각 이후 구간은 전부 받아 둠)
+
+    meta.json 의 행 수까지만 유효 데이터 (meta.json 은 임시 파일 + os.replace 로만 교체)
+    append 는 기존 행을 덮어쓸 때 먼저 meta 행 수를 잘라낼 위치까지 줄여 저장한 뒤 컬럼 파일을 고치고
+    마지막에 새 행 수를 저장 → 어느 시점에 죽어도 모든 컬럼 파일이 meta 행 수 이상이고 그 앞부분은 서로 맞음
+    (merge / 백필 중에 죽으면 잘라낸 위치 이후 봉만 사라지고, 다음 update / get 이 다시 받음)
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+
+    # -----------------------------
+    # 경로 / 메타
+    # -----------------------------
+    def _dir(self, ticker, interval):
+        return os.path.join(self.root, f"{ticker.upper()}_{interval}")
+
+    def read_meta(self, ticker, interval):
+        path = os.path.join(self._dir(ticker, interval), META_FILE)
+        if not os.path.exists(path):
+            return {"rows": 0, "last_ts": None, "tz": None, "checked_at": 0.0}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def covered_from(self, ticker, interval, meta=None):
+        """
+        저장소가 빠짐없이 보유한 구간의 시작 시각(ns) / 비었으면 None
+        covered_from 이 없는 예전 meta 는 저장된 첫 봉부터만 보유한 것으로 간주
+        """
+        meta = meta or self.read_meta(ticker, interval)
+        if not meta["rows"]:
+            return None
+        if meta.get("covered_from") is not None:
+            return meta["covered_from"]
+        return int(self._column(ticker, interval, TIMESTAMP_FILE, np.int64, meta["rows"])[0])
+
+    def _mark_covered(self, ticker, interval, period, reset=False):
+        # period 전체를 내려받은 직후 호출 → covered_from 을 그 구간 시작까지 넓힘
+        # reset: 기존 봉과 새 봉 사이가 끊겼을 때 (만료 후 재다운로드) 새 구간 시작으로 다시 잡음
+        meta = self.read_meta(ticker, interval)
+        if not meta["rows"]:
+            return
+        start = period_start_ns(period, meta["last_ts"])
+        covered = None if reset else self.covered_from(ticker, interval, meta)
+        meta["covered_from"] = start if covered is None else min(covered, start)
+        self._write_meta(ticker, interval, meta)
+
+    def _write_meta(self, ticker, interval, meta):
+        path = os.path.join(self._dir(ticker, interval), META_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    # -----------------------------
+    # 읽기 (memmap)
+    # -----------------------------
+    def _column(self, ticker, interval, filename, dtype, rows):
+        path = os.path.join(self._dir(ticker, interval), filename)
+        if rows == 0 or not os.path.exists(path):
+            return np.zeros(rows, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+    def load(self, ticker, interval, period=None):
+        """
+        저장된 봉 중 마지막 시각 기준 period 구간만 DataFrame 으로 반환 (None/"max" 면 전체)
+        """
+        meta = self.read_meta(ticker, interval)
+        rows = meta["rows"]
+        timestamps = self._column(ticker, interval, TIMESTAMP_FILE, np.int64, rows)
+
+        start = 0
+        if rows and period is not None:
+            start_ns = period_start_ns(period, timestamps[-1])
+            start = int(np.searchsorted(timestamps, start_ns, side="left"))
+            covered = self.covered_from(ticker, interval, meta)
+            if start_ns < covered:
+                since = pd.Timestamp(covered, tz="UTC").strftime("%Y-%m-%d %H:%M")
+                print(f"⚠️ {ticker} {interval}: 저장소는 {since} UTC 이후만 보유 — 요청 구간({period})보다 짧음")
+
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(timestamps[start:]), utc=True))
+        index = index.tz_convert(meta["tz"]) if meta["tz"] else index.tz_localize(None)
+        index.name = "Datetime"
+
+        columns = {
+            name: np.array(self._column(ticker, interval, filename, np.float64, rows)[start:])
+            for name, filename in COLUMN_FILES.items()
+        }
+        return pd.DataFrame(columns, index=index)
+
+    def view(self, ticker, interval, start=None, end=None, names=("High", "Low")):
+        """
+        [start, end) 구간 (Timestamp 또는 ns int) 의 (시각 ns 배열, {컬럼: 배열})
+        memmap 슬라이스 그대로 반환 → 수년치 분봉도 필요한 구간만 페이지 단위로 읽힘 (복사 없음)
+        """
+        meta = self.read_meta(ticker, interval)
+        rows = meta["rows"]
+        timestamps = self._column(ticker, interval, TIMESTAMP_FILE, np.int64, rows)
+        lo, hi = 0, rows
+        if start is not None:
+            lo = int(np.searchsorted(timestamps, pd.Timestamp(start).value, side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(timestamps, pd.Timestamp(end).value, side="left"))
+        columns = {name: self._column(ticker, interval, COLUMN_FILES[name], np.float64, rows)[lo:hi]
+                   for name in names}
+        return timestamps[lo:hi], columns
+
+    # -----------------------------
+    # 쓰기 (증분 추가)
+    # -----------------------------
+    def append(self, ticker, interval, data):
+        """
+        data 의 봉을 이어 붙임. data 첫 봉 이후로 저장돼 있던 봉(미완성 마지막 봉 포함)은 덮어씀
+        반환: 추가된 행 수
+        """
+        if data is None or data.empty:
+            return 0
+
+        directory = self._dir(ticker, interval)
+        os.makedirs(directory, exist_ok=True)
+        meta = self.read_meta(ticker, interval)
+
+        index = data.index
+        tz = str(index.tz) if index.tz is not None else None
+        index = index.tz_convert("UTC") if index.tz is not None else index.tz_localize("UTC")
+        new_ts = index.as_unit("ns").asi8.astype(np.int64)
+
+        # 새 데이터 첫 시각 이후의 기존 행은 잘라냄 (미완성 봉 갱신)
+        rows = meta["rows"]
+        if rows:
+            old_ts = self._column(ticker, interval, TIMESTAMP_FILE, np.int64, rows)
+            rows = int(np.searchsorted(old_ts, new_ts[0], side="left"))
+            last_kept = int(old_ts[rows - 1]) if rows else None
+            del old_ts
+            if rows < meta["rows"]:
+                # 덮어쓸 행을 먼저 무효화 → 컬럼 파일을 고치는 도중 죽어도 앞부분(rows 행)만 유효
+                meta.update({"rows": rows, "last_ts": last_kept, "checked_at": 0.0})
+                if not rows:
+                    meta.pop("covered_from", None)
+                self._write_meta(ticker, interval, meta)
+
+        files = [(TIMESTAMP_FILE, new_ts)]
+        for name, filename in COLUMN_FILES.items():
+            values = data[name] if name in data.columns else pd.Series(np.nan, index=data.index)
+            files.append((filename, np.asarray(values, dtype=np.float64).reshape(-1)))
+
+        for filename, values in files:
+            path = os.path.join(directory, filename)
+            with open(path, "ab") as f:
+                f.truncate(rows * values.itemsize)
+                f.write(values.tobytes())
+
+        meta.update({
+            "rows": rows + len(new_ts),
+            "last_ts": int(new_ts[-1]),
+            "tz": meta.get("tz") or tz,
+        })
+        self._write_meta(ticker, interval, meta)
+        return len(new_ts)
+
+    def merge(self, ticker, interval, data):
+        """
+        data 를 저장된 봉과 시각 기준으로 합침 (겹치는 시각은 data 우선)
+        append 와 달리 data 마지막 봉 이후의 저장 봉도 유지 → 과거 구간 백필 / 파일 가져오기용
+        반환: 늘어난 행 수
+        """
+        if data is None or data.empty:
+            return 0
+        meta = self.read_meta(ticker, interval)
+        if not meta["rows"]:
+            return self.append(ticker, interval, data)
+
+        data = data[~data.index.duplicated(keep="last")].sort_index()
+        index = data.index.tz_convert("UTC") if data.index.tz is not None else data.index.tz_localize("UTC")
+        data = data.set_axis(index)
+
+        # data 첫 봉 이후로 저장돼 있던 구간만 읽어서 합친 뒤 그 위치부터 다시 씀
+        timestamps, columns = self.view(ticker, interval, start=index[0], names=tuple(COLUMN_FILES))
+        stored = pd.DataFrame({name: np.asarray(values) for name, values in columns.items()},
+                              index=pd.DatetimeIndex(pd.to_datetime(np.asarray(timestamps), utc=True)))
+        combined = data.reindex(columns=list(COLUMN_FILES)).combine_first(stored)
+        if meta["tz"]:
+            combined.index = combined.index.tz_convert(meta["tz"])
+
+        before = meta["rows"]
+        self.append(ticker, interval, combined)
+        return self.read_meta(ticker, interval)["rows"] - before
+
+    def update(self, ticker, interval, period="60d", max_age=60):
+        """
+        마지막 저장 시각 이후 봉만 받아서 추가 (저장소가 비었으면 period 전체)
+        max_age 초 이내에 이미 확인했다면 증분 요청 생략
+        저장소가 period 구간 앞쪽을 덜 갖고 있으면 (예: 5d 로 만든 뒤 60d 요청) 앞쪽을 백필
+        """
+        meta = self.read_meta(ticker, interval)
+        added = 0
+        if not (meta["rows"] and time.time() - meta.get("checked_at", 0.0) < max_age):
+            added += self._update_recent(ticker, interval, meta, period)
+        added += self._backfill(ticker, interval, period)
+        return added
+
+    def _update_recent(self, ticker, interval, meta, period):
+        last_ts = pd.Timestamp(meta["last_ts"], tz="UTC") if meta["last_ts"] else None
+        limit_days = INTRADAY_LIMIT_DAYS.get(interval)
+        expired = (last_ts is not None and limit_days is not None
+                   and pd.Timestamp.now(tz="UTC") - last_ts > pd.Timedelta(days=limit_days - 1))
+
+        full = last_ts is None or expired
+        if full:
+            data = download_ohlcv(ticker, interval, period=period)
+        else:
+            data = download_ohlcv(ticker, interval, start=last_ts.to_pydatetime())
+            if not data.empty:
+                data_index = data.index.tz_convert("UTC") if data.index.tz is not None \
+                    else data.index.tz_localize("UTC")
+                data = data[data_index >= last_ts]
+
+        added = self.append(ticker, interval, data)
+        if full:
+            self._mark_covered(ticker, interval, period, reset=expired)
+
+        meta = self.read_meta(ticker, interval)
+        if meta["rows"]:
+            meta["checked_at"] = time.time()
+            self._write_meta(ticker, interval, meta)
+        return added
+
+    def _backfill(self, ticker, interval, period):
+        """
+        period 시작이 covered_from 보다 앞이면 period 전체를 받아 merge → 늘어난 행 수
+        분봉은 yfinance 제공 한도(INTRADAY_LIMIT_DAYS) 안쪽까지만 요청하고, 넘는 부분은 경고
+        """
+        meta = self.read_meta(ticker, interval)
+        covered = self.covered_from(ticker, interval, meta)
+        if covered is None:
+            return 0
+        needed = period_start_ns(period, meta["last_ts"])
+        limit_days = INTRADAY_LIMIT_DAYS.get(interval)
+        if limit_days is not None:
+            now = pd.Timestamp.now(tz="UTC")
+            if needed < (now - pd.Timedelta(days=limit_days + 1)).value:
+                print(f"⚠️ {ticker} {interval}: yfinance 는 최근 {limit_days}일까지만 제공 — 요청 구간({period}) 앞쪽은 받을 수 없음")
+                # 받을 수 있는 최대 구간으로 줄임 (이미 받아 뒀으면 다시 요청하지 않음)
+                needed, period = (now - pd.Timedelta(days=limit_days - 1)).value, f"{limit_days}d"
+        if needed >= covered:
+            return 0
+
+        added = self.merge(ticker, interval, download_ohlcv(ticker, interval, period=period))
+        self._mark_covered(ticker, interval, period)
+        return added
+
+    def get(self, ticker, interval, period="60d", max_age=60):
+        """
+        증분 갱신 후 period 구간을 로컬 디스크에서 반환
+        """
+        self.update(ticker, interval, period=period, max_age=max_age)
+        return self.load(ticker, interval, period=period)
+
+
+# 모듈 전역 기본 저장소 (fetch_data / load_data 공용)
+ohlcv_store = OHLCVStore()
@@ -0,0 +1,362 @@
+import time
+import asyncio
+from datetime import datetime
+from utils.api import (
+    fetch_access_token,
+    send_discord_message,
+    flush_discord_messages
+)
+from utils.order_api import (
+    buy_order,
+    sell_order,
+    cancel_order
+)
+from utils.helpers import (
+    fetch_data,
+    check_sell_condition
+)
+from utils.tick import TickEvaluator
+from utils.reoptimizer import optimize_thresholds_incremental
+from utils.account import get_account
+from utils.fills import get_fill_tracker
+from utils import quotes
+from utils.metrics import metrics
+from utils.journal import get_journal
+
+# -----------------------------
+# 멀티 티커 asyncio 매매 엔진
+# -----------------------------
+
+
+class TickerState:
+    """
+    티커별 전략 상태 (단일 스크립트의 positions[TICKER] / df / 익절·손절 값을 대체)
+    """
+
+    def __init__(self, ticker, exchange, mode):
+        self.ticker = ticker
+        self.exchange = exchange
+        self.mode = mode
+        self.evaluator = TickEvaluator(mode)   # 갱신 때 만든 불변 스냅샷으로 틱 판정
+        self.take_profit = 1.0
+        self.stop_loss = -3.0
+        self.position = None          # {"entry_price": float, "qty": int}
+        self.pending = None           # 체결 대기 중인 매수 주문 (TrackedOrder)
+        self.reserved = 0.0           # 아직 계좌 스냅샷에 반영 안 된 매수 주문 금액
+        self.cancel_sent = False
+        self.last_update = 0.0
+        self.last_report = 0.0
+
+    def __repr__(self):
+        return f"TickerState({self.ticker}, {self.exchange}, {self.mode}, position={self.position})"
+
+
+class TradingEngine:
+    """
+    한 프로세스/한 이벤트 루프에서 여러 티커를 동시에 운용
+      - 티커마다 전략 태스크 1개, 모두 공용 clock(Condition)을 기다림 → 티커별 sleep 루프 없음
+      - 토큰 1개, HTTP 커넥션 풀 1개(http_client), 디스코드 알림 1개(notifier), 계좌 스냅샷 1개(AccountState) 공유
+      - 블로킹 REST 호출은 스레드 풀(asyncio.to_thread)로, 전략 재최적화는 세마포어로 동시 실행 수 제한
+      - 매수 체결은 FillTracker 이벤트로 반영, fill_timeout 초 지나면 미체결 잔량 취소
+      - 주문 / 체결 / 포지션 변화는 TradeJournal 에 기록 → 재시작 때 재생 후 잔고와 다른 종목만 보정
+    """
+
+    def __init__(self, symbols, interval="5m", period="60d",
+                 update_interval=300, realtime_interval=3, discord_interval=30,
+                 market_close=None, market_open=None,
+                 feed=None, feed_max_age=10, account=None, fills=None, fill_timeout=10,
+                 max_concurrent_optimize=1, journal=None):
+        self.states = [TickerState(t, e, m) for t, e, m in symbols]
+        self.interval = interval
+        self.period = period
+        self.update_interval = update_interval
+        self.realtime_interval = realtime_interval
+        self.discord_interval = discord_interval
+        self.market_close = market_close
+        self.market_open = market_open
+        self.feed = feed
+        self.feed_max_age = feed_max_age
+        self.account = account
+        self.fills = fills
+        self.fill_timeout = fill_timeout
+        self.journal = journal
+
+        self._clock = None
+        self._tick = 0
+        self._running = False
+        self._optimize_slots = max_concurrent_optimize
+        self._optimize_sem = None
+        self._order_lock = None
+
+    # -----------------------------
+    # 공유 자원
+    # -----------------------------
+    async def get_price(self, state):
+        price = None
+        if self.feed is not None:
+            price = self.feed.get_price(state.ticker, state.exchange, max_age=self.feed_max_age)
+        if price is None:
+            price = await asyncio.to_thread(quotes.get_price, state.ticker, state.exchange)
+        return price
+
+    def _market_closed(self):
+        if self.market_close is None or self.market_open is None:
+            return False
+        now_time = datetime.now().time()
+        return self.market_close <= now_time <= self.market_open
+
+    # -----------------------------
+    # 티커별 전략 단계
+    # -----------------------------
+    async def _refresh(self, state, now):
+        async with self._optimize_sem:
+            send_discord_message(f"📊 [{state.ticker}] 데이터 및 전략 갱신 중...")
+            df = await asyncio.to_thread(fetch_data, state.ticker,
+                                         interval=self.interval, period=self.period)
+            state.evaluator.update(df)
+            best = await asyncio.to_thread(optimize_thresholds_incremental, state.ticker,
+                                           interval=self.interval, period=self.period,
+                                           modes=(state.mode,))
+        state.take_profit, state.stop_loss = best[2:4]
+        state.last_update = now
+        send_discord_message(
+            f"🔄 [{state.ticker}] 갱신된 전략 → {state.mode} | 익절 {state.take_profit}% / 손절 {state.stop_loss}%"
+        )
+
+    async def _watch_sell(self, state, current_price, now):
+        entry = state.position["entry_price"]
+        qty = state.position["qty"]
+        result = check_sell_condition(entry, current_price, state.take_profit, state.stop_loss)
+
+        if now - state.last_report >= self.discord_interval:
+            send_discord_message(
+                f"📈 {state.ticker} 현황 | 익절가 {entry * (1 + state.take_profit / 100):.3f}"
+                f" / 손절가 {entry * (1 + state.stop_loss / 100):.3f} | 현재가 {current_price:.3f}",
+                key=f"status:{state.ticker}"
+            )
+            state.last_report = now
+
+        if result is None:
+            return
+        label = "익절" if result == "take_profit" else "손절"
+        send_discord_message(f"{'✅' if result == 'take_profit' else '⚠️'} {state.ticker} {label} 조건 충족 → 매도 시도")
+        async with self._order_lock:
+            success = await asyncio.to_thread(sell_order, state.ticker, qty, state.exchange, current_price)
+        if success:
+            send_discord_message(f"{'💰' if result == 'take_profit' else '💔'} {state.ticker} {label} 매도 완료")
+            state.position = None
+            self.account.apply_fill(state.ticker, "sell", qty, current_price, state.exchange)
+            self.journal.close_position(state.ticker, state.exchange)
+        else:
+            send_discord_message(f"❗ {state.ticker} {label} 매도 실패 → 포지션 유지")
+
+    async def _watch_buy(self, state, current_price, now):
+        if now - state.last_report >= self.discord_interval:
+            latency = state.evaluator.stats()
+            send_discord_message(
+                f"🎯 {state.ticker} 매수 감시 중 | 모드 {state.mode} | MA20={state.evaluator.value('ma20'):.3f}, 현재가={current_price:.3f}"
+                f" | 가용현금 {self.account.cash:.2f} | 판정 p99 {latency.get('p99_us', 0):.1f}µs",
+                key=f"status:{state.ticker}"
+            )
+            state.last_report = now
+
+        if not state.evaluator.check(current_price):
+            return
+
+        # 주문은 한 번에 하나씩 (현금 스냅샷을 여러 티커가 동시에 쓰지 않도록)
+        async with self._order_lock:
+            # 체결 대기 중인 매수 금액은 이미 쓴 것으로 봄
+            cash = self.account.cash - sum(s.reserved for s in self.states)
+            budget = cash / max(1, sum(1 for s in self.states if s.position is None and s.pending is None))
+            if budget <= 100:
+                return
+            qty = int(budget // current_price)
+            if qty <= 0:
+                return
+
+            send_discord_message(f"🟢 {state.ticker} 매수 조건 충족 ({state.mode}) → {qty}주 매수 시도 ({current_price} USD)")
+            success, odno = await asyncio.to_thread(buy_order, state.ticker, qty, state.exchange, current_price)
+            if not success:
+                send_discord_message(f"❗ {state.ticker} 매수 실패 → 포지션 미등록")
+                return
+
+            state.pending = self.fills.track(odno, state.ticker, state.exchange, "buy", qty, current_price)
+            state.reserved = qty * current_price
+            state.cancel_sent = False
+            self.journal.order(odno, state.ticker, state.exchange, "buy", qty, current_price)
+
+    def _on_fill(self, event):
+        """
+        FillTracker 이벤트 (이벤트 루프 스레드에서 실행)
+        """
+        order = event.order
+        state = next((s for s in self.states if s.pending is order), None)
+        if state is None:
+            return
+
+        if event.kind in ("partial", "filled"):
+            self.account.apply_fill(state.ticker, "buy", event.qty, event.price, state.exchange)
+            state.reserved = max(0.0, state.reserved - event.qty * order.price)
+            state.position = {"entry_price": order.avg_price, "qty": order.filled_qty}
+            self.journal.fill(order.odno, state.ticker, state.exchange, "buy", event.qty, event.price)
+            self.journal.position(state.ticker, state.exchange, order.filled_qty, order.avg_price)
+            send_discord_message(
+                f"📊 {state.ticker} 주문번호 {order.odno} {'체결완료' if event.kind == 'filled' else '부분체결'} | "
+                f"총 체결수량 {order.filled_qty}주 / 미체결수량 {order.remaining}주 / 평균단가 {order.avg_price:.3f}"
+            )
+        else:
+            self.account.invalidate()
+            send_discord_message(
+                f"{'🚫' if event.kind == 'cancelled' else '❗'} {state.ticker} 주문번호 {order.odno} "
+                f"{'잔량 취소' if event.kind == 'cancelled' else '주문 거부'} | 미체결 {event.qty}주"
+            )
+
+        if event.kind != "partial":
+            self.journal.order_done(order.odno, state.ticker, event.kind)
+        if order.done:
+            state.pending = None
+            state.reserved = 0.0
+            if state.position is not None:
+                entry = state.position["entry_price"]
+                send_discord_message(
+                    f"🎯 {state.ticker} 매수완료 | 익절 {entry * (1 + state.take_profit / 100):.3f}"
+                    f" / 손절 {entry * (1 + state.stop_loss / 100):.3f}"
+                )
+
+    async def _watch_pending(self, state, now):
+        """
+        체결 대기 중 → fill_timeout 이 지나면 미체결 잔량 취소 (체결 반영은 _on_fill)
+        """
+        order = state.pending
+        if state.cancel_sent or order.remaining <= 0 or now - order.created < self.fill_timeout:
+            return
+        state.cancel_sent = True
+        async with self._order_lock:
+            success, cancel_no = await asyncio.to_thread(cancel_order, state.ticker, order.odno,
+                                                         order.remaining, state.exchange)
+        if success:
+            self.fills.refresh()
+        else:
+            send_discord_message(f"❗ {state.ticker} 주문번호 {order.odno} 잔량 취소 실패")
+
+    def _restore(self):
+        """
+        저널 재생 결과를 티커 상태로 복원 (잔고와 다른 종목은 먼저 브로커 기준으로 보정)
+        미완료 매수 주문은 FillTracker 로 이어서 추적
+        """
+        tickers = [state.ticker for state in self.states]
+        for symbol, before, after in self.journal.reconcile(self.account.snapshot.holdings, symbols=tickers):
+            send_discord_message(f"🧾 [{symbol}] 저널 {before}주 ≠ 잔고 {after}주 → 잔고 기준으로 보정")
+
+        open_orders = self.journal.open_orders
+        for state in self.states:
+            restored = self.journal.positions.get(state.ticker)
+            if restored:
+                state.position = {"entry_price": restored["entry_price"], "qty": restored["qty"]}
+                send_discord_message(f"♻️ [{state.ticker}] 저널에서 포지션 복원 | {restored['qty']}주 @ {restored['entry_price']:.3f}")
+            for odno, order in list(open_orders.items()):
+                if order["symbol"] == state.ticker and order["side"] == "buy":
+                    tracked = self.journal.resume(self.fills, odno)
+                    if tracked is None:
+                        continue
+                    state.pending = tracked
+                    state.reserved = tracked.remaining * tracked.price
+                    send_discord_message(f"♻️ [{state.ticker}] 미완료 매수 주문 {odno} 이어서 추적"
+                                         f" (체결 {tracked.filled_qty}/{tracked.qty}주)")
+
+    async def _step(self, state):
+        now = time.time()
+        with metrics.timer("loop_iteration_seconds", ticker=state.ticker):
+            if state.evaluator.snapshot is None or now - state.last_update >= self.update_interval:
+                with metrics.timer("loop_stage_seconds", stage="refresh", ticker=state.ticker):
+                    await self._refresh(state, now)
+
+            with metrics.timer("loop_stage_seconds", stage="price", ticker=state.ticker):
+                current_price = await self.get_price(state)
+            if not current_price:
+                return
+
+            if state.pending is not None:
+                with metrics.timer("loop_stage_seconds", stage="pending", ticker=state.ticker):
+                    await self._watch_pending(state, now)
+            elif state.position is not None:
+                with metrics.timer("loop_stage_seconds", stage="sell", ticker=state.ticker):
+                    await self._watch_sell(state, current_price, now)
+            else:
+                with metrics.timer("loop_stage_seconds", stage="buy", ticker=state.ticker):
+                    await self._watch_buy(state, current_price, now)
+
+    async def _strategy_task(self, state):
+        seen = self._tick
+        while self._running:
+            async with self._clock:
+                await self._clock.wait_for(lambda: self._tick != seen or not self._running)
+                seen = self._tick
+            if not self._running:
+                break
+            try:
+                await self._step(state)
+            except Exception as e:
+                send_discord_message(f"[에러 발생] {state.ticker}: {e}")
+
+    async def _clock_task(self):
+        while self._running:
+            if self._market_closed():
+                send_discord_message(f"🛑 장 마감({self.market_close.strftime('%H:%M')}) 도달 — 자동매매 종료")
+                self._running = False
+            else:
+                self._tick += 1
+            async with self._clock:
+                self._clock.notify_all()
+            if self._running:
+                await asyncio.sleep(self.realtime_interval)
+
+    def latency_stats(self):
+        """
+        티커별 틱 판정 지연 통계 (µs)
+        """
+        return {state.ticker: state.evaluator.stats() for state in self.states}
+
+    # -----------------------------
+    # 실행
+    # -----------------------------
+    def stop(self):
+        """
+        다음 clock 에서 모든 전략 태스크 종료
+        """
+        self._running = False
+
+    async def run(self):
+        self._clock = asyncio.Condition()
+        self._optimize_sem = asyncio.Semaphore(self._optimize_slots)
+        self._order_lock = asyncio.Lock()
+        self._running = True
+
+        await asyncio.to_thread(fetch_access_token)
+        if self.account is None:
+            self.account = await asyncio.to_thread(get_account)
+        if self.fills is None:
+            self.fills = get_fill_tracker()
+        if self.journal is None:
+            self.journal = await asyncio.to_thread(get_journal)
+        # 리스너를 먼저 붙여야 복원한 주문의 첫 조회 체결도 _on_fill 로 들어옴
+        loop = asyncio.get_running_loop()
+        self.fills.add_listener(lambda event: loop.call_soon_threadsafe(self._on_fill, event))
+        self._restore()
+        if self.feed is not None:
+            for state in self.states:
+                self.feed.subscribe_quote(state.ticker, state.exchange)
+
+        tickers = ", ".join(f"{s.ticker}({s.mode})" for s in self.states)
+        send_discord_message(f"🚀 멀티 티커 자동매매 시작: {tickers}")
+        try:
+            await asyncio.gather(self._clock_task(),
+                                 *(self._strategy_task(state) for state in self.states))
+        finally:
+            self._running = False
+            if self.feed is not None:
+                self.feed.stop()
+            self.account.stop()
+            self.fills.stop()
+            self.journal.close()
+            flush_discord_messages()
@@ -0,0 +1,395 @@
+import time
+import base64
+import datetime
+import threading
+from collections import deque, namedtuple
+from utils.api import iter_ccnl, CCNL_MAX_PAGES
+from utils.helpers import map_exchange_code, safe_float
+
+try:
+    from Crypto.Cipher import AES          # pycryptodome (실시간 체결통보 복호화, 없으면 폴링만 사용)
+    from Crypto.Util.Padding import unpad
+except ImportError:
+    AES = None
+
+# -----------------------------
+# 주문 체결 추적 (연속조회 폴링 + 실시간 체결통보)
+# -----------------------------
+TR_ID_NOTICE = "H0GSCNI0"   # 해외주식 실시간체결통보 (모의 H0GSCNI9), tr_key = HTS ID
+
+# 체결통보 필드 위치 ('^' 구분, api_doc 레이아웃 순서)
+NOTICE_FIELDS = {"ODER_NO": 2, "OODER_NO": 3, "SELN_BYOV_CLS": 4, "RCTF_CLS": 5, "STCK_SHRN_ISCD": 7,
+                 "CNTG_QTY": 8, "CNTG_UNPR": 9, "RFUS_YN": 11, "CNTG_YN": 12, "ACPT_YN": 13}
+NOTICE_PRICE_DECIMALS = 4   # 미국 체결단가 소수점 자리 (001480100 → 148.01)
+
+FillEvent = namedtuple("FillEvent", ["kind", "order", "qty", "price"])
+# kind: "partial" / "filled" (qty = 이번에 새로 체결된 수량, price = 그 체결가)
+#       "cancelled" / "rejected" (qty = 체결되지 않고 끝난 수량)
+
+
+def order_key(odno):
+    """
+    REST 는 0 채움 10자리, 체결통보는 0 없이 옴 → 앞의 0 제거해서 색인
+    """
+    return str(odno or "").strip().lstrip("0")
+
+
+class TrackedOrder:
+    """
+    추적 중인 주문 1건의 누적 상태
+    """
+
+    def __init__(self, odno, symbol, exchange, side, qty, price=0.0, filled_qty=0, fill_amount=0.0, created=None):
+        # filled_qty / fill_amount / created: 재시작 후 이어서 추적할 때 이미 반영한 체결과 원래 주문 시각
+        self.odno = odno
+        self.symbol = symbol
+        self.exchange = exchange
+        self.side = side                  # "buy" / "sell"
+        self.qty = int(qty)
+        self.price = float(price)
+        self.filled_qty = int(filled_qty)
+        self.fill_amount = float(fill_amount)
+        self.remaining = max(0, self.qty - self.filled_qty)
+        self.status = "접수"
+        self.done = False
+        self.created = created if created is not None else time.time()
+        self.updated = time.time()
+        self._rest_filled = self.filled_qty       # 조회 응답 누적 체결수량
+        self._rest_amount = self.fill_amount
+        self._stream_filled = self.filled_qty     # 체결통보 누적 체결수량
+
+    @property
+    def avg_price(self):
+        return self.fill_amount / self.filled_qty if self.filled_qty else 0.0
+
+    def __repr__(self):
+        return (f"TrackedOrder({self.odno}, {self.symbol}, {self.side}, "
+                f"{self.filled_qty}/{self.qty}, {self.status}, done={self.done})")
+
+
+class FillTracker:
+    """
+    미완료 주문을 끝날 때까지 따라가며 체결을 이벤트로 발행
+      - 주문번호(odno) 색인, 종목별로 주문체결내역을 역순(최신부터) 연속조회
+        → 미완료 주문을 모두 찾으면 나머지 페이지는 생략
+      - 변화가 없으면 poll_interval 부터 backoff 배씩 max_interval 까지 조회 간격을 늘림
+        (새 주문 / 체결이 생기면 다시 poll_interval)
+      - attach_feed() 로 실시간 체결통보를 받으면 체결은 즉시 반영, 폴링은 stream_poll_interval 로 낮춤
+      - 이벤트는 add_listener 콜백(추적 스레드에서 호출) 또는 drain_events() 로 꺼내 씀
+    """
+
+    def __init__(self, poll_interval=1.0, max_interval=15.0, backoff=1.5,
+                 stream_poll_interval=30.0, max_pages=CCNL_MAX_PAGES, fetch=iter_ccnl):
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stream_poll_interval = stream_poll_interval
+        self.max_pages = max_pages
+        self._fetch = fetch
+
+        self._orders = {}                 # order_key(odno) → TrackedOrder
+        self._open = set()
+        self._events = deque()
+        self._listeners = []
+        self._cond = threading.Condition()
+        self._kick = False
+        self._interval = poll_interval
+        self._stopping = False
+        self._thread = None
+
+        self._feed = None
+        self._aes_key = None
+        self._aes_iv = None
+        self.polls = 0
+        self.errors = 0
+
+    # -----------------------------
+    # 주문 등록 / 조회
+    # -----------------------------
+    def track(self, odno, symbol, exchange, side, qty, price=0.0, filled_qty=0, fill_amount=0.0, created=None):
+        order = TrackedOrder(odno, symbol, exchange, side, qty, price, filled_qty, fill_amount, created)
+        with self._cond:
+            self._orders[order_key(odno)] = order
+            self._open.add(order_key(odno))
+            self._interval = self.poll_interval
+            self._kick = True
+            self._cond.notify_all()
+        return order
+
+    def get(self, odno):
+        return self._orders.get(order_key(odno))
+
+    def open_orders(self):
+        with self._cond:
+            return [self._orders[k] for k in self._open]
+
+    def add_listener(self, callback):
+        """
+        callback(FillEvent) — 추적 스레드에서 호출되므로 오래 붙잡지 말 것
+        """
+        self._listeners.append(callback)
+
+    def drain_events(self):
+        with self._cond:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def wait(self, odno, timeout=None):
+        """
+        주문이 끝날 때까지(체결완료/취소/거부) 대기, 시간 초과면 그 시점 상태 반환
+        """
+        order = self.get(odno)
+        if order is None:
+            return None
+        with self._cond:
+            self._cond.wait_for(lambda: order.done, timeout)
+        return order
+
+    def refresh(self):
+        """
+        다음 조회를 바로 실행 (취소 주문 직후 등)
+        """
+        with self._cond:
+            self._interval = self.poll_interval
+            self._kick = True
+            self._cond.notify_all()
+
+    # -----------------------------
+    # 상태 반영
+    # -----------------------------
+    def _publish(self, events):
+        if not events:
+            return
+        with self._cond:
+            self._events.extend(events)
+            self._cond.notify_all()
+        for event in events:
+            for callback in self._listeners:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"[체결 이벤트 처리 오류] {e}")
+
+    def _fill(self, order, filled, price):
+        """
+        조회/통보 중 큰 누적 체결수량 기준으로 새로 늘어난 만큼만 이벤트 (이중 반영 방지)
+        """
+        delta = filled - order.filled_qty
+        if delta <= 0:
+            return []
+        order.filled_qty = filled
+        order.fill_amount += delta * price
+        order.remaining = max(0, order.qty - filled)
+        order.updated = time.time()
+        if order.filled_qty >= order.qty:
+            order.done = True
+            return [FillEvent("filled", order, delta, price)]
+        return [FillEvent("partial", order, delta, price)]
+
+    def _finish(self, order, kind):
+        if order.done:
+            return []
+        order.done = True
+        order.status = "거부" if kind == "rejected" else order.status
+        order.updated = time.time()
+        unfilled = order.qty - order.filled_qty
+        order.remaining = 0
+        return [FillEvent(kind, order, unfilled, 0.0)]
+
+    def _apply_row(self, order, row):
+        """
+        주문체결내역 한 줄 (누적 체결수량 / 누적 체결금액) 반영
+        """
+        filled = int(safe_float(row.get("ft_ccld_qty", "0")))
+        amount = safe_float(row.get("ft_ccld_amt3", "0")) or filled * safe_float(row.get("ft_ccld_unpr3", "0"))
+        remaining = int(safe_float(row.get("nccs_qty", "0")))
+        status = row.get("prcs_stat_name", "") or order.status
+        rejected = status == "거부" or bool(str(row.get("rjct_rson", "")).strip())
+
+        events = []
+        if filled > order._rest_filled:
+            rest_filled, rest_amount = order._rest_filled, order._rest_amount
+            order._rest_filled, order._rest_amount = filled, amount
+            # 이번 조회에서 늘어난 체결분의 평균 단가
+            step_price = (amount - rest_amount) / (filled - rest_filled)
+            events += self._fill(order, max(filled, order._stream_filled), step_price)
+
+        order.status = status
+        if not order.done:
+            order.remaining = remaining
+        if rejected:
+            events += self._finish(order, "rejected")
+        elif not order.done and remaining == 0 and status == "완료":
+            events += self._finish(order, "cancelled")
+        return events
+
+    def _apply_cancel_row(self, order, row):
+        if row.get("rvse_cncl_dvsn") == "02" and row.get("prcs_stat_name") == "완료":
+            return self._finish(order, "cancelled")
+        return []
+
+    # -----------------------------
+    # 폴링 (연속조회)
+    # -----------------------------
+    def poll_once(self):
+        """
+        미완료 주문을 종목별로 한 번씩 조회, 변화가 있었으면 True
+        """
+        with self._cond:
+            open_orders = {k: self._orders[k] for k in self._open}
+        if not open_orders:
+            return False
+
+        groups = {}
+        for key, order in open_orders.items():
+            groups.setdefault((order.symbol, map_exchange_code(order.exchange)), {})[key] = order
+
+        events = []
+        today = datetime.datetime.now()
+        for (symbol, exchange), orders in groups.items():
+            oldest = min(order.created for order in orders.values())
+            # 주문일자는 현지(미국) 기준 → 하루 앞당겨 조회
+            start = (datetime.datetime.fromtimestamp(oldest) - datetime.timedelta(days=1)).strftime("%Y%m%d")
+            pending = set(orders)
+            cancels = []
+            for row in self._fetch(symbol, exchange, start_date=start, end_date=today.strftime("%Y%m%d"),
+                                   max_pages=self.max_pages):
+                key = order_key(row.get("odno"))
+                if key in orders:
+                    with self._cond:
+                        events += self._apply_row(orders[key], row)
+                    pending.discard(key)
+                elif order_key(row.get("orgn_odno")) in orders:
+                    cancels.append(row)       # 취소 주문이 원주문보다 먼저 나옴 → 원주문 체결분 반영 후 처리
+                if not pending:
+                    break
+            with self._cond:
+                for row in cancels:
+                    events += self._apply_cancel_row(orders[order_key(row.get("orgn_odno"))], row)
+        self.polls += 1
+
+        with self._cond:
+            for key, order in open_orders.items():
+                if order.done:
+                    self._open.discard(key)
+        self._publish(events)
+        return bool(events)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._open or self._stopping)
+                if self._stopping:
+                    return
+                self._kick = False
+
+            try:
+                changed = self.poll_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"[체결 조회 오류] {e}")
+                changed = False
+
+            with self._cond:
+                if changed:
+                    self._interval = self.poll_interval
+                else:
+                    self._interval = min(self._interval * self.backoff, self.max_interval)
+                interval = self._interval
+                if self.stream_active():
+                    interval = max(interval, self.stream_poll_interval)
+                self._cond.wait_for(lambda: self._kick or self._stopping, interval)
+
+    # -----------------------------
+    # 실시간 체결통보 (선택)
+    # -----------------------------
+    def attach_feed(self, feed, hts_id, tr_id=TR_ID_NOTICE):
+        """
+        RealtimeFeed 에 체결통보 구독 추가, 복호화 모듈이 없으면 폴링만 사용
+        """
+        if AES is None:
+            print("[체결통보 미사용] pycryptodome 미설치 → 조회 폴링으로만 추적")
+            return False
+        self._feed = feed
+        feed.add_listener(tr_id, self._on_notice)
+        feed.subscribe(tr_id, hts_id)
+        return True
+
+    def stream_active(self):
+        return self._feed is not None and self._aes_key is not None and self._feed.connected.is_set()
+
+    def _decrypt(self, payload):
+        cipher = AES.new(self._aes_key, AES.MODE_CBC, self._aes_iv)
+        return unpad(cipher.decrypt(base64.b64decode(payload)), AES.block_size).decode("utf-8")
+
+    def _on_notice(self, tr_id, data, encrypted):
+        if isinstance(data, dict):
+            # 구독 응답 → 복호화 키 보관
+            output = data.get("body", {}).get("output") or {}
+            if output.get("key"):
+                self._aes_key = output["key"].encode("utf-8")
+                self._aes_iv = output["iv"].encode("utf-8")
+            return
+
+        if encrypted:
+            if self._aes_key is None:
+                return
+            values = self._decrypt("^".join(data)).split("^")
+        else:
+            values = data
+        self._apply_notice(values)
+
+    def _apply_notice(self, values):
+        fields = {name: values[idx] if idx < len(values) else "" for name, idx in NOTICE_FIELDS.items()}
+        events = []
+        with self._cond:
+            order = self._orders.get(order_key(fields["ODER_NO"]))
+            if order is None or order.done:
+                if fields["RCTF_CLS"] == "2":
+                    self.refresh()          # 취소 확인은 조회로 확정
+                return
+
+            if fields["RFUS_YN"] == "1":
+                events += self._finish(order, "rejected")
+            elif fields["CNTG_YN"] == "2":
+                qty = int(safe_float(fields["CNTG_QTY"]))
+                price = safe_float(fields["CNTG_UNPR"]) / 10 ** NOTICE_PRICE_DECIMALS
+                order._stream_filled += qty
+                events += self._fill(order, max(order._stream_filled, order._rest_filled), price)
+
+            if order.done:
+                self._open.discard(order_key(order.odno))
+        self._publish(events)
+
+    # -----------------------------
+    # 시작 / 종료
+    # -----------------------------
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="fill-tracker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_tracker = None
+
+
+def get_fill_tracker():
+    """
+    프로세스 공용 FillTracker (처음 호출 때 추적 스레드 시작)
+    """
+    global _tracker
+    if _tracker is None:
+        _tracker = FillTracker().start()
+    return _tracker
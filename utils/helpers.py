@@ -1,7 +1,15 @@
+import copy
+import threading
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from collections import deque
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from utils.data_store import ohlcv_store
+from utils.metrics import metrics
+from utils.strategies import get_strategy, series_signals, strategy_names, compile_snapshot
 
 # -----------------------------
 # 거래소 코드 매핑
@@ -20,98 +28,295 @@ def map_exchange_code(short_code: str) -> str:
 # -----------------------------
 # 기술적 지표 계산 (MA, Bollinger)
 # -----------------------------
+INDICATOR_COLUMNS = ("ma20", "stddev", "upper", "lower", "ma5")
+
+
+def indicator_columns(close, window=20):
+    """
+    종가 Series → {지표 컬럼: Series} (창이 차기 전은 NaN)
+    """
+    ma20 = close.rolling(window=window).mean()
+    stddev = close.rolling(window=window).std()
+    return {
+        "ma20": ma20,
+        "stddev": stddev,
+        "upper": ma20 + (stddev * 2),
+        "lower": ma20 - (stddev * 2),
+        "ma5": close.rolling(window=5).mean(),
+    }
+
+
 def add_indicators(df, window=20):
-    df["ma20"] = df["close"].rolling(window=window).mean()
-    df["stddev"] = df["close"].rolling(window=window).std()
-    df["upper"] = df["ma20"] + (df["stddev"] * 2)
-    df["lower"] = df["ma20"] - (df["stddev"] * 2)
-    df["ma5"] = df["close"].rolling(window=5).mean()
+    for name, values in indicator_columns(df["close"], window).items():
+        df[name] = values
 
     df = df.dropna().reset_index(drop=True)
     return df
 
+# -----------------------------
+# 기술적 지표 증분 계산 (봉 1개당 O(1))
+# -----------------------------
+class IncrementalIndicators:
+    """
+    add_indicators 와 같은 정의(ma20, stddev(ddof=1), upper, lower, ma5)를
+    새 봉 하나가 들어올 때마다 상수 시간에 갱신
+      - 이동평균: 창에서 빠지는 값/들어오는 값으로 평균만 보정
+      - 표준편차: 슬라이딩 윈도우 Welford (평균 + 편차제곱합 M2)
+      - resync_every 봉마다 창 안의 종가로 합계를 다시 계산 (보정을 반복하며 쌓인 부동소수 오차 제거)
+    """
+
+    def __init__(self, window=20, short_window=5, resync_every=1000):
+        self.window = window
+        self.short_window = short_window
+        self.resync_every = resync_every
+        self._closes = deque(maxlen=window)
+        self._short = deque(maxlen=short_window)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._short_mean = 0.0
+        self._updates = 0
+
+    @classmethod
+    def from_dataframe(cls, df, window=20, short_window=5):
+        """
+        df 의 마지막 window 개 종가로 상태를 채움 (원본/지표 추가된 df 모두 가능)
+        """
+        indicators = cls(window=window, short_window=short_window)
+        for close in column_values(df, "close")[-window:]:
+            indicators.update(close)
+        return indicators
+
+    @property
+    def ready(self):
+        return len(self._closes) == self.window and len(self._short) == self.short_window
+
+    def update(self, close):
+        """
+        새 봉 종가 반영 후 지표 dict 반환 (창이 다 차기 전에는 None)
+        """
+        close = float(close)
+
+        # 중기 창: Welford 추가 / 슬라이딩 교체
+        if len(self._closes) < self.window:
+            self._closes.append(close)
+            delta = close - self._mean
+            self._mean += delta / len(self._closes)
+            self._m2 += delta * (close - self._mean)
+        else:
+            old = self._closes[0]
+            self._closes.append(close)
+            old_mean = self._mean
+            self._mean += (close - old) / self.window
+            self._m2 += (close - old) * (close - self._mean + old - old_mean)
+            self._m2 = max(self._m2, 0.0)
+
+        # 단기 창: 평균만 보정
+        if len(self._short) < self.short_window:
+            self._short.append(close)
+            self._short_mean += (close - self._short_mean) / len(self._short)
+        else:
+            old = self._short[0]
+            self._short.append(close)
+            self._short_mean += (close - old) / self.short_window
+
+        self._updates += 1
+        if self.resync_every and self._updates % self.resync_every == 0:
+            self.resync()
+        return self.values() if self.ready else None
+
+    def peek(self, close):
+        """
+        close 를 반영했을 때의 지표만 계산하고 상태는 그대로 (아직 미완성인 마지막 봉용)
+        """
+        clone = copy.copy(self)
+        clone._closes = self._closes.copy()
+        clone._short = self._short.copy()
+        clone.resync_every = 0
+        return clone.update(close)
+
+    def resync(self):
+        """
+        창 안의 종가로 평균 / M2 / 단기 평균을 새로 계산
+        """
+        closes = np.fromiter(self._closes, dtype=np.float64)
+        self._mean = float(closes.mean()) if len(closes) else 0.0
+        self._m2 = float(((closes - self._mean) ** 2).sum())
+        self._short_mean = float(np.mean(self._short)) if self._short else 0.0
+
+    def values(self):
+        stddev = (self._m2 / (self.window - 1)) ** 0.5
+        return {
+            "close": self._closes[-1],
+            "ma20": self._mean,
+            "stddev": stddev,
+            "upper": self._mean + stddev * 2,
+            "lower": self._mean - stddev * 2,
+            "ma5": self._short_mean,
+        }
+
+class IndicatorSeries:
+    """
+    한 (티커, 주기, 기간) 의 지표 열을 갱신 사이에 유지 → 매 갱신은 새 봉만 IncrementalIndicators 로 계산
+      - 처음 / 저장소 앞쪽이 바뀌었을 때만 (백필, 재다운로드) add_indicators 와 같은 rolling 한 번으로 시작
+      - 마지막 봉은 아직 미완성일 수 있어 상태에 넣지 않고 peek 으로만 계산 (다음 갱신 때 바뀌어도 됨)
+      - 결과는 add_indicators 와 같은 행/컬럼 (앞쪽 window-1 봉 제외, 0부터 다시 번호)
+    """
+
+    def __init__(self, window=20):
+        self.window = window
+        self.bootstraps = 0
+        self._lock = threading.Lock()
+        self._state = None            # 확정 봉(마지막 봉 제외)까지 반영한 IncrementalIndicators
+        self._ts = None               # 확정 봉 시각 (ns)
+        self._values = None           # 확정 봉 지표 (봉 수, len(INDICATOR_COLUMNS))
+        self._last_row = None         # 마지막 봉 peek 결과
+
+    @staticmethod
+    def _row(values):
+        if values is None:
+            return np.full(len(INDICATOR_COLUMNS), np.nan)
+        return np.array([values[name] for name in INDICATOR_COLUMNS])
+
+    def _bootstrap(self, data, timestamps):
+        columns = indicator_columns(data["close"], self.window)
+        values = np.column_stack([np.asarray(columns[name], dtype=np.float64) for name in INDICATOR_COLUMNS])
+        self._ts, self._values, self._last_row = timestamps[:-1], values[:-1], values[-1]
+        self._state = IncrementalIndicators.from_dataframe(data.iloc[:-1], window=self.window)
+        self.bootstraps += 1
+
+    def _extend(self, timestamps, closes):
+        """
+        저장된 확정 봉이 data 앞쪽과 그대로 이어지면 새 봉만 반영 → True (아니면 다시 시작해야 함)
+        """
+        if self._state is None or not len(self._ts):
+            return False
+        first = int(np.searchsorted(self._ts, timestamps[0]))
+        pos = int(np.searchsorted(timestamps, self._ts[-1]))
+        if (first == len(self._ts) or self._ts[first] != timestamps[0]
+                or pos >= len(timestamps) - 1 or timestamps[pos] != self._ts[-1]
+                or len(self._ts) - first != pos + 1):
+            return False
+
+        rows = [self._row(self._state.update(close)) for close in closes[pos + 1:-1]]
+        self._ts = np.concatenate([self._ts[first:], timestamps[pos + 1:-1]])
+        self._values = np.concatenate([self._values[first:], np.reshape(rows, (-1, len(INDICATOR_COLUMNS)))])
+        self._last_row = self._row(self._state.peek(closes[-1]))
+        return True
+
+    def frame(self, data):
+        """
+        저장소 DataFrame (소문자 close 등으로 이름 바꾼 뒤) → add_indicators(data) 와 같은 결과
+        """
+        closes = np.asarray(data["close"], dtype=np.float64)
+        if len(closes) < 2 or np.isnan(closes).any():
+            return add_indicators(data, self.window)
+        timestamps = pd.DatetimeIndex(data.index).as_unit("ns").asi8
+        with self._lock:
+            if not self._extend(timestamps, closes):
+                self._bootstrap(data, timestamps)
+            values = np.vstack([self._values, self._last_row])
+        for k, name in enumerate(INDICATOR_COLUMNS):
+            data[name] = values[:, k]
+        return data.iloc[self.window - 1:].reset_index(drop=True)
+
+
+# (티커, 주기, 기간) → IndicatorSeries (fetch_data 캐시 경로 공용)
+_indicator_series = {}
+_indicator_series_lock = threading.Lock()
+
+
+def indicator_series(ticker, interval, period):
+    key = (ticker.upper(), interval, period)
+    with _indicator_series_lock:
+        series = _indicator_series.get(key)
+        if series is None:
+            series = _indicator_series[key] = IndicatorSeries()
+        return series
+
 # -----------------------------
 # 데이터 가져오기 (3분, 5분, 일봉 선택 가능)
 # -----------------------------
-def fetch_data(ticker, interval="5m", period="5d"):
+@metrics.timed("fetch_data_seconds")
+def fetch_data(ticker, interval="5m", period="5d", use_cache=True):
     """
     interval: "3m", "5m", "1d"
     period:  "5d", "1mo", "3mo" 등
+    use_cache: 로컬 저장소(data_cache/)에서 읽고 마지막 봉 이후만 증분 다운로드
+               지표도 이전 호출 이후 새 봉만 증분 계산 (IndicatorSeries)
     """
-    data = yf.download(ticker, interval=interval, period=period,
-                       progress=False, auto_adjust=False)
+    if use_cache:
+        data = ohlcv_store.get(ticker, interval, period=period)
+    else:
+        data = yf.download(ticker, interval=interval, period=period,
+                           progress=False, auto_adjust=False)
     data = data.rename(columns={"Close": "close", "High": "high", "Low": "low"})
+    data["datetime"] = data.index  # reset_index 이후에도 봉 시각 유지
+    if use_cache:
+        return indicator_series(ticker, interval, period).frame(data)
     data = add_indicators(data)
     return data
 
+
+def bar_timestamps(df):
+    """
+    fetch_data 결과의 봉 시각을 int64 (ns, UTC 기준) 배열로 반환
+    """
+    values = df["datetime"]
+    if isinstance(values, pd.DataFrame):
+        values = values.iloc[:, 0]
+    return pd.DatetimeIndex(values).as_unit("ns").asi8
+
 # -----------------------------
-# 매수 조건
+# 매수 조건 (utils.strategies 레지스트리로 분기)
 # -----------------------------
+def tick_snapshot(df, mode="lower_recover", extra_columns=("ma20",), **kwargs):
+    """
+    df 마지막 두 봉을 mode 전략의 불변 판정 스냅샷(TickSnapshot)으로 변환
+    (데이터 갱신 때 한 번만 호출 → 틱마다 snapshot.check(현재가))
+    extra_columns: 판정엔 안 쓰지만 현황 보고용으로 같이 담아 둘 컬럼
+    """
+    strategy = get_strategy(mode)
+    names = strategy.columns + tuple(c for c in extra_columns if c not in strategy.columns)
+    prev, now = {}, {}
+    for name in names:
+        values = column_values(df, name)
+        prev[name] = values[-2] if len(values) >= 2 else np.nan
+        now[name] = values[-1] if len(values) >= 1 else np.nan
+    # 직전 봉(warmup) 확보
+    return compile_snapshot(prev, now, mode, ready=len(df) > strategy.warmup, **kwargs)
+
+
 def check_buy_condition(df, current_price, mode="lower_recover", **kwargs):
     """
-    mode:
+    마지막 두 봉과 현재가로 mode 전략 판정 (등록된 전략: strategy_names())
       - "lower_recover" : 볼린저 하단선 이탈 후 회복
       - "ma_cross"      : 단기 MA가 중기 MA 상향 돌파
-      - "near_ma"       : 현재가가 특정 이동평균선 근처
-      - "ma5_touch"     : 상승 추세 중 MA5 근접 후 반등
-      - "combo"         : 복합 조건
-    """
-    # 데이터 최소 2행 이상 확보
-    if len(df) < 2:
-        return False
-
-    latest = df.iloc[-1]
-    prev = df.iloc[-2]
-
-    close_prev = prev["close"].item()
-    ma5_prev = prev["ma5"].item()
-    ma20_prev = prev["ma20"].item()
-    lower_prev = prev["lower"].item()
-
-    close_now = latest["close"].item()
-    ma5_now = latest["ma5"].item()
-    ma20_now = latest["ma20"].item()
-    lower_now = latest["lower"].item()
-
-    # --- 주요 조건 계산 ---
-
-    # (1) 볼린저 하단 이탈 후 회복
-    lower_recover = (close_prev < lower_prev) and (current_price > lower_now)
-
-    # (2) 단기 이평이 중기 이평을 상향 돌파
-    ma_cross = (ma5_prev < ma20_prev) and (ma5_now > ma20_now)
-
-    # (3) 현재가가 이동평균선 근처 (기본 tolerace=0.001)
-    target_ma = kwargs.get("target_ma", "ma20")
-    tolerance = kwargs.get("tolerance", 0.001)
-    ma_val = ma5_now if target_ma == "ma5" else ma20_now
-    near_ma = abs((current_price - ma_val) / ma_val) <= tolerance
-
-    # (4) 상승추세 중 MA5 근접 반등
-    ma5_touch = (
-        (ma5_now > ma20_now) and                 # 상승 추세
-        abs((current_price - ma5_now) / ma5_now) <= 0.001 and  # MA5 근접
-        (current_price > close_prev)             # 직전 종가 대비 반등
-    )
+      - "near_ma"       : 현재가가 특정 이동평균선 근처 (target_ma, tolerance)
+      - "ma5_touch"     : 상승 추세 중 MA5 근접 후 반등 (tolerance)
+      - "combo"         : 복합 조건 (strict, tolerance)
+    실시간 루프에서는 tick_snapshot 을 갱신 때 한 번 만들어 재사용
+    """
+    return tick_snapshot(df, mode, **kwargs).check(current_price)
+
+# -----------------------------
+# 매수 시그널 (전체 구간 벡터화)
+# -----------------------------
+def column_values(df, name):
+    """
+    df[name]을 1차원 float64 배열로 변환
+    (yfinance MultiIndex 컬럼이면 단일 컬럼 DataFrame이 나오므로 평탄화)
+    """
+    return np.asarray(df[name], dtype=np.float64).reshape(-1)
 
-    # --- 모드별 분기 ---
-    if mode == "lower_recover":
-        return lower_recover
-    elif mode == "ma_cross":
-        return ma_cross
-    elif mode == "near_ma":
-        return near_ma
-    elif mode == "ma5_touch":
-        return ma5_touch
-    elif mode == "combo":
-        # 복합 전략 예시: 하단 회복 + 단기이평 반등
-        strict = kwargs.get("strict", False)
-        if strict:
-            return lower_recover and ma_cross and ma5_touch
-        else:
-            return (lower_recover and ma5_touch) or ma_cross
-    else:
-        raise ValueError(f"Unknown mode: {mode}")
+
+def compute_buy_signals(df, mode="lower_recover", **kwargs):
+    """
+    check_buy_condition(df.iloc[:i + 1], close[i], mode) 를 모든 i 에 대해
+    한 번에 계산한 bool 배열 (길이 len(df), warmup 이전 봉은 항상 False)
+    """
+    strategy = get_strategy(mode)
+    columns = {name: column_values(df, name) for name in strategy.columns}
+    return series_signals(columns, mode, **kwargs)
 
 # -----------------------------
 # 매도 조건 (익절/손절)
@@ -125,67 +330,190 @@ def check_sell_condition(entry_price, current_price,
         return "stop_loss"
     return None
 
+# -----------------------------
+# 익절/손절 그리드 일괄 시뮬레이션
+# -----------------------------
+def advance_grid_bar(high, low, signal, position, entry_price, tp_mult, sl_mult):
+    """
+    모든 (tp, sl) 조합을 봉 하나만큼 진행 (position / entry_price 는 제자리 갱신)
+    반환: (win, loss) — 이번 봉에서 익절/손절로 청산된 조합 마스크
+    """
+    holding = position.copy()
+    win = loss = np.zeros_like(holding)
+
+    # 매도 (보유 중인 조합만)
+    if holding.any():
+        # ✅ 고가가 익절가 도달했으면 익절, 아니면 저가가 손절가 도달했는지 확인
+        win = holding & (high >= entry_price * tp_mult)
+        loss = holding & ~win & (low <= entry_price * sl_mult)
+        position &= ~(win | loss)
+
+    # 매수 (이번 봉 시작 시점에 포지션이 없던 조합만)
+    if signal:
+        entry_price[~holding] = low  # ✅ 다음 캔들에서 저가 기준으로 진입했다고 가정
+        position |= ~holding
+
+    return win, loss
+
+
+def simulate_thresholds_batch(highs, lows, signals,
+                              take_profit_values, stop_loss_values,
+                              initial_balance=10000, start=2):
+    """
+    모든 (tp, sl) 조합의 포지션/진입가/잔고/승패를 배열로 들고
+    봉 데이터를 한 번만 순회하며 동시에 진행
+    반환: (balance, wins, losses) — 각각 shape (len(tp), len(sl))
+    """
+    tp_grid, sl_grid = np.meshgrid(np.asarray(take_profit_values, dtype=np.float64),
+                                   np.asarray(stop_loss_values, dtype=np.float64),
+                                   indexing="ij")
+    tp_mult = 1 + tp_grid / 100
+    sl_mult = 1 + sl_grid / 100
+
+    balance = np.full(tp_grid.shape, float(initial_balance))
+    position = np.zeros(tp_grid.shape, dtype=bool)
+    entry_price = np.zeros(tp_grid.shape)
+    wins = np.zeros(tp_grid.shape, dtype=np.int64)
+    losses = np.zeros(tp_grid.shape, dtype=np.int64)
+
+    for i in range(start, len(highs)):
+        win, loss = advance_grid_bar(highs[i], lows[i], signals[i],
+                                     position, entry_price, tp_mult, sl_mult)
+        balance[win] *= tp_mult[win]
+        balance[loss] *= sl_mult[loss]
+        wins += win
+        losses += loss
+
+    return balance, wins, losses
+
+
+def grid_results(interval, mode, take_profit_values, stop_loss_values,
+                 balance, wins, losses):
+    """
+    simulate_thresholds_batch 결과를
+    (interval, mode, tp, sl, balance, win_rate, total_trades) 튜플 목록으로 변환
+    """
+    results = []
+    for a, tp in enumerate(take_profit_values):
+        for b, sl in enumerate(stop_loss_values):
+            total_trades = int(wins[a, b] + losses[a, b])
+            win_rate = (int(wins[a, b]) / total_trades * 100) if total_trades > 0 else 0.0
+            results.append((interval, mode, tp, sl, balance[a, b], win_rate, total_trades))
+    return results
+
+# -----------------------------
+# 병렬 최적화 (프로세스 풀 + 공유 메모리)
+# -----------------------------
+SHARED_COLUMNS = ("high", "low")   # 시뮬레이션 공통 컬럼 (+ 전략별 columns)
+
+_worker_shm = None
+_worker_arrays = None
+
+
+def shared_columns(modes):
+    """
+    공유 메모리에 올릴 컬럼: 고가/저가 + 선택된 전략들이 선언한 컬럼 (중복 제거, 순서 유지)
+    """
+    names = list(SHARED_COLUMNS)
+    for mode in modes:
+        names.extend(c for c in get_strategy(mode).columns if c not in names)
+    return tuple(names)
+
+
+def _attach_shared_arrays(shm_name, n_rows, columns):
+    """
+    워커 초기화: 부모가 만든 공유 메모리 블록을 붙여서 컬럼별 배열 뷰로 보관
+    (작업마다 배열을 pickle 해서 넘기지 않음)
+    """
+    global _worker_shm, _worker_arrays
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)  # 해제(unlink)는 부모가 담당
+    block = np.ndarray((len(columns), n_rows), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_arrays = dict(zip(columns, block))
+
+
+def _simulate_grid_chunk(interval, mode, take_profit_values, stop_loss_values):
+    signals = compute_buy_signals(_worker_arrays, mode=mode)
+    balance, wins, losses = simulate_thresholds_batch(
+        _worker_arrays["high"], _worker_arrays["low"], signals,
+        take_profit_values, stop_loss_values
+    )
+    return grid_results(interval, mode, take_profit_values, stop_loss_values,
+                        balance, wins, losses)
+
+
+def simulate_grid_parallel(df, interval, modes, take_profit_values, stop_loss_values, workers):
+    """
+    (mode, tp 구간) 단위로 그리드를 쪼개 프로세스 풀에서 실행
+    결과 순서/값은 직렬 경로와 동일
+    """
+    n_rows = len(df)
+    columns = shared_columns(modes)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(columns) * n_rows * 8))
+    block = None
+    try:
+        block = np.ndarray((len(columns), n_rows), dtype=np.float64, buffer=shm.buf)
+        for k, name in enumerate(columns):
+            block[k] = column_values(df, name)
+
+        tp_chunks = [c for c in np.array_split(take_profit_values, workers) if len(c)]
+        tasks = [(mode, chunk) for mode in modes for chunk in tp_chunks]
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_attach_shared_arrays,
+                                 initargs=(shm.name, n_rows, columns)) as pool:
+            futures = [pool.submit(_simulate_grid_chunk, interval, mode, chunk, stop_loss_values)
+                       for mode, chunk in tasks]
+            for future in tqdm(futures, desc="Grid Chunks"):
+                results.extend(future.result())
+        return results
+    finally:
+        # shm.buf 를 쓰는 배열을 먼저 놓아야 close 가 BufferError 없이 됨 (실패 경로 포함, unlink 는 항상)
+        del block
+        try:
+            shm.close()
+        finally:
+            shm.unlink()
+
 # -----------------------------
 # 브루트포스 최적화
 # -----------------------------
+@metrics.timed("optimizer_seconds", kind="bruteforce")
 def optimize_thresholds_bruteforce(ticker,
                                    interval="5m",
                                    period="5d",
                                    take_profit_range=(0.5, 2.0, 0.5),
                                    stop_loss_range=(-5.0, -1.0, 1.0),
-                                   modes=("lower_recover", "ma_cross", "ma5_touch", "combo")):
+                                   modes=None,
+                                   workers=None):
+    """
+    modes: None 이면 레지스트리에서 optimize=True 로 등록된 전략 전체
+    workers: 2 이상이면 (mode, tp, sl) 그리드를 프로세스 풀로 나눠 계산
+    """
+    modes = tuple(modes or strategy_names(optimizable_only=True))
     df = fetch_data(ticker, interval=interval, period=period)
     results = []
 
     take_profit_values = np.arange(*take_profit_range)
     stop_loss_values = np.arange(*stop_loss_range)
 
-    for mode in tqdm(modes, desc="Mode Loop"):
-        for tp in take_profit_values:
-            for sl in stop_loss_values:
-                balance = 10000
-                position = None
-                entry_price = 0.0
-                wins = 0
-                losses = 0
-
-                for i in range(2, len(df)):
-                    row = df.iloc[i]
-                    high = row["high"].item()
-                    low = row["low"].item()
-                    close = row["close"].item()
-                    sub_df = df.iloc[:i + 1]
-
-                    if len(sub_df) < 2:
-                        continue
-
-                    # 매수
-                    if position is None:
-                        if check_buy_condition(sub_df, close, mode=mode):
-                            entry_price = low  # ✅ 다음 캔들에서 저가 기준으로 진입했다고 가정
-                            position = True
-
-                    # 매도
-                    else:
-                        target_profit_price = entry_price * (1 + tp / 100)
-                        target_loss_price = entry_price * (1 + sl / 100)
-
-                        # ✅ 고가가 익절가 도달했으면 익절
-                        if high >= target_profit_price:
-                            balance *= (1 + tp / 100)
-                            wins += 1
-                            position = None
-
-                        # ✅ 저가가 손절가 도달했으면 손절
-                        elif low <= target_loss_price:
-                            balance *= (1 + sl / 100)
-                            losses += 1
-                            position = None
-
-                total_trades = wins + losses
-                win_rate = (wins / total_trades * 100) if total_trades > 0 else 0.0
-
-                results.append((interval, mode, tp, sl, balance, win_rate, total_trades))
+    if workers and workers > 1:
+        results = simulate_grid_parallel(df, interval, modes,
+                                         take_profit_values, stop_loss_values, workers)
+    else:
+        highs = column_values(df, "high")
+        lows = column_values(df, "low")
+
+        for mode in tqdm(modes, desc="Mode Loop"):
+            # ✅ 매수 시그널은 익절/손절과 무관 → 모드별로 한 번만 계산
+            signals = compute_buy_signals(df, mode=mode)
+
+            # ✅ 모든 (tp, sl) 조합을 한 번의 순회로 시뮬레이션
+            balance, wins, losses = simulate_thresholds_batch(
+                highs, lows, signals, take_profit_values, stop_loss_values
+            )
+            results.extend(grid_results(interval, mode, take_profit_values, stop_loss_values,
+                                        balance, wins, losses))
 
     # 최종 결과
     best = max(results, key=lambda x: x[4])
@@ -0,0 +1,163 @@
+import time
+import threading
+import yaml
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from utils.rate_limit import RateLimiter, classify
+from utils.metrics import metrics
+
+# -----------------------------
+# 공용 HTTP 클라이언트 (호스트별 keep-alive 커넥션 풀)
+# -----------------------------
+with open("config.yaml", encoding="UTF-8") as f:
+    config = yaml.load(f, Loader=yaml.FullLoader)
+
+url_base = config["URL_BASE"]
+
+CONNECT_TIMEOUT = 3.05   # TCP/TLS 연결 대기 (초)
+READ_TIMEOUT = 10        # 응답 대기 (초)
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+POOL_CONNECTIONS = 4     # 호스트당 보관할 풀 수
+POOL_MAXSIZE = 16        # 풀당 최대 커넥션 수
+
+# ✅ KIS 초당 호출 한도 (실전 계좌 20건/초 기준, 모의투자는 config 에서 낮출 것)
+rate_limiter = RateLimiter(
+    global_rate=config.get("RATE_LIMIT_PER_SEC", 18),
+    order_rate=config.get("ORDER_RATE_PER_SEC", 10),
+    quote_rate=config.get("QUOTE_RATE_PER_SEC", 15),
+    order_reserve=config.get("ORDER_RESERVE", 3),
+)
+THROTTLE_CODE = "EGW00201"   # 초당 거래건수 초과
+THROTTLE_RETRIES = 2
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# ✅ 설정값으로 한 번만 만드는 공통 헤더
+_base_headers = {
+    "Content-Type": "application/json; charset=utf-8",
+    "appKey": config["APP_KEY"],
+    "appSecret": config["APP_SECRET"],
+}
+_access_token = config.get("ACCESS_TOKEN", "")
+_header_cache = {}
+
+
+def get_session(url):
+    """
+    URL 의 호스트별 Session (커넥션 재사용) 반환
+    """
+    host = urlsplit(url).netloc
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS,
+                                      pool_maxsize=POOL_MAXSIZE,
+                                      max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sessions[host] = session
+    return session
+
+
+def _send(method, url, endpoint, timeout, **kwargs):
+    """
+    실제 전송 + (계측이 켜져 있으면) 엔드포인트별 지연 / 오류 기록
+    """
+    if not metrics.enabled:
+        return get_session(url).request(method, url, timeout=timeout, **kwargs)
+    start = time.perf_counter()
+    try:
+        resp = get_session(url).request(method, url, timeout=timeout, **kwargs)
+    except Exception as e:
+        metrics.inc("http_request_errors_total", endpoint=endpoint, reason=type(e).__name__)
+        raise
+    finally:
+        metrics.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint, method=method)
+    if resp.status_code >= 400:
+        metrics.inc("http_request_errors_total", endpoint=endpoint, reason=str(resp.status_code))
+    return resp
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    KIS(url_base) 호출은 모두 rate_limiter 를 거침 (주문 우선)
+    초당 한도 초과 응답이면 버킷을 비우고 재시도
+    """
+    if not url.startswith(url_base):
+        return _send(method, url, urlsplit(url).netloc, timeout, **kwargs)
+
+    path = urlsplit(url).path
+    kind = classify(path)
+    for attempt in range(THROTTLE_RETRIES + 1):
+        with metrics.timer("rate_limit_wait_seconds", kind=kind):
+            rate_limiter.acquire(kind)
+        resp = _send(method, url, path, timeout, **kwargs)
+        if resp.status_code < 500 or THROTTLE_CODE not in resp.text or attempt == THROTTLE_RETRIES:
+            return resp
+        rate_limiter.throttled(kind)
+        metrics.inc("http_request_errors_total", endpoint=path, reason="throttle")
+        print(f"[호출 한도 초과] {kind} {urlsplit(url).path} → 재시도 {attempt + 1}/{THROTTLE_RETRIES}")
+    return resp
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def close_all():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+# -----------------------------
+# KIS 헤더 템플릿
+# -----------------------------
+def set_access_token(token):
+    """
+    토큰 갱신 시 호출 → 캐시된 헤더 템플릿 폐기
+    """
+    global _access_token
+    _access_token = token
+    _header_cache.clear()
+
+
+def kis_headers(tr_id, custtype="P"):
+    """
+    tr_id 별 헤더 (읽기 전용으로 사용, 토큰이 바뀌기 전까지 재사용)
+    custtype=None 이면 custtype 헤더 생략
+    """
+    key = (tr_id, custtype)
+    headers = _header_cache.get(key)
+    if headers is None:
+        headers = dict(_base_headers)
+        headers["authorization"] = f"Bearer {_access_token}"
+        headers["tr_id"] = tr_id
+        if custtype:
+            headers["custtype"] = custtype
+        _header_cache[key] = headers
+    return headers
+
+
+def kis_get(path, tr_id, params, custtype="P", timeout=DEFAULT_TIMEOUT, tr_cont=""):
+    """
+    tr_cont="N" 이면 연속조회 (캐시된 헤더는 건드리지 않고 복사본에 추가)
+    """
+    headers = kis_headers(tr_id, custtype)
+    if tr_cont:
+        headers = dict(headers, tr_cont=tr_cont)
+    return get(f"{url_base}{path}", headers=headers, params=params, timeout=timeout)
+
+
+def kis_post(path, tr_id, body, custtype="P", timeout=DEFAULT_TIMEOUT):
+    return post(f"{url_base}{path}", headers=kis_headers(tr_id, custtype), json=body, timeout=timeout)
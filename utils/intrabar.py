@@ -0,0 +1,331 @@
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from utils.data_store import ohlcv_store
+from utils.helpers import (
+    fetch_data,
+    column_values,
+    compute_buy_signals,
+    simulate_thresholds_batch,
+    grid_results,
+    bar_timestamps,
+)
+from utils.strategies import strategy_names
+from utils.metrics import metrics
+
+# -----------------------------
+# 분봉 기반 봉 내부(intrabar) 백테스트
+# -----------------------------
+# 5분봉 시뮬레이션은 한 봉 안에서 고가가 익절가, 저가가 손절가를 둘 다 건드리면 어느 쪽이 먼저인지 모름 (익절 우선으로 가정)
+# → 매수 판단은 5분봉 그대로, 청산은 그 5분봉을 이루는 1분봉을 시간순으로 훑어 먼저 닿은 쪽으로 결정
+#   1분봉은 로컬 저장소(data_cache/{TICKER}_1m, memmap)에 쌓아 두고 필요한 구간만 읽음
+#     - yfinance : 최근 7일 (OHLCVStore.update 로 증분 누적)
+#     - KIS      : 해외주식분봉조회 다음조회로 약 1개월 (download_minute_bars_kis)
+#     - 파일     : CSV / parquet (import_minute_file) → 수년치 백필
+MINUTE_INTERVAL = "1m"
+MARKET_TZ = "America/New_York"
+
+# 로컬 파일 컬럼명 후보 → 저장소 컬럼명
+FILE_COLUMNS = {
+    "open": "Open", "high": "High", "low": "Low", "close": "Close",
+    "adj close": "Adj Close", "adj_close": "Adj Close", "volume": "Volume",
+    "last": "Close", "evol": "Volume",
+}
+TIME_COLUMNS = ("datetime", "timestamp", "time", "date")
+
+# 해외주식분봉조회 xhms 가 봉 시작 시각인지 끝 시각인지 (api 문서 예시: 15:55 봉 거래량이 장 마감 체결을 포함 → 시작)
+# 실제 응답으로 확인하려면 detect_minute_label(rows, 같은 구간 yfinance 1분봉)
+KIS_MINUTE_LABEL = "start"
+
+
+def interval_ns(interval):
+    """
+    "1m" / "5m" / "1h" / "1d" → 봉 길이 (ns)
+    """
+    interval = str(interval).strip().lower()
+    units = (("m", "min"), ("h", "h"), ("d", "D"))
+    for suffix, unit in units:
+        if interval.endswith(suffix) and interval[:-len(suffix)].isdigit():
+            return pd.Timedelta(int(interval[:-len(suffix)]), unit=unit).value
+    raise ValueError(f"알 수 없는 봉 주기: {interval}")
+
+# -----------------------------
+# 분봉 수집 (KIS / 파일)
+# -----------------------------
+def parse_minute_rows(rows, nmin=1, label=KIS_MINUTE_LABEL, tz=MARKET_TZ):
+    """
+    해외주식분봉조회 output2 → (Open, High, Low, Close, Volume) DataFrame (시각 오름차순, 인덱스 = 봉 시작 시각)
+    label="start": 현지시각(xymd + xhms)을 그대로 봉 시작 시각으로
+    label="end"  : 봉 끝 시각으로 보고 nmin 분 당김
+    """
+    if not rows:
+        return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+    frame = pd.DataFrame(rows)
+    index = pd.to_datetime(frame["xymd"] + frame["xhms"], format="%Y%m%d%H%M%S")
+    if label == "end":
+        index = index - pd.Timedelta(minutes=int(nmin))
+    data = pd.DataFrame({
+        "Open": pd.to_numeric(frame["open"], errors="coerce").to_numpy(),
+        "High": pd.to_numeric(frame["high"], errors="coerce").to_numpy(),
+        "Low": pd.to_numeric(frame["low"], errors="coerce").to_numpy(),
+        "Close": pd.to_numeric(frame["last"], errors="coerce").to_numpy(),
+        "Volume": pd.to_numeric(frame["evol"], errors="coerce").to_numpy(),
+    }, index=pd.DatetimeIndex(index).tz_localize(tz, ambiguous="NaT", nonexistent="NaT"))
+    data = data[data.index.notna()]
+    return data[~data.index.duplicated(keep="last")].sort_index()
+
+
+def detect_minute_label(rows, reference, nmin=1, tz=MARKET_TZ):
+    """
+    KIS 분봉 응답 rows 를 "start" / "end" 두 가지로 읽어, 겹치는 구간의 기준 분봉(reference, 예: yfinance 1m)
+    종가와 더 많이 맞는 쪽 반환 → (label, {label: 일치율}) / 겹치는 봉이 없으면 (None, {})
+    """
+    scores = {}
+    for label in ("start", "end"):
+        bars = parse_minute_rows(rows, nmin=nmin, label=label, tz=tz)
+        common = bars.index.intersection(reference.index)
+        if len(common):
+            scores[label] = float(np.mean(np.isclose(bars.loc[common, "Close"].to_numpy(),
+                                                     reference.loc[common, "Close"].to_numpy(), rtol=1e-4)))
+    if not scores:
+        return None, scores
+    return max(scores, key=scores.get), scores
+
+
+def download_minute_bars_kis(ticker, exchange="NAS", nmin=1, max_pages=200, since=None, label=KIS_MINUTE_LABEL):
+    """
+    해외주식분봉조회 다음조회(KEYB)로 최신 → 과거 방향 수집 (since 이전에 닿거나 더 없으면 중단)
+    label: xhms 해석 (parse_minute_rows 참고)
+    KIS 설정(config.yaml)이 있어야 하므로 여기서만 utils.api 를 불러옴
+    """
+    from utils.api import inquire_minute_bars_page
+
+    since = pd.Timestamp(since).tz_convert(MARKET_TZ) if since is not None else None
+    frames = []
+    keyb = ""
+    for _ in tqdm(range(max_pages), desc=f"{ticker} 분봉"):
+        rows, more = inquire_minute_bars_page(ticker, exchange, nmin=nmin, keyb=keyb)
+        page = parse_minute_rows(rows, nmin=nmin, label=label)
+        if page.empty:
+            break
+        frames.append(page)
+        oldest = page.index[0]
+        if not more or (since is not None and oldest <= since):
+            break
+        # 다음조회 키: 응답에 찍힌 가장 오래된 봉 시각(xhms)보다 nmin 분 앞
+        raw_oldest = oldest + pd.Timedelta(minutes=int(nmin)) if label == "end" else oldest
+        keyb = (raw_oldest - pd.Timedelta(minutes=int(nmin))).tz_localize(None).strftime("%Y%m%d%H%M%S")
+    if not frames:
+        return parse_minute_rows([])
+    data = pd.concat(frames)
+    data = data[~data.index.duplicated(keep="last")].sort_index()
+    return data if since is None else data[data.index >= since]
+
+
+def read_minute_file(path, tz=MARKET_TZ):
+    """
+    로컬 분봉 파일 (CSV / parquet) → 저장소 컬럼 형식 DataFrame
+    시각 컬럼(datetime / timestamp / time / date) 또는 인덱스가 시각이어야 함, tz 없으면 tz 로 간주
+    """
+    frame = pd.read_parquet(path) if str(path).endswith(".parquet") else pd.read_csv(path)
+    lower = {str(c).strip().lower(): c for c in frame.columns}
+    time_column = next((lower[c] for c in TIME_COLUMNS if c in lower), None)
+    values = frame[time_column] if time_column is not None else frame.index
+    try:
+        index = pd.DatetimeIndex(pd.to_datetime(values))
+    except ValueError:
+        # 서머타임 전후로 오프셋(-05:00 / -04:00)이 섞인 경우
+        index = pd.DatetimeIndex(pd.to_datetime(values, utc=True)).tz_convert(tz)
+    if index.tz is None:
+        index = index.tz_localize(tz, ambiguous="NaT", nonexistent="NaT")
+    data = pd.DataFrame({FILE_COLUMNS[c]: pd.to_numeric(frame[lower[c]], errors="coerce").to_numpy()
+                         for c in lower if c in FILE_COLUMNS}, index=index)
+    data = data[data.index.notna()]
+    return data[~data.index.duplicated(keep="last")].sort_index()
+
+
+def import_minute_file(ticker, path, interval=MINUTE_INTERVAL, store=ohlcv_store):
+    """
+    로컬 파일 분봉을 저장소에 합침 (기존 봉 유지, 겹치면 파일 우선) → 늘어난 행 수
+    """
+    return store.merge(ticker, interval, read_minute_file(path))
+
+
+def update_minute_store(ticker, source="yfinance", exchange="NAS", store=ohlcv_store):
+    """
+    저장소의 1분봉을 최신으로 갱신
+      source="yfinance" : 최근 7일 증분 (매일 돌리면 계속 쌓임)
+      source="kis"      : 해외주식분봉조회로 저장된 마지막 봉 이후 (비었으면 조회 가능한 전체)
+    """
+    if source == "kis":
+        meta = store.read_meta(ticker, MINUTE_INTERVAL)
+        since = pd.Timestamp(meta["last_ts"], tz="UTC") if meta["last_ts"] else None
+        return store.merge(ticker, MINUTE_INTERVAL, download_minute_bars_kis(ticker, exchange, since=since))
+    return store.update(ticker, MINUTE_INTERVAL, period="7d", max_age=0)
+
+# -----------------------------
+# 봉 내부 시뮬레이션
+# -----------------------------
+def minute_bounds(bar_ts, minute_ts, bar_ns):
+    """
+    i 번째 봉 [bar_ts[i], 다음 봉 시작 또는 +bar_ns) 에 속하는 분봉 위치 [starts[i], ends[i])
+    반환: (starts, ends) int 배열 — 분봉이 없는 봉은 starts == ends
+    """
+    bar_ts = np.asarray(bar_ts, dtype=np.int64)
+    ends_ts = np.minimum(np.append(bar_ts[1:], bar_ts[-1] + bar_ns), bar_ts + bar_ns)
+    starts = np.searchsorted(minute_ts, bar_ts, side="left")
+    ends = np.searchsorted(minute_ts, ends_ts, side="left")
+    return starts, ends
+
+
+def advance_grid_bar_intrabar(high, low, signal, position, entry_price, tp_mult, sl_mult,
+                              minute_highs, minute_lows, tie_loss=True):
+    """
+    advance_grid_bar 의 분봉 버전: 보유 조합마다 익절가 / 손절가에 처음 닿는 분봉 위치를 비교
+      - 같은 분봉에서 둘 다 닿으면 tie_loss=True 면 손절 (보수적), False 면 익절
+      - 분봉이 없으면 5분봉 규칙 (익절 우선) 그대로
+      - 분봉은 있는데 5분봉 고가 / 저가까지 못 가서 (피드 불일치) 5분봉으로는 청산인데 분봉으로는 아닌 조합도 5분봉 규칙
+    반환: (win, loss, ambiguous, changed, fallback)
+      ambiguous : 5분봉만으로는 둘 다 닿아 순서를 몰랐던 청산
+      changed   : 같은 봉에서 5분봉 규칙과 다르게 판정된 청산 (익절↔손절, 또는 한쪽만 청산)
+      fallback  : 피드 불일치로 5분봉 규칙을 쓴 청산
+    """
+    holding = position.copy()
+    win = loss = ambiguous = changed = fallback = np.zeros_like(holding)
+
+    if holding.any():
+        tp_price = entry_price * tp_mult
+        sl_price = entry_price * sl_mult
+        bar_win = holding & (high >= tp_price)
+        bar_loss = holding & ~bar_win & (low <= sl_price)
+        ambiguous = bar_win & (low <= sl_price)
+        if len(minute_highs) == 0:
+            win, loss = bar_win, bar_loss
+        else:
+            # 누적 최고가는 오름차순, 누적 최저가는 내림차순 → 처음 닿는 분봉 = searchsorted
+            n = len(minute_highs)
+            tp_at = np.searchsorted(np.maximum.accumulate(minute_highs), tp_price, side="left")
+            sl_at = np.searchsorted(-np.minimum.accumulate(minute_lows), -sl_price, side="left")
+            first_tp = (tp_at < sl_at) if tie_loss else (tp_at <= sl_at)
+            win = holding & (tp_at < n) & first_tp
+            loss = holding & ~win & (sl_at < n)
+            fallback = (bar_win | bar_loss) & ~(win | loss)
+            win = win | (fallback & bar_win)
+            loss = loss | (fallback & bar_loss)
+            changed = (win != bar_win) | (loss != bar_loss)
+        position &= ~(win | loss)
+
+    if signal:
+        entry_price[~holding] = low  # ✅ 5분봉 시뮬레이션과 같은 진입 가정 (신호 봉 저가)
+        position |= ~holding
+
+    return win, loss, ambiguous, changed, fallback
+
+
+def simulate_thresholds_intrabar(highs, lows, signals, starts, ends, minute_highs, minute_lows,
+                                 take_profit_values, stop_loss_values,
+                                 initial_balance=10000, start=2, tie_loss=True):
+    """
+    simulate_thresholds_batch 와 같은 그리드 / 같은 진입 규칙, 청산만 분봉 순서로 판정
+    minute_highs / minute_lows 는 memmap 슬라이스 그대로 받아 봉마다 필요한 몇 줄만 읽음
+    반환: (balance, wins, losses, ambiguous, changed, fallback) — 조합별 청산 수
+      ambiguous / changed / fallback 정의는 advance_grid_bar_intrabar 참고
+    """
+    tp_grid, sl_grid = np.meshgrid(np.asarray(take_profit_values, dtype=np.float64),
+                                   np.asarray(stop_loss_values, dtype=np.float64),
+                                   indexing="ij")
+    tp_mult = 1 + tp_grid / 100
+    sl_mult = 1 + sl_grid / 100
+
+    balance = np.full(tp_grid.shape, float(initial_balance))
+    position = np.zeros(tp_grid.shape, dtype=bool)
+    entry_price = np.zeros(tp_grid.shape)
+    wins = np.zeros(tp_grid.shape, dtype=np.int64)
+    losses = np.zeros(tp_grid.shape, dtype=np.int64)
+    ambiguous = np.zeros(tp_grid.shape, dtype=np.int64)
+    changed = np.zeros(tp_grid.shape, dtype=np.int64)
+    fallback = np.zeros(tp_grid.shape, dtype=np.int64)
+
+    for i in range(start, len(highs)):
+        a, b = starts[i], ends[i]
+        win, loss, both, differs, missed = advance_grid_bar_intrabar(
+            highs[i], lows[i], signals[i], position, entry_price,
+            tp_mult, sl_mult, minute_highs[a:b], minute_lows[a:b], tie_loss)
+        balance[win] *= tp_mult[win]
+        balance[loss] *= sl_mult[loss]
+        wins += win
+        losses += loss
+        ambiguous += both
+        changed += differs
+        fallback += missed
+
+    return balance, wins, losses, ambiguous, changed, fallback
+
+
+@metrics.timed("optimizer_seconds", kind="intrabar")
+def backtest_intrabar(ticker,
+                      interval="5m",
+                      period="60d",
+                      take_profit_range=(0.5, 2.0, 0.5),
+                      stop_loss_range=(-5.0, -1.0, 1.0),
+                      modes=None,
+                      minute_interval=MINUTE_INTERVAL,
+                      tie="stop_loss",
+                      store=ohlcv_store):
+    """
+    5분봉 시그널 + 1분봉 청산 순서로 그리드 백테스트, 5분봉 가정(익절 우선) 결과와 나란히 보고
+    분봉은 저장소에 있는 만큼만 사용 (없는 봉은 5분봉 규칙) → 먼저 update_minute_store / import_minute_file
+    반환: (분봉 기준 결과 목록, 요약 dict)
+    """
+    modes = tuple(modes or strategy_names(optimizable_only=True))
+    df = fetch_data(ticker, interval=interval, period=period)
+    bar_ts = bar_timestamps(df)
+    bar_ns = interval_ns(interval)
+
+    minute_ts, minute = store.view(ticker, minute_interval, start=int(bar_ts[0]), end=int(bar_ts[-1]) + bar_ns)
+    starts, ends = minute_bounds(bar_ts, minute_ts, bar_ns)
+    covered = float(np.mean(ends > starts)) * 100 if len(bar_ts) else 0.0
+
+    take_profit_values = np.arange(*take_profit_range)
+    stop_loss_values = np.arange(*stop_loss_range)
+    highs = column_values(df, "high")
+    lows = column_values(df, "low")
+
+    results, bar_results = [], []
+    ambiguous_total = changed_total = fallback_total = 0
+    for mode in tqdm(modes, desc="Intrabar"):
+        signals = compute_buy_signals(df, mode=mode)
+        balance, wins, losses, ambiguous, changed, fallback = simulate_thresholds_intrabar(
+            highs, lows, signals, starts, ends, minute["High"], minute["Low"],
+            take_profit_values, stop_loss_values, tie_loss=(tie == "stop_loss"))
+        results.extend(grid_results(interval, mode, take_profit_values, stop_loss_values,
+                                    balance, wins, losses))
+        bar_balance, bar_wins, bar_losses = simulate_thresholds_batch(
+            highs, lows, signals, take_profit_values, stop_loss_values)
+        bar_results.extend(grid_results(interval, mode, take_profit_values, stop_loss_values,
+                                        bar_balance, bar_wins, bar_losses))
+        ambiguous_total += int(ambiguous.sum())
+        changed_total += int(changed.sum())
+        fallback_total += int(fallback.sum())
+
+    best = max(results, key=lambda x: x[4])
+    bar_best = max(bar_results, key=lambda x: x[4])
+    summary = {
+        "bars": len(bar_ts),
+        "minute_bars": len(minute_ts),
+        "coverage": covered,
+        "ambiguous_exits": ambiguous_total,
+        "changed_outcomes": changed_total,
+        "fallback_exits": fallback_total,
+        "best": best,
+        "bar_best": bar_best,
+    }
+    print(
+        f"\n🔬 [{interval}→{minute_interval}] {ticker} 분봉 {len(minute_ts)}개 (봉 커버리지 {covered:.1f}%)"
+        f" | 순서가 애매했던 청산 {ambiguous_total}건 / 5분봉 가정과 판정이 달라진 청산 {changed_total}건"
+        f" / 분봉 불일치로 5분봉 규칙 사용 {fallback_total}건"
+        f"\n   분봉 기준 최적: {best[1]} | 익절 {best[2]}% / 손절 {best[3]}% → ${best[4]:.2f} | 승률 {best[5]:.1f}% ({best[6]}회)"
+        f"\n   5분봉 가정 최적: {bar_best[1]} | 익절 {bar_best[2]}% / 손절 {bar_best[3]}% → ${bar_best[4]:.2f}"
+        f" | 승률 {bar_best[5]:.1f}% ({bar_best[6]}회)"
+    )
+    return results, summary
@@ -0,0 +1,300 @@
+import json
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+# -----------------------------
+# 주문 / 체결 / 포지션 저널 (SQLite WAL, 추가 전용)
+# -----------------------------
+# 재시작(장 마감 종료, 크래시) 후에도 보유 포지션과 미완료 주문을 잃지 않도록 모든 변화를 한 줄씩 추가
+#   - record() 는 메모리 큐에 넣고 바로 반환 (µs), 기록 스레드가 commit_interval 마다 모아서 한 번에 commit (그룹 커밋)
+#   - 시작할 때 마지막 checkpoint 이후 줄만 재생 → 메모리 상태(포지션 / 미완료 주문) 복원
+#   - 브로커와는 복원 결과와 다른 부분(delta)만 맞춤 (reconcile)
+DEFAULT_JOURNAL_PATH = "trade_journal.db"
+CHECKPOINT_EVERY = 5000     # 재생한 줄이 이보다 많으면 현재 상태를 checkpoint 로 한 줄 남김
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq      INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts       REAL    NOT NULL,
+    kind     TEXT    NOT NULL,
+    symbol   TEXT,
+    exchange TEXT,
+    odno     TEXT,
+    side     TEXT,
+    qty      INTEGER,
+    price    REAL,
+    data     TEXT
+)
+"""
+INSERT = ("INSERT INTO events (ts, kind, symbol, exchange, odno, side, qty, price, data) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+JournalEvent = namedtuple("JournalEvent", ["seq", "ts", "kind", "symbol", "exchange", "odno", "side", "qty", "price", "data"])
+# kind: "order"      — 주문 접수 (odno, side, qty, price)
+#       "fill"       — 새로 체결된 수량 / 체결가 (미완료 주문의 누적 체결로 합산, 포지션은 "position" 으로 복원)
+#       "order_done" — 주문 종료 (data = 최종 상태: filled / cancelled / rejected)
+#       "position"   — 종목 포지션 절대값 (qty = 0 이면 청산), price = 평균단가
+#       "checkpoint" — data = 그 시점 전체 상태 JSON (재생 시작점)
+
+
+class JournalState:
+    """
+    저널을 재생해서 만든 메모리 상태
+      positions   : {종목: {"entry_price": float, "qty": int, "exchange": str}}
+      open_orders : {odno: {"symbol", "exchange", "side", "qty", "price", "ts", "filled", "amount"}}
+                    filled / amount = 지금까지 저널에 남긴 체결의 누적 수량 / 금액
+    """
+
+    def __init__(self, positions=None, open_orders=None):
+        self.positions = positions or {}
+        self.open_orders = open_orders or {}
+        self.last_seq = 0
+        self.replayed = 0
+
+    def apply(self, event):
+        kind = event.kind
+        if kind == "position":
+            if event.qty:
+                self.positions[event.symbol] = {"entry_price": event.price, "qty": event.qty,
+                                                "exchange": event.exchange}
+            else:
+                self.positions.pop(event.symbol, None)
+        elif kind == "order":
+            if event.odno:
+                self.open_orders[event.odno] = {"symbol": event.symbol, "exchange": event.exchange,
+                                                "side": event.side, "qty": event.qty,
+                                                "price": event.price, "ts": event.ts,
+                                                "filled": 0, "amount": 0.0}
+        elif kind == "fill":
+            order = self.open_orders.get(event.odno)
+            if order is not None:
+                order["filled"] = order.get("filled", 0) + event.qty
+                order["amount"] = order.get("amount", 0.0) + event.qty * event.price
+        elif kind == "order_done":
+            self.open_orders.pop(event.odno, None)
+        elif kind == "checkpoint":
+            data = json.loads(event.data)
+            self.positions = data.get("positions", {})
+            self.open_orders = data.get("open_orders", {})
+        self.last_seq = event.seq
+
+    def to_json(self):
+        return json.dumps({"positions": self.positions, "open_orders": self.open_orders},
+                          ensure_ascii=False, separators=(",", ":"))
+
+
+class TradeJournal:
+    """
+    추가 전용 거래 저널
+      - 쓰기는 기록 스레드 한 곳에서만 (SQLite 연결 공유 안 함), WAL + synchronous=NORMAL
+      - commit_interval 초 동안 쌓인 줄을 executemany 한 번 + commit 한 번
+        → 크래시 때 잃을 수 있는 건 마지막 commit_interval 동안의 기록뿐
+      - flush() 는 지금까지 넣은 줄이 디스크에 commit 될 때까지 대기
+      - state 는 record 할 때마다 바로 갱신 (commit 을 기다리지 않음)
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, commit_interval=0.05):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.state = JournalState()
+        self.written = 0
+        self.commits = 0
+
+        self._pending = []
+        self._cond = threading.Condition()
+        self._queued = 0
+        self._committed = 0
+        self._stopping = False
+        self._thread = None
+
+        conn = self._connect()
+        try:
+            self._replay(conn)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(SCHEMA)
+        conn.commit()
+        return conn
+
+    # -----------------------------
+    # 재생
+    # -----------------------------
+    def _replay(self, conn):
+        """
+        마지막 checkpoint 부터 끝까지 읽어 state 복원, 줄이 많으면 새 checkpoint 추가
+        """
+        start = time.perf_counter()
+        row = conn.execute("SELECT MAX(seq) FROM events WHERE kind = 'checkpoint'").fetchone()
+        first = row[0] or 0
+        cursor = conn.execute("SELECT seq, ts, kind, symbol, exchange, odno, side, qty, price, data "
+                              "FROM events WHERE seq >= ? ORDER BY seq", (first,))
+        state = JournalState()
+        for values in cursor:
+            state.apply(JournalEvent(*values))
+            state.replayed += 1
+        self.state = state
+
+        if state.replayed > CHECKPOINT_EVERY:
+            conn.execute(INSERT, (time.time(), "checkpoint", None, None, None, None, None, None, state.to_json()))
+            conn.commit()
+        elapsed = (time.perf_counter() - start) * 1000
+        if state.replayed:
+            print(f"📒 저널 재생 {state.replayed}줄 ({elapsed:.1f}ms) | 포지션 {len(state.positions)}개"
+                  f" / 미완료 주문 {len(state.open_orders)}건")
+
+    # -----------------------------
+    # 기록 (즉시 반환)
+    # -----------------------------
+    def record(self, kind, symbol=None, exchange=None, odno=None, side=None, qty=None, price=None, data=None):
+        event = JournalEvent(0, time.time(), kind, symbol, exchange,
+                             str(odno) if odno is not None else None, side,
+                             int(qty) if qty is not None else None,
+                             float(price) if price is not None else None, data)
+        with self._cond:
+            self._pending.append(event[1:])
+            self._queued += 1
+            self.state.apply(event)
+            if self._thread is None:
+                self._start_locked()
+            self._cond.notify_all()
+
+    def order(self, odno, symbol, exchange, side, qty, price):
+        self.record("order", symbol, exchange, odno, side, qty, price)
+
+    def fill(self, odno, symbol, exchange, side, qty, price):
+        self.record("fill", symbol, exchange, odno, side, qty, price)
+
+    def order_done(self, odno, symbol, status):
+        self.record("order_done", symbol, odno=odno, data=status)
+
+    def position(self, symbol, exchange, qty, entry_price):
+        self.record("position", symbol, exchange, qty=qty, price=entry_price)
+
+    def close_position(self, symbol, exchange=None):
+        self.record("position", symbol, exchange, qty=0, price=0.0)
+
+    def resume(self, tracker, odno):
+        """
+        미완료 주문 odno 를 FillTracker 로 이어서 추적 → TrackedOrder (이미 전량 체결이면 order_done 남기고 None)
+        저널의 누적 체결수량 / 주문 시각으로 시작하므로
+          - 이미 반영한 체결이 첫 조회 때 새 체결 이벤트로 다시 나오지 않고
+          - 하루 넘게 지난 주문도 체결내역 조회 구간에 들어감
+        """
+        order = self.open_orders[odno]
+        filled = order.get("filled", 0)
+        if filled >= order["qty"]:
+            self.order_done(odno, order["symbol"], "filled")
+            return None
+        return tracker.track(odno, order["symbol"], order["exchange"], order["side"], order["qty"], order["price"],
+                             filled_qty=filled, fill_amount=order.get("amount", 0.0), created=order["ts"])
+
+    @property
+    def positions(self):
+        return self.state.positions
+
+    @property
+    def open_orders(self):
+        return self.state.open_orders
+
+    # -----------------------------
+    # 브로커 대조 (재시작 후 delta 만)
+    # -----------------------------
+    def reconcile(self, holdings, symbols=None):
+        """
+        holdings: AccountSnapshot.holdings ({종목: Holding}) — 시작 때 이미 받은 계좌 스냅샷 재사용
+        symbols : 운용 중인 종목만 대조 (None = 저널 + 잔고 전체)
+        저널과 수량이 다른 종목만 브로커 기준으로 고치고 "position" 을 남김 → 바뀐 종목 목록 반환
+        """
+        if symbols is None:
+            symbols = set(self.positions) | set(holdings)
+        changed = []
+        for symbol in symbols:
+            local = self.positions.get(symbol)
+            holding = holdings.get(symbol)
+            local_qty = local["qty"] if local else 0
+            broker_qty = holding.qty if holding else 0
+            if local_qty == broker_qty:
+                continue
+            if broker_qty:
+                entry = local["entry_price"] if local else holding.avg_price
+                self.record("position", symbol, holding.exchange or (local or {}).get("exchange"),
+                            qty=broker_qty, price=entry, data="reconcile")
+            else:
+                self.record("position", symbol, (local or {}).get("exchange"), qty=0, price=0.0, data="reconcile")
+            changed.append((symbol, local_qty, broker_qty))
+        return changed
+
+    # -----------------------------
+    # 기록 스레드 (그룹 커밋)
+    # -----------------------------
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending or self._stopping)
+                    if not self._pending and self._stopping:
+                        break
+                if self.commit_interval and not self._stopping:
+                    time.sleep(self.commit_interval)    # 그 사이 들어온 줄까지 한 번에
+                with self._cond:
+                    batch, self._pending = self._pending, []
+                    target = self._queued
+                try:
+                    conn.executemany(INSERT, batch)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    print(f"[저널 기록 오류] {e}")
+                    with self._cond:
+                        self._pending[:0] = batch
+                    time.sleep(1.0)
+                    continue
+                with self._cond:
+                    self.written += len(batch)
+                    self.commits += 1
+                    self._committed = target
+                    self._cond.notify_all()
+        finally:
+            conn.close()
+
+    def _start_locked(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="trade-journal", daemon=True)
+        self._thread.start()
+
+    def flush(self, timeout=5.0):
+        """
+        지금까지 record 한 줄이 모두 commit 될 때까지 대기 (종료 직전 등)
+        """
+        with self._cond:
+            target = self._queued
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    def close(self, timeout=5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+
+_journal = None
+
+
+def get_journal(path=DEFAULT_JOURNAL_PATH):
+    """
+    프로세스 공용 TradeJournal (처음 호출 때 재생)
+    """
+    global _journal
+    if _journal is None:
+        _journal = TradeJournal(path)
+    return _journal
@@ -0,0 +1,274 @@
+import os
+import time
+import functools
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -----------------------------
+# 지연/호출 수 계측 (Prometheus 텍스트 형식)
+# -----------------------------
+# 기본은 꺼져 있음 → timer() 는 미리 만든 빈 컨텍스트, observe()/inc() 는 플래그 확인 후 바로 반환
+# 켜려면 메인 스크립트에서 metrics.enable(port=..., textfile=...)
+#   - port     : 127.0.0.1:port/metrics 로 노출 (Prometheus scrape / curl)
+#   - textfile : interval 초마다 파일로 기록 (node_exporter textfile collector 용)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "http_request_seconds": "HTTP 호출 지연 (KIS 는 endpoint=경로, 그 외는 호스트)",
+    "http_request_errors_total": "HTTP 호출 오류 수 (reason=예외 이름 / HTTP 상태 / throttle)",
+    "rate_limit_wait_seconds": "KIS 호출 한도 대기 시간",
+    "loop_stage_seconds": "메인 루프 단계별 소요 시간",
+    "loop_iteration_seconds": "메인 루프 1회 전체 소요 시간",
+    "fetch_data_seconds": "봉 데이터 조회 + 지표 계산 시간",
+    "optimizer_seconds": "전략 최적화 소요 시간",
+    "tick_decision_seconds": "틱 매수 판정 지연",
+    "orders_total": "주문 요청 수 (side, result)",
+    "discord_queue_depth": "디스코드 전송 대기 메시지 수",
+    "discord_dropped_total": "큐가 가득 차서 버린 디스코드 메시지 수",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    """
+    카운터 / 히스토그램 / 게이지(콜백) 보관 + Prometheus 텍스트 렌더링
+    모든 값은 (이름, 라벨) 단위, 스레드 안전
+    """
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}       # 이름 → {라벨키: 값}
+        self._histograms = {}     # 이름 → {라벨키: [버킷별 개수..., 합, 개수]}
+        self._gauges = {}         # 이름 → {라벨키: 콜백}
+        self._server = None
+        self._writer = None
+        self._stopping = threading.Event()
+
+    # -----------------------------
+    # 기록
+    # -----------------------------
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            values[index] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    def timer(self, name, **labels):
+        """
+        with metrics.timer("loop_stage_seconds", stage="price"): ...
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def timed(self, name, **labels):
+        """
+        함수 데코레이터 버전 (꺼져 있으면 플래그 확인 1번)
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name, labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def gauge(self, name, callback, **labels):
+        """
+        렌더링할 때만 callback() 을 호출하는 게이지 (큐 길이 등)
+        """
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = callback
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # -----------------------------
+    # 조회 / 출력
+    # -----------------------------
+    def histogram(self, name, **labels):
+        """
+        {"count", "sum", "buckets": [(상한, 누적개수), ...]} (없으면 None)
+        """
+        with self._lock:
+            values = self._histograms.get(name, {}).get(_label_key(labels))
+            values = list(values) if values is not None else None
+        if values is None:
+            return None
+        cumulative, total = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), values[:-2]):
+            total += count
+            cumulative.append((bound, total))
+        return {"count": values[-1], "sum": values[-2], "buckets": cumulative}
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {k: list(v) for k, v in series.items()} for name, series in self._histograms.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+
+        lines = []
+        for name in sorted(counters):
+            lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {value}")
+
+        bounds = [f"{b:g}" for b in self.buckets] + ["+Inf"]
+        for name in sorted(histograms):
+            lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} histogram"]
+            for key, values in sorted(histograms[name].items()):
+                total = 0
+                for bound, count in zip(bounds, values[:-2]):
+                    total += count
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {total}")
+                lines.append(f"{name}_sum{_format_labels(key)} {values[-2]:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {values[-1]}")
+
+        for name in sorted(gauges):
+            lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} gauge"]
+            for key, callback in sorted(gauges[name].items(), key=lambda item: item[0]):
+                try:
+                    value = float(callback())
+                except Exception:
+                    continue
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """
+        원자적 교체 (수집기가 쓰다 만 파일을 읽지 않도록)
+        """
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    # -----------------------------
+    # 노출 (HTTP / 텍스트 파일)
+    # -----------------------------
+    def start_http_server(self, port, host="127.0.0.1"):
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server.server_address
+
+    def start_textfile_writer(self, path, interval=15.0):
+        def run():
+            while not self._stopping.wait(interval):
+                try:
+                    self.write_textfile(path)
+                except OSError as e:
+                    print(f"[계측 파일 기록 오류] {e}")
+            self.write_textfile(path)
+
+        self._writer = threading.Thread(target=run, name="metrics-textfile", daemon=True)
+        self._writer.start()
+
+    def enable(self, port=None, host="127.0.0.1", textfile=None, interval=15.0):
+        self.enabled = True
+        if port and self._server is None:
+            address = self.start_http_server(port, host)
+            print(f"📈 계측 노출: http://{address[0]}:{address[1]}/metrics")
+        if textfile and self._writer is None:
+            self.start_textfile_writer(textfile, interval)
+            print(f"📈 계측 파일: {textfile} ({interval}초마다)")
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._writer is not None:
+            self._writer.join(5.0)
+            self._writer = None
+
+
+metrics = Metrics()
@@ -0,0 +1,183 @@
+import time
+import atexit
+import datetime
+import threading
+from collections import deque, namedtuple
+from utils import http_client
+from utils.metrics import metrics
+
+# -----------------------------
+# 비동기 디스코드 알림 (백그라운드 스레드 + 제한 큐)
+# -----------------------------
+DISCORD_MAX_LENGTH = 2000     # 디스코드 메시지 최대 길이
+
+Notice = namedtuple("Notice", ["timestamp", "message", "key"])
+
+
+class DiscordNotifier:
+    """
+    send() 는 큐에 넣기만 하고 바로 반환 (매매 경로를 막지 않음)
+    백그라운드 스레드가
+      - batch_window 초 동안 모인 메시지를 한 번에 묶어 전송 (2000자 단위로 분할)
+      - 429 응답이면 retry_after 만큼 기다렸다 재전송
+      - 같은 key(예: 30초 현황 보고)는 최신 것만 남기고 생략 건수만 표시
+    큐가 backlog 이상 밀리면 같은 key 의 대기 메시지를 새 것으로 교체,
+    max_queue 가 차면 key 메시지부터 버리고 그래도 없으면 새 메시지를 버림
+    """
+
+    def __init__(self, webhook_url, max_queue=500, backlog=50,
+                 batch_window=1.0, max_retries=5):
+        self.webhook_url = webhook_url
+        self.max_queue = max_queue
+        self.backlog = backlog
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._sending = False
+        self._stopping = False
+        self.skipped = 0      # key 중복으로 생략된 메시지 수 (다음 전송에 요약 표시)
+        self.dropped = 0      # 큐가 가득 차서 버린 메시지 수
+
+        self._thread = threading.Thread(target=self._run, name="discord-notifier", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        metrics.gauge("discord_queue_depth", lambda: len(self._queue))
+
+    # -----------------------------
+    # 생산자 (매매 루프)
+    # -----------------------------
+    def send(self, message, key=None):
+        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        notice = Notice(timestamp, str(message), key)
+
+        with self._cond:
+            if self._stopping:
+                return False
+
+            if key is not None and len(self._queue) >= self.backlog:
+                for pending in self._queue:
+                    if pending.key == key:
+                        self._queue.remove(pending)
+                        self.skipped += 1
+                        break
+
+            if len(self._queue) >= self.max_queue:
+                evicted = next((p for p in self._queue if p.key is not None), None)
+                if evicted is None:
+                    self.dropped += 1
+                    metrics.inc("discord_dropped_total")
+                    return False
+                self._queue.remove(evicted)
+                self.skipped += 1
+
+            self._queue.append(notice)
+            self._cond.notify()
+        return True
+
+    def flush(self, timeout=10.0):
+        """
+        큐가 비고 전송 중인 묶음이 끝날 때까지 대기
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._sending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.notify_all()
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=10.0):
+        """
+        남은 메시지를 모두 보낸 뒤 스레드 종료 (atexit 에 등록됨)
+        """
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    # -----------------------------
+    # 소비자 (백그라운드 스레드)
+    # -----------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue and self._stopping:
+                    self._cond.notify_all()
+                    return
+
+            # 버스트를 한 묶음으로 모으기
+            if not self._stopping:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._stopping, timeout=self.batch_window)
+
+            with self._cond:
+                batch = list(self._queue)
+                self._queue.clear()
+                skipped, self.skipped = self.skipped, 0
+                dropped, self.dropped = self.dropped, 0
+                self._sending = True
+
+            try:
+                for chunk in self._format(batch, skipped, dropped):
+                    self._post(chunk)
+            finally:
+                with self._cond:
+                    self._sending = False
+                    self._cond.notify_all()
+
+    def _format(self, batch, skipped, dropped):
+        # 같은 key 는 마지막 메시지만 남김
+        latest = {}
+        for idx, notice in enumerate(batch):
+            if notice.key is not None:
+                latest[notice.key] = idx
+        lines = []
+        for idx, notice in enumerate(batch):
+            if notice.key is not None and latest[notice.key] != idx:
+                skipped += 1
+                continue
+            lines.append(f"[{notice.timestamp}] {notice.message}"[:DISCORD_MAX_LENGTH])
+        if skipped:
+            lines.append(f"(반복 현황 메시지 {skipped}건 생략)")
+        if dropped:
+            lines.append(f"(알림 대기열 초과로 {dropped}건 누락)")
+
+        chunks, current = [], ""
+        for line in lines:
+            if current and len(current) + 1 + len(line) > DISCORD_MAX_LENGTH:
+                chunks.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _post(self, content):
+        for _ in range(self.max_retries):
+            try:
+                resp = http_client.post(self.webhook_url, data={"content": content})
+            except Exception as e:
+                print(f"[디스코드 전송 오류] {e}")
+                return False
+
+            if resp.status_code != 429:
+                return resp.ok
+
+            # ✅ 레이트리밋: retry_after(초) 만큼 대기 후 재시도
+            try:
+                retry_after = float(resp.json().get("retry_after", 1.0))
+            except ValueError:
+                retry_after = float(resp.headers.get("Retry-After", 1.0))
+            time.sleep(retry_after)
+
+        print("[디스코드 전송 실패] 재시도 한도 초과")
+        return False
@@ -1,19 +1,18 @@
-import requests, json, yaml
+import yaml
+from utils import http_client
 from utils.api import send_discord_message
 from utils.helpers import map_exchange_code
+from utils.metrics import metrics
 # ✅ 설정 로드
 with open("config.yaml", encoding="utf-8") as f:
     config = yaml.load(f, Loader=yaml.FullLoader)
 
-app_key = config["APP_KEY"]
-app_secret = config["APP_SECRET"]
 cano = config["CANO"]
 account_product_code = config["ACNT_PRDT_CD"]
-url_base = config["URL_BASE"]
-access_token = config["ACCESS_TOKEN"]
 
 TR_ID_BUY = "TTTT1002U"
 TR_ID_SELL = "TTTT1006U"
+TR_ID_CANCEL = "TTTT1004U"   # ✅ 미국 실전용 (모의는 VTTT1004U)
 
 
 # ==============================================
@@ -23,16 +22,6 @@ def buy_order(symbol, qty, exchange_short, target_price="0"):
     try:
         exchange = map_exchange_code(exchange_short)  # ✅ 자동 변환
 
-        url = f"{url_base}/uapi/overseas-stock/v1/trading/order"
-        headers = {
-            "Content-Type": "application/json; charset=utf-8",
-            "Authorization": f"Bearer {access_token}",
-            "appKey": app_key,
-            "appSecret": app_secret,
-            "tr_id": TR_ID_BUY,
-            "custtype": "P"
-        }
-
         body = {
             "CANO": cano,
             "ACNT_PRDT_CD": account_product_code,
@@ -45,21 +34,24 @@ def buy_order(symbol, qty, exchange_short, target_price="0"):
         }
 
         print(f"[DEBUG] buy_order body: {body}")
-        res = requests.post(url, headers=headers, data=json.dumps(body))
+        res = http_client.kis_post("/uapi/overseas-stock/v1/trading/order", TR_ID_BUY, body)
 
         data = res.json()
 
         if data.get("rt_cd") == "0":
             output = data.get("output", {})
             order_no = output.get("ODNO", "N/A")
+            metrics.inc("orders_total", side="buy", result="accepted")
             send_discord_message(f"✅ [{symbol}] 매수 성공 ({exchange}) | {qty}주")
             return True, order_no
         else:
             msg = data.get("msg1", "알 수 없는 오류")
+            metrics.inc("orders_total", side="buy", result="rejected")
             send_discord_message(f"❗[{symbol}] 매수 실패 ({exchange}) → {msg}")
             return False,None
 
     except Exception as e:
+        metrics.inc("orders_total", side="buy", result="error")
         send_discord_message(f"[매수 주문 에러] {e}")
         return False,None
 
@@ -70,16 +62,6 @@ def sell_order(symbol, qty, exchange_short, target_price="0"):
     try:
         exchange = map_exchange_code(exchange_short)   # ✅ 자동 변환
 
-        url = f"{url_base}/uapi/overseas-stock/v1/trading/order"
-        headers = {
-            "Content-Type": "application/json; charset=utf-8",
-            "Authorization": f"Bearer {access_token}",
-            "appKey": app_key,
-            "appSecret": app_secret,
-            "tr_id": TR_ID_SELL,
-            "custtype": "P"
-        }
-
         body = {
             "CANO": cano,
             "ACNT_PRDT_CD": account_product_code,
@@ -92,18 +74,21 @@ def sell_order(symbol, qty, exchange_short, target_price="0"):
         }
 
         print(f"[DEBUG] sell_order body: {body}")
-        res = requests.post(url, headers=headers, data=json.dumps(body))
+        res = http_client.kis_post("/uapi/overseas-stock/v1/trading/order", TR_ID_SELL, body)
         data = res.json()
 
         if data.get("rt_cd") == "0":
+            metrics.inc("orders_total", side="sell", result="accepted")
             send_discord_message(f"💰 [{symbol}] 매도 성공 ({exchange}) | {qty}주 @ {target_price}")
             return True
         else:
             msg = data.get("msg1", "알 수 없는 오류")
+            metrics.inc("orders_total", side="sell", result="rejected")
             send_discord_message(f"❗[{symbol}] 매도 실패 ({exchange}) → {msg}")
             return False
 
     except Exception as e:
+        metrics.inc("orders_total", side="sell", result="error")
         send_discord_message(f"[매도 주문 에러] {e}")
         return False
 
@@ -118,16 +103,6 @@ def cancel_order(symbol, order_no, qty, exchange_short):
     try:
         exchange = map_exchange_code(exchange_short)  # ✅ 자동 변환
 
-        url = f"{url_base}/uapi/overseas-stock/v1/trading/order-rvsecncl"
-        headers = {
-            "Content-Type": "application/json; charset=utf-8",
-            "Authorization": f"Bearer {access_token}",
-            "appKey": app_key,
-            "appSecret": app_secret,
-            "tr_id": "TTTT1004U",   # ✅ 미국 실전용 (모의는 VTTT1004U)
-            "custtype": "P"
-        }
-
         body = {
             "CANO": cano,
             "ACNT_PRDT_CD": account_product_code,
@@ -141,21 +116,24 @@ def cancel_order(symbol, order_no, qty, exchange_short):
         }
 
         print(f"[DEBUG] cancel_order body: {body}")
-        res = requests.post(url, headers=headers, data=json.dumps(body))
+        res = http_client.kis_post("/uapi/overseas-stock/v1/trading/order-rvsecncl", TR_ID_CANCEL, body)
         data = res.json()
 
         if data.get("rt_cd") == "0":
             output = data.get("output", {})
             new_order_no = output.get("ODNO", "N/A")
+            metrics.inc("orders_total", side="cancel", result="accepted")
             send_discord_message(
                 f"🧹 [{symbol}] 주문취소 성공 ({exchange}) | 원주문: {order_no} → 취소주문번호: {new_order_no}"
             )
             return True, new_order_no
         else:
             msg = data.get("msg1", "알 수 없는 오류")
+            metrics.inc("orders_total", side="cancel", result="rejected")
             send_discord_message(f"❗[{symbol}] 주문취소 실패 ({exchange}) → {msg}")
             return False, None
 
     except Exception as e:
+        metrics.inc("orders_total", side="cancel", result="error")
         send_discord_message(f"[주문취소 에러] {e}")
         return False, None
\ No newline at end of file
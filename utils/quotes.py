@@ -0,0 +1,162 @@
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils import http_client
+
+# -----------------------------
+# 현재가 조회 계층 (동시 요청 합치기 + 짧은 TTL 캐시 + 대체 엔드포인트 헤징)
+# -----------------------------
+PriceEndpoint = namedtuple("PriceEndpoint", ["name", "path", "tr_id", "output"])
+
+PRICE_ENDPOINTS = (
+    PriceEndpoint("현재체결가", "/uapi/overseas-price/v1/quotations/price", "HHDFS00000300", "output"),
+    PriceEndpoint("현재가상세", "/uapi/overseas-price/v1/quotations/price-detail", "HHDFS76200200", "output"),  # 모의투자 미지원
+)
+
+QUOTE_MAX_AGE = 1.0       # 캐시 허용 나이 (초)
+QUOTE_HEDGE_AFTER = None  # 첫 응답이 이 시간(초) 안에 안 오면 대체 엔드포인트 동시 호출 (None = 헤징 안 함)
+
+
+def fetch_endpoint_price(endpoint, symbol, exchange):
+    """
+    엔드포인트 하나로 현재가 조회 (실패/0 이면 0.0)
+    """
+    resp = http_client.kis_get(endpoint.path, endpoint.tr_id, custtype=None,
+                               params={"AUTH": "", "EXCD": exchange, "SYMB": symbol})
+    data = resp.json()
+    output = data.get(endpoint.output) or {}
+    return float(output.get("last", 0) or 0)
+
+
+class QuoteCache:
+    """
+    get_current_price 앞단
+      - 같은 (종목, 거래소) 동시 요청은 진행 중인 1건을 같이 기다림
+      - max_age 초 이내 값은 캐시에서 바로 반환
+      - hedge_after 가 있으면 첫 엔드포인트가 그 시간 안에 답하지 않을 때(또는 실패 시)
+        나머지 엔드포인트를 같이 호출해 먼저 온 값을 사용
+    """
+
+    def __init__(self, max_age=QUOTE_MAX_AGE, hedge_after=QUOTE_HEDGE_AFTER,
+                 endpoints=PRICE_ENDPOINTS, max_workers=8, fetch=fetch_endpoint_price):
+        self.max_age = max_age
+        self.hedge_after = hedge_after
+        self.endpoints = tuple(endpoints)
+        self._fetch_one = fetch
+
+        self._cache = {}          # (종목, 거래소) → (가격, time.monotonic())
+        self._inflight = {}       # (종목, 거래소) → Future
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quote")
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "hedged": 0, "hedge_wins": 0, "errors": 0}
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def get_price(self, symbol, exchange="NAS", max_age=None):
+        key = (symbol.upper(), exchange.upper())
+        max_age = self.max_age if max_age is None else max_age
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= max_age:
+                self.stats["hits"] += 1
+                return entry[0]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        price = 0.0
+        try:
+            price = self._fetch(*key)
+        finally:
+            with self._lock:
+                if price:
+                    self._cache[key] = (price, time.monotonic())
+                self._inflight.pop(key, None)
+            future.set_result(price)
+        return price
+
+    def _fetch(self, symbol, exchange):
+        primary = self._pool.submit(self._fetch_one, self.endpoints[0], symbol, exchange)
+        pending = {primary}
+        can_hedge = self.hedge_after is not None and len(self.endpoints) > 1
+        hedged = False
+
+        while pending:
+            done, pending = wait(pending, timeout=self.hedge_after if can_hedge and not hedged else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    price = future.result()
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"[가격 조회 오류] {symbol} ({exchange}) → {e}")
+                    price = 0.0
+                if price:
+                    if future is not primary:
+                        self.stats["hedge_wins"] += 1
+                    return price
+
+            # 느리거나 실패 → 대체 엔드포인트 동시 호출 (한 번만)
+            if can_hedge and not hedged:
+                hedged = True
+                self.stats["hedged"] += 1
+                pending |= {self._pool.submit(self._fetch_one, endpoint, symbol, exchange)
+                            for endpoint in self.endpoints[1:]}
+        return 0.0
+
+    # -----------------------------
+    # 캐시 관리
+    # -----------------------------
+    def put(self, symbol, exchange, price):
+        """
+        다른 경로(웹소켓 등)에서 받은 가격을 캐시에 넣기
+        """
+        if price:
+            with self._lock:
+                self._cache[(symbol.upper(), exchange.upper())] = (float(price), time.monotonic())
+
+    def invalidate(self, symbol=None, exchange=None):
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+            else:
+                self._cache.pop((symbol.upper(), (exchange or "NAS").upper()), None)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+_quotes = None
+_quotes_lock = threading.Lock()
+
+
+def get_quote_cache():
+    """
+    프로세스 공용 QuoteCache — 여러 스레드(엔진 to_thread)가 처음에 동시에 불러도 하나만 만듦
+    (둘이 생기면 동시 요청 합치기 맵이 갈라짐)
+    """
+    global _quotes
+    if _quotes is None:
+        with _quotes_lock:
+            if _quotes is None:
+                _quotes = QuoteCache(max_age=http_client.config.get("QUOTE_MAX_AGE", QUOTE_MAX_AGE),
+                                     hedge_after=http_client.config.get("QUOTE_HEDGE_AFTER", QUOTE_HEDGE_AFTER))
+    return _quotes
+
+
+def get_price(symbol, exchange="NAS", max_age=None):
+    """
+    get_current_price 대체 (캐시 / 동시 요청 합치기 / 헤징 적용)
+    """
+    return get_quote_cache().get_price(symbol, exchange, max_age)
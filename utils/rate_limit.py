@@ -0,0 +1,156 @@
+import time
+import heapq
+import threading
+import itertools
+
+# -----------------------------
+# KIS REST 호출 속도 제한 (토큰 버킷)
+# -----------------------------
+ORDER = "order"     # 주문 / 정정·취소
+QUOTE = "quote"     # 시세 / 잔고 / 체결 조회 등 나머지 전부
+
+PRIORITY = {ORDER: 0, QUOTE: 1}   # 숫자가 작을수록 먼저
+
+# 주문 계열 경로 (나머지는 모두 QUOTE)
+ORDER_PATHS = (
+    "/uapi/overseas-stock/v1/trading/order",
+    "/uapi/overseas-stock/v1/trading/order-rvsecncl",
+)
+
+
+def classify(path):
+    """
+    URL 경로 → 버킷 종류
+    """
+    for prefix in ORDER_PATHS:
+        if path.startswith(prefix):
+            return ORDER
+    return QUOTE
+
+
+class TokenBucket:
+    """
+    초당 rate 개씩 채워지고 최대 capacity 개까지 쌓이는 버킷 (락은 RateLimiter 가 잡음)
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, need=1.0):
+        """
+        토큰 need 개가 찰 때까지 남은 시간 (초)
+        """
+        return max(0.0, (need - self.tokens) / self.rate)
+
+    def drain(self, now):
+        self.refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """
+    전체 버킷(계정당 초당 한도) + 종류별 버킷(주문 / 조회)
+      - 호출 1건 = 전체 버킷 1개 + 자기 종류 버킷 1개
+      - 조회는 전체 버킷에 order_reserve 개를 남겨둬야 가져갈 수 있음 (주문용 여유분)
+      - 대기 중인 주문이 있으면 조회는 주문이 나갈 때까지 양보
+      - 같은 종류끼리는 먼저 온 순서대로
+    stats() 로 종류별 호출 수 / 대기 시간(합계·최대) 확인
+    """
+
+    def __init__(self, global_rate=18, order_rate=10, quote_rate=15, order_reserve=3):
+        self.global_bucket = TokenBucket(global_rate)
+        self.buckets = {ORDER: TokenBucket(order_rate), QUOTE: TokenBucket(quote_rate)}
+        self.order_reserve = min(order_reserve, self.global_bucket.capacity - 1)
+
+        self._cond = threading.Condition()
+        self._waiters = []                # heap: (priority, seq)
+        self._seq = itertools.count()
+        self._stats = {kind: {"calls": 0, "waited": 0, "total_wait": 0.0, "max_wait": 0.0, "throttled": 0}
+                       for kind in self.buckets}
+
+    def _need(self, kind):
+        # 조회는 주문 여유분을 남기고 가져감
+        return 1.0 if kind == ORDER else 1.0 + self.order_reserve
+
+    def _ready_delay(self, kind, entry):
+        """
+        지금 나갈 수 있으면 0, 아니면 다시 확인할 때까지의 시간
+        """
+        for waiter in self._waiters:
+            if waiter[0] < entry[0] or (waiter[0] == entry[0] and waiter[1] < entry[1]):
+                return None                   # 앞선 대기자 있음 → 알림 올 때까지
+        return max(self.global_bucket.delay(self._need(kind)), self.buckets[kind].delay())
+
+    def acquire(self, kind=QUOTE, timeout=None):
+        """
+        토큰 확보까지 대기, 대기한 시간(초) 반환
+        timeout 초 안에 못 얻으면 TimeoutError
+        """
+        bucket = self.buckets[kind]
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        entry = (PRIORITY[kind], next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.global_bucket.refill(now)
+                    bucket.refill(now)
+                    delay = self._ready_delay(kind, entry)
+                    if delay == 0:
+                        break
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise TimeoutError(f"rate limit wait exceeded {timeout}s ({kind})")
+                        delay = remaining if delay is None else min(delay, remaining)
+                    self._cond.wait(delay)
+
+                self.global_bucket.tokens -= 1
+                bucket.tokens -= 1
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            stat = self._stats[kind]
+            stat["calls"] += 1
+            stat["total_wait"] += waited
+            if waited > 0.001:
+                stat["waited"] += 1
+            stat["max_wait"] = max(stat["max_wait"], waited)
+        return waited
+
+    def throttled(self, kind=QUOTE):
+        """
+        서버가 초당 한도 초과(EGW00201)로 거절 → 버킷을 비워 잠시 쉬게 함
+        """
+        with self._cond:
+            now = time.monotonic()
+            self.global_bucket.drain(now)
+            self.buckets[kind].drain(now)
+            self._stats[kind]["throttled"] += 1
+
+    def stats(self):
+        with self._cond:
+            result = {}
+            for kind, stat in self._stats.items():
+                item = dict(stat)
+                item["avg_wait"] = stat["total_wait"] / stat["calls"] if stat["calls"] else 0.0
+                result[kind] = item
+            return result
+
+    def reset_stats(self):
+        with self._cond:
+            for stat in self._stats.values():
+                stat.update(calls=0, waited=0, total_wait=0.0, max_wait=0.0, throttled=0)
@@ -0,0 +1,245 @@
+import json
+import time
+import asyncio
+import threading
+from collections import namedtuple
+import websockets
+from utils import http_client
+
+# -----------------------------
+# KIS 실시간(웹소켓) 시세 구독 → 최신가 캐시
+# -----------------------------
+WS_URL = http_client.config.get("WS_URL", "ws://ops.koreainvestment.com:21000")
+
+TR_ID_TRADE = "HDFSCNT0"   # 해외주식 실시간지연체결가
+TR_ID_ASK = "HDFSASP0"     # 해외주식 실시간호가
+
+# 필드 위치 (api_doc 레이아웃 순서, '^' 구분)
+TRADE_FIELDS = {"RSYM": 0, "SYMB": 1, "LAST": 11, "PBID": 15, "PASK": 16, "TVOL": 20}
+ASK_FIELDS = {"RSYM": 0, "SYMB": 1, "PBID1": 11, "PASK1": 12}
+
+Quote = namedtuple("Quote", ["last", "bid", "ask", "updated"])
+
+
+def fetch_approval_key():
+    """
+    웹소켓 접속키 발급 (/oauth2/Approval)
+    """
+    body = {
+        "grant_type": "client_credentials",
+        "appkey": http_client.config["APP_KEY"],
+        "secretkey": http_client.config["APP_SECRET"],
+    }
+    resp = http_client.post(f"{http_client.url_base}/oauth2/Approval",
+                            headers={"content-type": "application/json; utf-8"},
+                            data=json.dumps(body))
+    return resp.json().get("approval_key", "")
+
+
+def quote_key(symbol, exchange):
+    """
+    tr_key 형식: D + 거래소(NYS/NAS/AMS) + 종목코드 (미국 무료 실시간)
+    """
+    return f"D{exchange.upper()}{symbol.upper()}"
+
+
+class RealtimeFeed:
+    """
+    백그라운드 스레드에서 asyncio 웹소켓 세션을 유지
+      - 끊기면 지수 백오프로 재접속 후 구독 목록 전체 재등록
+      - PINGPONG 은 그대로 돌려보냄
+      - 체결가/호가 푸시는 tr_key 별 최신 Quote 로 캐시 → get_price() 는 네트워크 없이 읽기만 함
+      - add_listener 로 등록한 콜백에 (tr_id, 필드목록 또는 JSON 응답 dict, 암호화여부) 전달
+    """
+
+    def __init__(self, ws_url=WS_URL, approval_key=None, custtype="P",
+                 reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.ws_url = ws_url
+        self.approval_key = approval_key
+        self.custtype = custtype
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._subscriptions = set()      # {(tr_id, tr_key)}
+        self._quotes = {}                # tr_key → Quote
+        self._listeners = {}             # tr_id → [callback]
+        self._lock = threading.Lock()
+
+        self._loop = None
+        self._ws = None
+        self._thread = None
+        self._stopping = False
+        self._stop_event = None
+        self.connected = threading.Event()
+        self.reconnects = 0
+
+    # -----------------------------
+    # 구독 관리
+    # -----------------------------
+    def _message(self, tr_id, tr_key, tr_type):
+        return json.dumps({
+            "header": {
+                "approval_key": self.approval_key,
+                "custtype": self.custtype,
+                "tr_type": tr_type,           # 1: 등록, 2: 해제
+                "content-type": "utf-8",
+            },
+            "body": {"input": {"tr_id": tr_id, "tr_key": tr_key}},
+        })
+
+    def _send_threadsafe(self, message):
+        ws, loop = self._ws, self._loop
+        if ws is not None and loop is not None:
+            asyncio.run_coroutine_threadsafe(ws.send(message), loop)
+
+    def subscribe(self, tr_id, tr_key):
+        with self._lock:
+            if (tr_id, tr_key) in self._subscriptions:
+                return
+            self._subscriptions.add((tr_id, tr_key))
+        self._send_threadsafe(self._message(tr_id, tr_key, "1"))
+
+    def unsubscribe(self, tr_id, tr_key):
+        with self._lock:
+            self._subscriptions.discard((tr_id, tr_key))
+        self._send_threadsafe(self._message(tr_id, tr_key, "2"))
+
+    def subscribe_quote(self, symbol, exchange, with_ask=False):
+        key = quote_key(symbol, exchange)
+        self.subscribe(TR_ID_TRADE, key)
+        if with_ask:
+            self.subscribe(TR_ID_ASK, key)
+
+    def add_listener(self, tr_id, callback):
+        self._listeners.setdefault(tr_id, []).append(callback)
+
+    # -----------------------------
+    # 캐시 읽기 (네트워크 없음)
+    # -----------------------------
+    def get_quote(self, symbol, exchange):
+        return self._quotes.get(quote_key(symbol, exchange))
+
+    def get_price(self, symbol, exchange, max_age=None):
+        """
+        최신 체결가, 없거나 max_age 초보다 오래됐으면 None
+        """
+        quote = self.get_quote(symbol, exchange)
+        if quote is None or quote.last is None:
+            return None
+        if max_age is not None and time.monotonic() - quote.updated > max_age:
+            return None
+        return quote.last
+
+    # -----------------------------
+    # 수신 처리
+    # -----------------------------
+    def _update_quote(self, tr_key, last=None, bid=None, ask=None):
+        old = self._quotes.get(tr_key) or Quote(None, None, None, 0.0)
+        self._quotes[tr_key] = Quote(
+            last if last is not None else old.last,
+            bid if bid is not None else old.bid,
+            ask if ask is not None else old.ask,
+            time.monotonic(),
+        )
+
+    def _handle_data(self, raw):
+        # 형식: 암호화여부|tr_id|건수|필드^필드^...
+        encrypted, tr_id, count, payload = raw.split("|", 3)
+        count = max(int(count), 1)
+        values = payload.split("^")
+        width = len(values) // count
+
+        for k in range(count):
+            fields = values[k * width:(k + 1) * width]
+            if tr_id == TR_ID_TRADE:
+                self._update_quote(fields[TRADE_FIELDS["RSYM"]],
+                                   last=float(fields[TRADE_FIELDS["LAST"]]),
+                                   bid=float(fields[TRADE_FIELDS["PBID"]]),
+                                   ask=float(fields[TRADE_FIELDS["PASK"]]))
+            elif tr_id == TR_ID_ASK:
+                self._update_quote(fields[ASK_FIELDS["RSYM"]],
+                                   bid=float(fields[ASK_FIELDS["PBID1"]]),
+                                   ask=float(fields[ASK_FIELDS["PASK1"]]))
+            for callback in self._listeners.get(tr_id, []):
+                callback(tr_id, fields, encrypted == "1")
+
+    async def _handle_json(self, ws, raw):
+        data = json.loads(raw)
+        header = data.get("header", {})
+        if header.get("tr_id") == "PINGPONG":
+            await ws.send(raw)
+            return
+        body = data.get("body", {})
+        if body.get("rt_cd") not in (None, "0"):
+            print(f"[실시간 구독 오류] {header.get('tr_id')} {header.get('tr_key')} → {body.get('msg1')}")
+        for callback in self._listeners.get(header.get("tr_id"), []):
+            callback(header.get("tr_id"), data, False)
+
+    async def _session(self):
+        async with websockets.connect(self.ws_url, ping_interval=None) as ws:
+            self._ws = ws
+            with self._lock:
+                subscriptions = list(self._subscriptions)
+            for tr_id, tr_key in subscriptions:
+                await ws.send(self._message(tr_id, tr_key, "1"))
+            self.connected.set()
+
+            async for raw in ws:
+                if isinstance(raw, bytes):
+                    raw = raw.decode("utf-8")
+                try:
+                    if raw[:1] in ("0", "1"):
+                        self._handle_data(raw)
+                    else:
+                        await self._handle_json(ws, raw)
+                except (ValueError, IndexError) as e:
+                    print(f"[실시간 데이터 파싱 오류] {e} | {raw[:80]}")
+
+    async def _run(self):
+        self._stop_event = asyncio.Event()
+        delay = self.reconnect_delay
+        while not self._stopping:
+            started = time.monotonic()
+            try:
+                await self._session()
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                print(f"[실시간 연결 끊김] {e}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+
+            if self._stopping:
+                break
+            # 오래 유지됐던 연결이면 백오프 초기화
+            if time.monotonic() - started > self.max_reconnect_delay:
+                delay = self.reconnect_delay
+            self.reconnects += 1
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    # -----------------------------
+    # 시작 / 종료
+    # -----------------------------
+    def start(self):
+        if self._thread is not None:
+            return self
+        if self.approval_key is None:
+            self.approval_key = fetch_approval_key()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._run(),),
+                                        name="kis-realtime", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stopping = True
+        ws, loop = self._ws, self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._stop_event.set)
+            if ws is not None:
+                asyncio.run_coroutine_threadsafe(ws.close(), loop)
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,337 @@
+import os
+import json
+import tempfile
+import numpy as np
+from utils.helpers import (
+    fetch_data,
+    compute_buy_signals,
+    advance_grid_bar,
+    grid_results,
+    column_values,
+    bar_timestamps,
+)
+from utils.data_store import DEFAULT_STORE_DIR
+from utils.strategies import strategy_names
+from utils.metrics import metrics
+
+# -----------------------------
+# 증분 재최적화 (새 봉만 재생)
+# -----------------------------
+RESULT_CACHE_PATH = os.path.join(DEFAULT_STORE_DIR, "optimizer_results.json")
+
+# 시뮬레이션은 윈도우 3번째 봉부터 시작 (optimize_thresholds_bruteforce 와 동일)
+SIM_START = 2
+
+
+class IncrementalGridState:
+    """
+    한 모드의 (tp, sl) 그리드 전체 시뮬레이션 상태를 호출 사이에 유지
+
+    익절/손절 한 번마다 잔고에 곱해지는 값이 조합별로 고정이므로
+    잔고 = 초기자본 × (1+tp)^승 × (1+sl)^패 로 승/패 횟수만 있으면 복원됨
+    → 봉마다 "봉 시작 시 무포지션 여부"와 누적 승/패만 기록해 두면
+      윈도우 앞쪽 봉이 빠질 때 누적값 차이로 잘라낼 수 있음
+
+    새 윈도우 시작 봉에서 기존 실행이 포지션을 들고 있던 조합만 다시 시뮬레이션하고,
+    두 실행이 같은 봉 시작에서 모두 무포지션이 되면(이후 경로 동일) 거기서 멈춤
+    """
+
+    def __init__(self, take_profit_values, stop_loss_values, initial_balance=10000):
+        tp_grid, sl_grid = np.meshgrid(np.asarray(take_profit_values, dtype=np.float64),
+                                       np.asarray(stop_loss_values, dtype=np.float64),
+                                       indexing="ij")
+        self.shape = tp_grid.shape
+        self.tp_mult = (1 + tp_grid / 100).ravel()
+        self.sl_mult = (1 + sl_grid / 100).ravel()
+        self.initial_balance = initial_balance
+        self.reset()
+
+    def reset(self):
+        size = self.tp_mult.size
+        # 봉별 기록 (행 = 처리한 봉, 열 = 조합)
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.flat_before = np.empty((0, size), dtype=bool)
+        self.wins_before = np.empty((0, size), dtype=np.int64)
+        self.losses_before = np.empty((0, size), dtype=np.int64)
+        self.start = 0  # 현재 윈도우의 첫 시뮬레이션 봉 (행 번호)
+
+        # 현재 상태
+        self.position = np.zeros(size, dtype=bool)
+        self.entry_price = np.zeros(size)
+        self.wins = np.zeros(size, dtype=np.int64)
+        self.losses = np.zeros(size, dtype=np.int64)
+
+        # 마지막 봉(미완성일 수 있음) 처리 직전 상태 → 다음 호출에서 되돌리고 다시 처리
+        self._before_last = None
+
+    # -----------------------------
+    # 내부 단계
+    # -----------------------------
+    def _rollback_last(self):
+        if self._before_last is None:
+            return
+        self.position, self.entry_price, self.wins, self.losses = self._before_last
+        self._before_last = None
+        self.timestamps = self.timestamps[:-1]
+        self.flat_before = self.flat_before[:-1]
+        self.wins_before = self.wins_before[:-1]
+        self.losses_before = self.losses_before[:-1]
+
+    def _drop_until(self, new_start, highs, lows, signals, offset):
+        """
+        윈도우 시작을 new_start 행으로 옮김
+        offset: 행 번호 → 새 df 위치 변환값 (df 위치 = 행 - offset)
+        """
+        rows = len(self.timestamps)
+        active = np.flatnonzero(~self.flat_before[new_start]) if new_start < rows else np.empty(0, int)
+        if active.size:
+            position = np.zeros(active.size, dtype=bool)
+            entry_price = np.zeros(active.size)
+            wins = np.zeros(active.size, dtype=np.int64)
+            losses = np.zeros(active.size, dtype=np.int64)
+            flat_hist, wins_hist, losses_hist = [], [], []
+
+            for row in range(new_start, rows):
+                # 새 실행과 기존 실행이 모두 무포지션 → 이후 경로 동일, 누적값만 이어 붙임
+                synced = ~position & self.flat_before[row, active]
+                if synced.any():
+                    cols = active[synced]
+                    span = row - new_start
+                    if span:
+                        self.flat_before[new_start:row, cols] = np.array(flat_hist)[:, synced]
+                        self.wins_before[new_start:row, cols] = (
+                            np.array(wins_hist)[:, synced]
+                            + self.wins_before[row, cols] - wins[synced]
+                        )
+                        self.losses_before[new_start:row, cols] = (
+                            np.array(losses_hist)[:, synced]
+                            + self.losses_before[row, cols] - losses[synced]
+                        )
+                    keep = ~synced
+                    active, position, entry_price = active[keep], position[keep], entry_price[keep]
+                    wins, losses = wins[keep], losses[keep]
+                    flat_hist = [f[keep] for f in flat_hist]
+                    wins_hist = [w[keep] for w in wins_hist]
+                    losses_hist = [l[keep] for l in losses_hist]
+                    if not active.size:
+                        break
+
+                flat_hist.append(~position)
+                wins_hist.append(wins.copy())
+                losses_hist.append(losses.copy())
+
+                i = row - offset
+                win, loss = advance_grid_bar(highs[i], lows[i], signals[i], position, entry_price,
+                                             self.tp_mult[active], self.sl_mult[active])
+                wins += win
+                losses += loss
+
+            # 끝까지 동기화되지 않은 조합은 새 실행 상태로 교체
+            if active.size:
+                self.flat_before[new_start:rows, active] = np.array(flat_hist)
+                self.wins_before[new_start:rows, active] = np.array(wins_hist)
+                self.losses_before[new_start:rows, active] = np.array(losses_hist)
+                self.position[active] = position
+                self.entry_price[active] = entry_price
+                self.wins[active] = wins
+                self.losses[active] = losses
+
+        self.start = new_start
+
+        # 앞쪽 기록이 절반 이상 쓸모없어지면 압축
+        if self.start > 0 and self.start * 2 >= rows:
+            self.timestamps = self.timestamps[self.start:]
+            self.flat_before = self.flat_before[self.start:]
+            self.wins_before = self.wins_before[self.start:]
+            self.losses_before = self.losses_before[self.start:]
+            self.start = 0
+
+    def _append(self, timestamps, highs, lows, signals, first):
+        """
+        df 의 first 위치부터 끝까지 봉을 이어서 처리
+        """
+        count = len(timestamps) - first
+        if count <= 0:
+            return
+        size = self.tp_mult.size
+        flat_new = np.empty((count, size), dtype=bool)
+        wins_new = np.empty((count, size), dtype=np.int64)
+        losses_new = np.empty((count, size), dtype=np.int64)
+
+        for k, i in enumerate(range(first, len(timestamps))):
+            if i == len(timestamps) - 1:
+                self._before_last = (self.position.copy(), self.entry_price.copy(),
+                                     self.wins.copy(), self.losses.copy())
+            flat_new[k] = ~self.position
+            wins_new[k] = self.wins
+            losses_new[k] = self.losses
+
+            win, loss = advance_grid_bar(highs[i], lows[i], signals[i], self.position,
+                                         self.entry_price, self.tp_mult, self.sl_mult)
+            self.wins += win
+            self.losses += loss
+
+        self.timestamps = np.concatenate([self.timestamps, timestamps[first:]])
+        self.flat_before = np.concatenate([self.flat_before, flat_new])
+        self.wins_before = np.concatenate([self.wins_before, wins_new])
+        self.losses_before = np.concatenate([self.losses_before, losses_new])
+
+    # -----------------------------
+    # 공개 API
+    # -----------------------------
+    def update(self, timestamps, highs, lows, signals):
+        """
+        새 윈도우(df 전체)를 반영. 이전 호출과 겹치는 봉은 재생하지 않음
+        반환: 이번에 새로 시뮬레이션한 봉 수
+        """
+        if len(timestamps) <= SIM_START:
+            self.reset()
+            return 0
+
+        self._rollback_last()
+        window_first = timestamps[SIM_START]
+        rows = len(self.timestamps)
+        new_start = int(np.searchsorted(self.timestamps, window_first)) if rows else 0
+
+        # 겹치는 구간이 그대로 이어지지 않으면(기간 변경, 누락 봉 등) 처음부터 다시
+        overlap = rows - new_start
+        contiguous = (
+            rows > 0
+            and new_start >= self.start
+            and new_start < rows
+            and self.timestamps[new_start] == window_first
+            and overlap <= len(timestamps) - SIM_START
+            and np.array_equal(self.timestamps[new_start:],
+                               timestamps[SIM_START:SIM_START + overlap])
+        )
+        if not contiguous:
+            self.reset()
+            self._append(timestamps, highs, lows, signals, SIM_START)
+            return len(timestamps) - SIM_START
+
+        if new_start > self.start:
+            self._drop_until(new_start, highs, lows, signals, offset=new_start - SIM_START)
+
+        first = SIM_START + overlap
+        self._append(timestamps, highs, lows, signals, first)
+        return len(timestamps) - first
+
+    def counts(self):
+        """
+        현재 윈도우 기준 (wins, losses)
+        """
+        if self.start < len(self.timestamps):
+            base_wins = self.wins_before[self.start]
+            base_losses = self.losses_before[self.start]
+        else:
+            base_wins = self.wins
+            base_losses = self.losses
+        return self.wins - base_wins, self.losses - base_losses
+
+    def balances(self):
+        wins, losses = self.counts()
+        balance = self.initial_balance * self.tp_mult ** wins * self.sl_mult ** losses
+        return (balance.reshape(self.shape),
+                wins.reshape(self.shape),
+                losses.reshape(self.shape))
+
+
+# (ticker, interval, period, mode, tp 값들, sl 값들) → IncrementalGridState
+_grid_states = {}
+
+
+# 결과 캐시 파일: {(ticker, interval, period) 슬롯: {"key": 데이터셋 키, "best": 결과}}
+# 슬롯마다 마지막 데이터셋 결과 하나씩 → 여러 티커 / 기간이 서로 밀어내지 않음
+def _result_cache_slot(ticker, interval, period):
+    return json.dumps([ticker.upper(), interval, period])
+
+
+def _result_cache_key(ticker, interval, period, last_ts, last_close, take_profit_range, stop_loss_range, modes):
+    return json.dumps([ticker.upper(), interval, period, int(last_ts), float(last_close),
+                       list(take_profit_range), list(stop_loss_range), list(modes)])
+
+
+def _load_result_cache(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_result_cache(path, cache):
+    # 임시 파일 이름을 호출마다 다르게 → 동시에 저장하는 최적화끼리 같은 .tmp 를 덮어쓰지 않음
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+        json.dump(cache, f)
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.remove(f.name)
+        raise
+
+
+@metrics.timed("optimizer_seconds", kind="incremental")
+def optimize_thresholds_incremental(ticker,
+                                    interval="5m",
+                                    period="5d",
+                                    take_profit_range=(0.5, 2.0, 0.5),
+                                    stop_loss_range=(-5.0, -1.0, 1.0),
+                                    modes=None,
+                                    cache_path=RESULT_CACHE_PATH):
+    """
+    optimize_thresholds_bruteforce 와 같은 결과 튜플을 반환하되
+      - 데이터(마지막 봉 시각/종가)와 그리드가 그대로면 저장된 결과를 즉시 반환
+      - 아니면 이전 호출의 시뮬레이션 상태에 새 봉만 이어서 재생
+    modes: None 이면 레지스트리에서 optimize=True 로 등록된 전략 전체
+    """
+    modes = tuple(modes or strategy_names(optimizable_only=True))
+    df = fetch_data(ticker, interval=interval, period=period)
+    timestamps = bar_timestamps(df)
+    highs = column_values(df, "high")
+    lows = column_values(df, "low")
+    closes = column_values(df, "close")
+
+    slot = _result_cache_slot(ticker, interval, period)
+    key = None
+    if len(timestamps):
+        key = _result_cache_key(ticker, interval, period, timestamps[-1], closes[-1],
+                                take_profit_range, stop_loss_range, modes)
+        entry = _load_result_cache(cache_path).get(slot)
+        if isinstance(entry, dict) and entry.get("key") == key:
+            best = tuple(entry["best"])
+            print(f"\n⚡ [{best[0]}] 캐시된 최적 전략 사용: {best[1]} | 익절 {best[2]}% / 손절 {best[3]}%")
+            return best
+
+    take_profit_values = np.arange(*take_profit_range)
+    stop_loss_values = np.arange(*stop_loss_range)
+
+    results = []
+    for mode in modes:
+        state_key = (ticker.upper(), interval, period, mode,
+                     tuple(take_profit_values), tuple(stop_loss_values))
+        state = _grid_states.get(state_key)
+        if state is None:
+            state = _grid_states[state_key] = IncrementalGridState(take_profit_values, stop_loss_values)
+
+        signals = compute_buy_signals(df, mode=mode)
+        state.update(timestamps, highs, lows, signals)
+        balance, wins, losses = state.balances()
+        results.extend(grid_results(interval, mode, take_profit_values, stop_loss_values,
+                                    balance, wins, losses))
+
+    best = max(results, key=lambda x: x[4])
+    best = (best[0], best[1], float(best[2]), float(best[3]), float(best[4]), float(best[5]), int(best[6]))
+    print(
+        f"\n🏆 [{best[0]}] 최적 모드: {best[1]} | 익절 {best[2]}% / 손절 {best[3]}%"
+        f" → 최종 자본 ${best[4]:.2f} | 승률 {best[5]:.1f}% ({best[6]}회 거래)"
+    )
+
+    if key is not None:
+        cache = _load_result_cache(cache_path)   # 저장 직전에 다시 읽어 다른 슬롯 결과 유지
+        cache[slot] = {"key": key, "best": list(best)}
+        _save_result_cache(cache_path, cache)
+    return best
@@ -0,0 +1,211 @@
+import math
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from utils.helpers import (
+    fetch_data,
+    add_indicators,
+    column_values,
+    compute_buy_signals,
+    simulate_thresholds_batch,
+    grid_results,
+)
+from utils.strategies import strategy_names, param_grid
+from utils.metrics import metrics
+
+# -----------------------------
+# 적응형 탐색 (successive halving + coarse-to-fine)
+# -----------------------------
+# 비용 단위: "시뮬레이션" = (설정, tp, sl) 조합 1개를 전체 데이터로 1회 재생한 것
+#            부분 데이터로 재생하면 사용한 봉 비율만큼만 셈
+SearchConfig = namedtuple("SearchConfig", ["mode", "params", "window"])   # params: ((이름, 값), ...)
+
+DEFAULT_WINDOW = 20       # add_indicators 기본 window (fetch_data 결과 그대로 사용)
+
+
+def search_space(modes, windows=(DEFAULT_WINDOW,)):
+    """
+    (mode × 전략 선언 파라미터 조합 × 지표 window) 전체 목록
+    """
+    return [SearchConfig(mode, tuple(sorted(params.items())), window)
+            for window in windows
+            for mode in modes
+            for params in param_grid(mode)]
+
+
+def indicator_frames(df, windows):
+    """
+    window 별 지표 df (fetch_data 결과의 고가/저가/종가로 다시 계산)
+    window 마다 앞쪽 버려지는 봉 수가 달라서 모두 같은 마지막 구간 길이로 맞춤
+    """
+    base = pd.DataFrame({name: column_values(df, name) for name in ("high", "low", "close")})
+    frames = {}
+    for window in windows:
+        frames[window] = df if window == DEFAULT_WINDOW else add_indicators(base.copy(), window=window)
+    n_rows = min(len(frame) for frame in frames.values())
+    return {window: frame.iloc[len(frame) - n_rows:].reset_index(drop=True) for window, frame in frames.items()}
+
+
+class AdaptiveSearch:
+    """
+    1) successive halving: 모든 설정을 coarse tp/sl 그리드로 짧은 앞부분 데이터에서 평가
+       → 상위 1/eta 만 남기고 데이터 길이를 eta 배로 늘려 반복 (마지막 단계는 전체 데이터)
+    2) coarse-to-fine: 살아남은 top_k 설정마다 coarse 최적 (tp, sl) 주변 ±coarse 간격을
+       fine 그리드 해상도로 다시 평가
+    budget: 사용할 최대 시뮬레이션 수 (None = 제한 없음), 초과 전에 단계를 멈추고 그때까지의 최선 반환
+    """
+
+    def __init__(self, df, configs, take_profit_values, stop_loss_values,
+                 coarse_factor=5, eta=3, min_fraction=0.25, top_k=3, budget=None,
+                 interval="5m", initial_balance=10000):
+        self.configs = list(configs)
+        self.take_profit_values = np.round(np.asarray(take_profit_values, dtype=np.float64), 10)
+        self.stop_loss_values = np.round(np.asarray(stop_loss_values, dtype=np.float64), 10)
+        self.coarse_factor = max(1, int(coarse_factor))
+        self.eta = eta
+        self.min_fraction = min_fraction
+        self.top_k = top_k
+        self.budget = budget
+        self.interval = interval
+        self.initial_balance = initial_balance
+
+        self.frames = indicator_frames(df, sorted({c.window for c in self.configs}))
+        self.n_rows = len(next(iter(self.frames.values())))
+        self._signals = {}
+        self.used = 0.0
+        self.evaluations = 0
+        self.best = None
+        self.best_config = None
+
+    # -----------------------------
+    # 평가
+    # -----------------------------
+    def _arrays(self, config):
+        signal = self._signals.get(config)
+        if signal is None:
+            signal = self._signals[config] = compute_buy_signals(self.frames[config.window], config.mode,
+                                                                 **dict(config.params))
+        frame = self.frames[config.window]
+        return column_values(frame, "high"), column_values(frame, "low"), signal
+
+    def cost(self, n_configs, n_tp, n_sl, n_rows):
+        return n_configs * n_tp * n_sl * n_rows / self.n_rows
+
+    def affordable(self, cost):
+        return self.budget is None or self.used + cost <= self.budget
+
+    def evaluate(self, config, take_profit_values, stop_loss_values, n_rows=None):
+        """
+        설정 1개의 (tp, sl) 그리드를 앞 n_rows 봉으로 재생 → 최고 결과 튜플
+        """
+        n_rows = n_rows or self.n_rows
+        highs, lows, signal = self._arrays(config)
+        balance, wins, losses = simulate_thresholds_batch(
+            highs[:n_rows], lows[:n_rows], signal[:n_rows],
+            take_profit_values, stop_loss_values, initial_balance=self.initial_balance
+        )
+        self.used += self.cost(1, len(take_profit_values), len(stop_loss_values), n_rows)
+        self.evaluations += 1
+        results = grid_results(self.interval, config.mode, take_profit_values, stop_loss_values,
+                               balance, wins, losses)
+        best = max(results, key=lambda x: x[4])
+        if n_rows == self.n_rows and (self.best is None or best[4] > self.best[4]):
+            self.best, self.best_config = best, config
+        return best
+
+    # -----------------------------
+    # 단계
+    # -----------------------------
+    def halving(self):
+        """
+        반환: [(설정, 전체 데이터 coarse 최고 결과)] (balance 내림차순)
+        """
+        tp = self.take_profit_values[::self.coarse_factor]
+        sl = self.stop_loss_values[::self.coarse_factor]
+        survivors = list(self.configs)
+        rungs = max(1, math.ceil(math.log(max(1, len(survivors) / self.top_k), self.eta)) + 1)
+        scored = []
+        for rung in range(rungs):
+            fraction = 1.0 if rung == rungs - 1 else max(self.min_fraction, self.eta ** (rung - rungs + 1))
+            n_rows = max(2, int(self.n_rows * fraction))
+            if not self.affordable(self.cost(len(survivors), len(tp), len(sl), n_rows)):
+                print(f"⚠️ 예산 초과 → halving {rung + 1}/{rungs} 단계에서 중단")
+                break
+            scored = sorted(((c, self.evaluate(c, tp, sl, n_rows)) for c in survivors),
+                            key=lambda item: item[1][4], reverse=True)
+            print(f"  halving {rung + 1}/{rungs} | 데이터 {n_rows}/{self.n_rows}봉 | 설정 {len(survivors)}개"
+                  f" | 선두 {scored[0][0].mode} ${scored[0][1][4]:.2f}")
+            if n_rows == self.n_rows:
+                return scored
+            survivors = [c for c, _ in scored[:max(self.top_k, math.ceil(len(scored) / self.eta))]]
+        return []
+
+    def _neighborhood(self, values, center):
+        coarse_step = (values[1] - values[0]) * self.coarse_factor if len(values) > 1 else 0.0
+        return values[np.abs(values - center) <= coarse_step + 1e-9]
+
+    def refine(self, scored):
+        for config, coarse_best in scored[:self.top_k]:
+            tp = self._neighborhood(self.take_profit_values, coarse_best[2])
+            sl = self._neighborhood(self.stop_loss_values, coarse_best[3])
+            if not self.affordable(self.cost(1, len(tp), len(sl), self.n_rows)):
+                print("⚠️ 예산 초과 → 세밀 탐색 중단")
+                break
+            self.evaluate(config, tp, sl)
+
+    def run(self):
+        scored = self.halving()
+        self.refine(scored)
+        return self.best, self.best_config
+
+    def report(self):
+        full_grid = len(self.configs) * len(self.take_profit_values) * len(self.stop_loss_values)
+        return {
+            "configs": len(self.configs),
+            "full_grid": full_grid,
+            "simulations": self.used,
+            "saved": full_grid - self.used,
+            "saved_pct": (1 - self.used / full_grid) * 100 if full_grid else 0.0,
+            "evaluations": self.evaluations,
+            "budget": self.budget,
+        }
+
+
+@metrics.timed("optimizer_seconds", kind="adaptive")
+def optimize_thresholds_adaptive(ticker,
+                                  interval="5m",
+                                  period="5d",
+                                  take_profit_range=(0.5, 2.0, 0.1),
+                                  stop_loss_range=(-5.0, -1.0, 0.1),
+                                  modes=None,
+                                  windows=(DEFAULT_WINDOW,),
+                                  coarse_factor=5,
+                                  eta=3,
+                                  top_k=3,
+                                  budget=None):
+    """
+    optimize_thresholds_bruteforce 대안 — 더 촘촘한 tp/sl, 전략 파라미터, 지표 window 를 함께 탐색
+    반환: (최고 결과 튜플, 탐색 리포트 dict)
+      - 결과 튜플은 bruteforce 와 같은 (interval, mode, tp, sl, balance, win_rate, total_trades)
+      - 리포트에 선택된 전략 파라미터 / window 와 전체 그리드 대비 절약한 시뮬레이션 수
+    """
+    modes = tuple(modes or strategy_names(optimizable_only=True))
+    df = fetch_data(ticker, interval=interval, period=period)
+    search = AdaptiveSearch(df, search_space(modes, windows),
+                            np.arange(*take_profit_range), np.arange(*stop_loss_range),
+                            coarse_factor=coarse_factor, eta=eta, top_k=top_k, budget=budget,
+                            interval=interval)
+    best, config = search.run()
+    report = search.report()
+    if best is None:
+        print(f"⚠️ [{ticker}] 예산 {budget} 안에서 전체 데이터 평가를 끝내지 못함")
+        return None, report
+
+    report.update(params=dict(config.params), window=config.window)
+    print(
+        f"\n🏆 [{best[0]}] 적응형 탐색 최적 모드: {best[1]} {report['params'] or ''} (window {config.window})"
+        f" | 익절 {best[2]}% / 손절 {best[3]}% → 최종 자본 ${best[4]:.2f} | 승률 {best[5]:.1f}% ({best[6]}회 거래)"
+        f"\n   시뮬레이션 {report['simulations']:.0f} / 전체 그리드 {report['full_grid']}"
+        f" → {report['saved']:.0f}회 절약 ({report['saved_pct']:.1f}%)"
+    )
+    return best, report
@@ -0,0 +1,169 @@
+import numpy as np
+from types import MappingProxyType
+from collections import namedtuple
+
+# -----------------------------
+# 매수 전략 레지스트리
+# -----------------------------
+# 커널 규약: kernel(prev, now, price, **params) → bool (배열 또는 스칼라, np.abs 대신 abs 사용)
+#   prev / now : 컬럼명 → 직전 봉 / 현재 봉 값 (백테스트는 전체 구간 배열, 실시간은 float)
+#   price      : 현재가 (백테스트는 해당 봉 종가 배열)
+# 같은 커널을 백테스트(compute_buy_signals)와 실시간(check_buy_condition)이 함께 사용
+# warmup: 커널이 판정하려면 필요한 최소 봉 수 - 1 (add_indicators 가 NaN 봉을 버린 뒤 기준)
+#         → 앞쪽 warmup 개 봉은 항상 False, 실시간은 봉이 warmup 개 이하면 False
+
+Param = namedtuple("Param", ["default", "choices"])   # choices: 최적화 탐색 후보 (없으면 고정값)
+Strategy = namedtuple("Strategy", ["name", "kernel", "warmup", "params", "columns", "optimize", "description"])
+
+STRATEGIES = {}
+
+
+def register_strategy(name, warmup=1, params=None,
+                      columns=("close", "ma5", "ma20", "lower"), optimize=True, description=""):
+    """
+    데코레이터로 전략 등록
+      warmup   : 직전 봉 몇 개가 필요한지 (기본 1 = 직전 봉 하나)
+      params   : {이름: Param(기본값, 탐색후보)}
+      optimize : True 면 optimizer 기본 모드 목록에 포함
+    """
+    def decorator(kernel):
+        STRATEGIES[name] = Strategy(name, kernel, warmup, dict(params or {}), tuple(columns),
+                                    optimize, description or (kernel.__doc__ or "").strip())
+        return kernel
+    return decorator
+
+
+def get_strategy(mode):
+    strategy = STRATEGIES.get(mode)
+    if strategy is None:
+        raise ValueError(f"Unknown mode: {mode} (사용 가능: {', '.join(STRATEGIES)})")
+    return strategy
+
+
+def strategy_names(optimizable_only=False):
+    return tuple(name for name, s in STRATEGIES.items() if s.optimize or not optimizable_only)
+
+
+def resolve_params(strategy, overrides=None):
+    """
+    선언된 기본값 + 넘겨받은 값 (선언 안 된 파라미터는 오류)
+    """
+    params = {key: p.default for key, p in strategy.params.items()}
+    for key, value in (overrides or {}).items():
+        if key not in params:
+            raise ValueError(f"{strategy.name}: 알 수 없는 파라미터 {key} (선언: {', '.join(params) or '-'})")
+        params[key] = value
+    return params
+
+
+def param_grid(mode):
+    """
+    choices 가 선언된 파라미터의 모든 조합 (없으면 기본값 1개)
+    """
+    strategy = get_strategy(mode)
+    combos = [{}]
+    for key, p in strategy.params.items():
+        values = p.choices or (p.default,)
+        combos = [dict(c, **{key: v}) for c in combos for v in values]
+    return combos
+
+# -----------------------------
+# 전체 구간 / 단일 시점 실행
+# -----------------------------
+def series_signals(columns, mode, **kwargs):
+    """
+    columns: 컬럼명 → 1차원 float64 배열
+    반환: bool 배열 (길이 n, i번째 = i번째 봉 종가를 현재가로 봤을 때 매수 여부)
+    """
+    strategy = get_strategy(mode)
+    params = resolve_params(strategy, kwargs)
+    n = len(columns["close"])
+    signal = np.zeros(n, dtype=bool)
+    if n <= strategy.warmup:
+        return signal
+
+    prev = {name: columns[name][:-1] for name in strategy.columns}
+    now = {name: columns[name][1:] for name in strategy.columns}
+    signal[1:] = strategy.kernel(prev, now, now["close"], **params)
+    signal[:strategy.warmup] = False
+    return signal
+
+
+class TickSnapshot(namedtuple("TickSnapshot", ["mode", "kernel", "params", "prev", "now", "ready"])):
+    """
+    데이터 갱신 때 한 번 만들어 두는 불변 판정 스냅샷
+      - prev / now : 직전 봉 / 최신 봉 지표값 (파이썬 float, 읽기 전용 매핑)
+      - check(현재가) 는 float 비교 몇 번뿐 (pandas 객체 없음)
+    """
+    __slots__ = ()
+
+    def check(self, current_price):
+        if not self.ready:
+            return False
+        try:
+            return bool(self.kernel(self.prev, self.now, float(current_price), **self.params))
+        except ZeroDivisionError:
+            return False
+
+
+def compile_snapshot(prev, now, mode, ready=True, **kwargs):
+    """
+    prev / now: 컬럼명 → 스칼라 (직전 봉 / 최신 봉)
+    """
+    strategy = get_strategy(mode)
+    params = resolve_params(strategy, kwargs)
+    return TickSnapshot(
+        mode=mode,
+        kernel=strategy.kernel,
+        params=MappingProxyType(params),
+        prev=MappingProxyType({k: float(v) for k, v in prev.items()}),
+        now=MappingProxyType({k: float(v) for k, v in now.items()}),
+        ready=ready,
+    )
+
+# -----------------------------
+# 기본 전략
+# -----------------------------
+@register_strategy("lower_recover", columns=("close", "lower"))
+def lower_recover(prev, now, price):
+    """볼린저 하단선 이탈 후 회복"""
+    return (prev["close"] < prev["lower"]) & (price > now["lower"])
+
+
+@register_strategy("ma_cross", columns=("close", "ma5", "ma20"))
+def ma_cross(prev, now, price):
+    """단기 MA가 중기 MA 상향 돌파"""
+    return (prev["ma5"] < prev["ma20"]) & (now["ma5"] > now["ma20"])
+
+
+@register_strategy("near_ma", columns=("close", "ma5", "ma20"), optimize=False,
+                   params={"target_ma": Param("ma20", ("ma5", "ma20")),
+                           "tolerance": Param(0.001, (0.0005, 0.001, 0.002))})
+def near_ma(prev, now, price, target_ma="ma20", tolerance=0.001):
+    """현재가가 특정 이동평균선 근처"""
+    ma_val = now["ma5"] if target_ma == "ma5" else now["ma20"]
+    return abs((price - ma_val) / ma_val) <= tolerance
+
+
+@register_strategy("ma5_touch", columns=("close", "ma5", "ma20"),
+                   params={"tolerance": Param(0.001, (0.0005, 0.001, 0.002))})
+def ma5_touch(prev, now, price, tolerance=0.001):
+    """상승 추세 중 MA5 근접 후 반등"""
+    return (
+        (now["ma5"] > now["ma20"]) &                              # 상승 추세
+        (abs((price - now["ma5"]) / now["ma5"]) <= tolerance) &     # MA5 근접
+        (price > prev["close"])                                   # 직전 종가 대비 반등
+    )
+
+
+@register_strategy("combo", columns=("close", "ma5", "ma20", "lower"),
+                   params={"strict": Param(False, (False, True)),
+                           "tolerance": Param(0.001, None)})
+def combo(prev, now, price, strict=False, tolerance=0.001):
+    """복합 조건: 하단 회복 + 단기이평 반등 (strict 면 세 조건 모두)"""
+    recover = lower_recover(prev, now, price)
+    cross = ma_cross(prev, now, price)
+    touch = ma5_touch(prev, now, price, tolerance=tolerance)
+    if strict:
+        return recover & cross & touch
+    return (recover & touch) | cross
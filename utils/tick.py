@@ -0,0 +1,62 @@
+import time
+from collections import deque
+from utils.helpers import tick_snapshot
+from utils.metrics import metrics
+
+# -----------------------------
+# 실시간 틱 판정 (불변 스냅샷 + 판정 지연 측정)
+# -----------------------------
+class TickEvaluator:
+    """
+    데이터 갱신(update) 때 마지막 두 봉을 TickSnapshot 으로 미리 만들어 두고
+    틱마다 check(현재가) 로 판정 → 핫패스에 pandas 없음
+      - 스냅샷은 불변 객체라 갱신은 참조 교체 한 번 (다른 스레드에서 update 해도 안전)
+      - 판정 1회 지연(ns)을 최근 window 개 보관 → stats() 로 평균 / p50 / p99 / 최대 (µs)
+    """
+
+    def __init__(self, mode, window=1024, **params):
+        self.mode = mode
+        self.params = params
+        self.snapshot = None
+        self.count = 0
+        self.signals = 0
+        self._latency = deque(maxlen=window)
+
+    def update(self, df):
+        self.snapshot = tick_snapshot(df, self.mode, **self.params)
+        return self.snapshot
+
+    def check(self, current_price):
+        snapshot = self.snapshot
+        if snapshot is None:
+            return False
+        start = time.perf_counter_ns()
+        signal = snapshot.check(current_price)
+        elapsed = time.perf_counter_ns() - start
+        self._latency.append(elapsed)
+        metrics.observe("tick_decision_seconds", elapsed / 1e9, mode=self.mode)
+        self.count += 1
+        self.signals += signal
+        return signal
+
+    def value(self, name):
+        """
+        최신 봉 지표값 (현황 보고용, 스냅샷 없으면 nan)
+        """
+        snapshot = self.snapshot
+        return snapshot.now.get(name, float("nan")) if snapshot is not None else float("nan")
+
+    def stats(self):
+        samples = sorted(self._latency)
+        if not samples:
+            return {"count": self.count, "signals": self.signals}
+        n = len(samples)
+        return {
+            "count": self.count,
+            "signals": self.signals,
+            "last_us": self._latency[-1] / 1000,
+            "mean_us": sum(samples) / n / 1000,
+            "p50_us": samples[n // 2] / 1000,
+            "p99_us": samples[min(n - 1, int(n * 0.99))] / 1000,
+            "max_us": samples[-1] / 1000,
+        }
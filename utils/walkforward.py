@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from tqdm import tqdm
+from utils import helpers
+from utils.helpers import (
+    fetch_data,
+    column_values,
+    compute_buy_signals,
+    simulate_thresholds_batch,
+    grid_results,
+    bar_timestamps,
+)
+from utils.strategies import strategy_names
+from utils.metrics import metrics
+
+# -----------------------------
+# 워크포워드 최적화 (학습 구간 최적화 → 다음 구간 검증)
+# -----------------------------
+# 5분봉 정규장 기준 하루 78봉 → 학습 20일 / 검증 5일
+WF_TRAIN_BARS = 78 * 20
+WF_TEST_BARS = 78 * 5
+
+Fold = namedtuple("Fold", ["index", "train_start", "train_end", "test_start", "test_end"])
+FoldResult = namedtuple("FoldResult", [
+    "fold", "mode", "take_profit", "stop_loss",
+    "train_balance", "train_win_rate", "train_trades",
+    "test_balance", "test_win_rate", "test_trades",
+])
+
+
+def make_folds(n_rows, train_bars=WF_TRAIN_BARS, test_bars=WF_TEST_BARS, step=None, anchored=False):
+    """
+    [train_start, train_end) 학습 / [test_start, test_end) 검증 구간 목록
+      step     : 다음 fold 까지 이동 봉 수 (기본 = test_bars → 검증 구간이 겹치지 않음)
+      anchored : True 면 학습 시작을 0 에 고정 (확장 윈도우)
+    """
+    step = step or test_bars
+    folds = []
+    start = 0
+    while start + train_bars + test_bars <= n_rows:
+        train_start = 0 if anchored else start
+        train_end = start + train_bars
+        folds.append(Fold(len(folds), train_start, train_end, train_end, train_end + test_bars))
+        start += step
+    return folds
+
+
+def evaluate_fold(fold, highs, lows, signals, take_profit_values, stop_loss_values,
+                  interval="5m", initial_balance=10000):
+    """
+    학습 구간에서 (mode, tp, sl) 최적 조합을 고른 뒤 같은 조합으로 검증 구간 시뮬레이션
+    signals: {mode: 전체 구간 bool 배열} (fold 마다 다시 계산하지 않고 잘라서 사용)
+    """
+    train = slice(fold.train_start, fold.train_end)
+    test = slice(fold.test_start, fold.test_end)
+
+    results = []
+    for mode, signal in signals.items():
+        balance, wins, losses = simulate_thresholds_batch(
+            highs[train], lows[train], signal[train],
+            take_profit_values, stop_loss_values, initial_balance=initial_balance, start=0
+        )
+        results.extend(grid_results(interval, mode, take_profit_values, stop_loss_values,
+                                    balance, wins, losses))
+    best = max(results, key=lambda x: x[4])
+    _, mode, tp, sl, train_balance, train_win_rate, train_trades = best
+
+    balance, wins, losses = simulate_thresholds_batch(
+        highs[test], lows[test], signals[mode][test],
+        [tp], [sl], initial_balance=initial_balance, start=0
+    )
+    _, _, _, _, test_balance, test_win_rate, test_trades = grid_results(
+        interval, mode, [tp], [sl], balance, wins, losses)[0]
+
+    return FoldResult(fold, mode, float(tp), float(sl),
+                      float(train_balance), train_win_rate, train_trades,
+                      float(test_balance), test_win_rate, test_trades)
+
+
+def _evaluate_fold_shared(fold, modes, take_profit_values, stop_loss_values, interval, initial_balance):
+    """
+    워커: 부모가 공유 메모리에 올린 고가/저가/모드별 시그널 뷰로 fold 평가
+    """
+    arrays = helpers._worker_arrays
+    signals = {mode: arrays[f"signal:{mode}"] > 0 for mode in modes}
+    return evaluate_fold(fold, arrays["high"], arrays["low"], signals,
+                         take_profit_values, stop_loss_values, interval, initial_balance)
+
+
+def run_walk_forward(df, folds, modes, take_profit_values, stop_loss_values,
+                     interval="5m", initial_balance=10000, workers=None):
+    """
+    지표가 붙은 df 로 시그널을 모드별 한 번만 계산 → 모든 fold 가 재사용
+    workers: 2 이상이면 fold 단위로 프로세스 풀에서 평가 (배열은 공유 메모리로 전달)
+    """
+    highs = column_values(df, "high")
+    lows = column_values(df, "low")
+    signals = {mode: compute_buy_signals(df, mode=mode) for mode in modes}
+
+    if not workers or workers <= 1:
+        return [evaluate_fold(fold, highs, lows, signals, take_profit_values, stop_loss_values,
+                              interval, initial_balance)
+                for fold in tqdm(folds, desc="Walk-Forward")]
+
+    columns = ("high", "low") + tuple(f"signal:{mode}" for mode in modes)
+    n_rows = len(highs)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(columns) * n_rows * 8))
+    block = None
+    try:
+        block = np.ndarray((len(columns), n_rows), dtype=np.float64, buffer=shm.buf)
+        block[0] = highs
+        block[1] = lows
+        for k, mode in enumerate(modes, start=2):
+            block[k] = signals[mode]
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=helpers._attach_shared_arrays,
+                                 initargs=(shm.name, n_rows, columns)) as pool:
+            futures = [pool.submit(_evaluate_fold_shared, fold, tuple(modes),
+                                   take_profit_values, stop_loss_values, interval, initial_balance)
+                       for fold in folds]
+            results = [future.result() for future in tqdm(futures, desc="Walk-Forward")]
+        return results
+    finally:
+        # shm.buf 를 쓰는 배열을 먼저 놓아야 close 가 BufferError 없이 됨 (실패 경로 포함, unlink 는 항상)
+        del block
+        try:
+            shm.close()
+        finally:
+            shm.unlink()
+
+
+def summarize_walk_forward(results, initial_balance=10000):
+    """
+    검증 구간(out-of-sample) 성과 요약
+      - compounded_balance : fold 들을 이어서 운용했다고 보고 검증 수익률을 곱한 잔고
+      - win_rate           : 전체 검증 거래 기준 승률
+    """
+    if not results:
+        return {"folds": 0, "compounded_balance": float(initial_balance), "win_rate": 0.0, "trades": 0,
+                "mean_test_return": 0.0, "mean_train_return": 0.0, "profitable_folds": 0}
+    growth = 1.0
+    wins = trades = 0
+    for r in results:
+        growth *= r.test_balance / initial_balance
+        trades += r.test_trades
+        wins += round(r.test_win_rate * r.test_trades / 100)
+    return {
+        "folds": len(results),
+        "compounded_balance": initial_balance * growth,
+        "win_rate": wins / trades * 100 if trades else 0.0,
+        "trades": trades,
+        "mean_test_return": float(np.mean([r.test_balance / initial_balance - 1 for r in results]) * 100),
+        "mean_train_return": float(np.mean([r.train_balance / initial_balance - 1 for r in results]) * 100),
+        "profitable_folds": sum(1 for r in results if r.test_balance > initial_balance),
+    }
+
+
+@metrics.timed("optimizer_seconds", kind="walk_forward")
+def optimize_walk_forward(ticker,
+                          interval="5m",
+                          period="60d",
+                          take_profit_range=(0.5, 2.0, 0.5),
+                          stop_loss_range=(-5.0, -1.0, 1.0),
+                          modes=None,
+                          train_bars=WF_TRAIN_BARS,
+                          test_bars=WF_TEST_BARS,
+                          step=None,
+                          anchored=False,
+                          initial_balance=10000,
+                          workers=None):
+    """
+    데이터 1회 조회 + 지표/시그널 1회 계산 후 롤링 학습/검증 fold 별로
+    학습 구간 최적 (mode, tp, sl) 의 검증 구간 잔고 / 승률을 보고
+    반환: (fold 결과 목록, 요약 dict)
+    """
+    modes = tuple(modes or strategy_names(optimizable_only=True))
+    df = fetch_data(ticker, interval=interval, period=period)
+    folds = make_folds(len(df), train_bars, test_bars, step=step, anchored=anchored)
+    if not folds:
+        print(f"⚠️ [{ticker}] 데이터 {len(df)}봉 < 학습 {train_bars} + 검증 {test_bars}봉 → 워크포워드 불가")
+        return [], summarize_walk_forward([], initial_balance)
+
+    results = run_walk_forward(df, folds, modes, np.arange(*take_profit_range), np.arange(*stop_loss_range),
+                               interval=interval, initial_balance=initial_balance, workers=workers)
+
+    timestamps = bar_timestamps(df) if "datetime" in df else None
+    for r in results:
+        span = f"{r.fold.test_start}~{r.fold.test_end - 1}"
+        if timestamps is not None:
+            span = (f"{pd.Timestamp(timestamps[r.fold.test_start]):%m-%d %H:%M}"
+                    f"~{pd.Timestamp(timestamps[r.fold.test_end - 1]):%m-%d %H:%M}")
+        print(
+            f"  fold {r.fold.index:>2} [{span}] {r.mode} | 익절 {r.take_profit}% / 손절 {r.stop_loss}%"
+            f" | 학습 ${r.train_balance:.2f} → 검증 ${r.test_balance:.2f}"
+            f" | 검증 승률 {r.test_win_rate:.1f}% ({r.test_trades}회)"
+        )
+
+    summary = summarize_walk_forward(results, initial_balance)
+    print(
+        f"\n🧪 [{interval}] 워크포워드 {summary['folds']} fold | 검증 누적 ${summary['compounded_balance']:.2f}"
+        f" | 검증 승률 {summary['win_rate']:.1f}% ({summary['trades']}회)"
+        f" | 평균 수익률 학습 {summary['mean_train_return']:.2f}% / 검증 {summary['mean_test_return']:.2f}%"
+    )
+    return results, summary